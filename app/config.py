@@ -59,10 +59,37 @@ LANGCHAIN_PROJECT = os.getenv('LANGCHAIN_PROJECT', 'financial-analysis')
 # Configuration Alpha Vantage
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "demo")
 ALPHA_VANTAGE_RATE_LIMIT = 5  # Requêtes par minute pour la version gratuite
+ALPHA_VANTAGE_BURST = int(os.getenv('ALPHA_VANTAGE_BURST', '1'))  # Requêtes accordées sans attente après une pause
+ALPHA_VANTAGE_RATE_LIMIT_PATH = os.getenv(
+    'ALPHA_VANTAGE_RATE_LIMIT_PATH', os.path.join(DATA_DIR, 'cache', 'alpha_vantage_rate_limit')
+)  # État du seau à jetons commun à tous les processus
+ALPHA_VANTAGE_SERIES_CACHE_SIZE = int(os.getenv('ALPHA_VANTAGE_SERIES_CACHE_SIZE', '64'))  # Séries gardées en mémoire
 
 # Configuration EDGAR
 EDGAR_USER_AGENT = os.getenv("EDGAR_USER_AGENT", "financial-dashboard@example.com")
 EDGAR_RATE_LIMIT = 10  # Requêtes par seconde selon les directives de la SEC
+EDGAR_DOWNLOAD_WORKERS = int(os.getenv('EDGAR_DOWNLOAD_WORKERS', '4'))  # Entreprises téléchargées en parallèle
+EDGAR_MAX_RETRIES = 3  # Tentatives par requête en cas d'erreur temporaire
+EDGAR_SYNC_MAX_TICKERS = int(os.getenv('EDGAR_SYNC_MAX_TICKERS', '25'))  # Entreprises par requête de synchronisation
+SEC_COMPANY_TICKERS_PATH = os.getenv('SEC_COMPANY_TICKERS_PATH', os.path.join(DATA_DIR, 'edgar', 'company_tickers.json'))
+SEC_COMPANY_INDEX_PATH = os.getenv('SEC_COMPANY_INDEX_PATH', os.path.join(DATA_DIR, 'cache', 'company_tickers.idx'))
+SEC_HTTP_CACHE_DIR = os.getenv('SEC_HTTP_CACHE_DIR', os.path.join(DATA_DIR, 'cache', 'sec_http'))
+SEC_HTTP_CACHE_MAX_BYTES = int(os.getenv('SEC_HTTP_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))  # 256 MB
+SEC_SEARCH_MAX_AGE = int(os.getenv('SEC_SEARCH_MAX_AGE', '900'))  # Fraîcheur des listes de dépôts, en secondes
+SEC_DOCUMENT_MAX_AGE = int(os.getenv('SEC_DOCUMENT_MAX_AGE', str(7 * 24 * 3600)))  # Fraîcheur des documents déposés
+
+# Configuration du traitement des PDF
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', str(os.cpu_count() or 1)))
+PDF_TASKS_PER_WORKER = 4  # Plages de pages par processus, pour équilibrer la charge
+PDF_OCR_WORKERS = int(os.getenv('PDF_OCR_WORKERS', str(os.cpu_count() or 1)))
+PDF_OCR_MAX_PAGES_IN_FLIGHT = int(os.getenv('PDF_OCR_MAX_PAGES_IN_FLIGHT', '4'))  # Images de pages en mémoire
+PDF_OCR_WINDOW = 2  # Pages consécutives rastérisées par appel à pdf2image
+PDF_OCR_MIN_PAGE_CHARS = 20  # En dessous, la page est considérée sans couche texte
+PDF_CACHE_PATH = os.getenv('PDF_CACHE_PATH', os.path.join(DATA_DIR, 'cache', 'pdf_extraction.db'))
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))  # 512 MB
+PDF_JOB_WORKERS = int(os.getenv('PDF_JOB_WORKERS', '2'))  # Documents traités simultanément en arrière-plan
+PDF_JOB_MAX_PENDING = int(os.getenv('PDF_JOB_MAX_PENDING', '20'))  # Documents en attente ou en cours
+PDF_JOB_TTL = 3600  # Conservation de l'état des tâches terminées, en secondes
 
 # Configuration des exportations
 EXPORT_FORMATS = ['csv', 'pdf', 'excel', 'json']
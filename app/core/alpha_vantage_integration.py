@@ -8,18 +8,22 @@ import sys
 import time
 import logging
 import json
+import functools
 import pandas as pd
 import numpy as np
 import requests
-from typing import Dict, List, Optional, Tuple, Union, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Tuple, Any, Iterable, Iterator
 
 # Ajouter le répertoire parent au chemin d'importation
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from app.config import (
     DATA_DIR, ALPHA_VANTAGE_API_KEY, ALPHA_VANTAGE_RATE_LIMIT,
+    ALPHA_VANTAGE_BURST, ALPHA_VANTAGE_RATE_LIMIT_PATH, ALPHA_VANTAGE_SERIES_CACHE_SIZE,
     COMPANIES
 )
+from app.core.token_bucket import FileTokenBucket
 
 # Configuration du logging
 logging.basicConfig(
@@ -29,6 +33,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Données financières d'une entreprise et méthodes qui les récupèrent (cache compris)
+ENDPOINT_METHODS = {
+    'overview': 'get_company_overview',
+    'income_statement': 'get_income_statement',
+    'balance_sheet': 'get_balance_sheet',
+    'cash_flow': 'get_cash_flow',
+    'earnings': 'get_earnings'
+}
+
+# Données utilisées pour le calcul des métriques clés
+KEY_METRICS_ENDPOINTS = ('overview', 'income_statement', 'balance_sheet')
+
+
+def parse_time_series(data: Dict[str, Any], symbol: str) -> pd.DataFrame:
+    """
+    Convertit la réponse TIME_SERIES_DAILY en DataFrame typé, trié par date.
+    
+    Args:
+        data: La réponse JSON de l'API
+        symbol: Le symbole boursier de l'entreprise
+        
+    Returns:
+        pd.DataFrame: Les données de série temporelle
+    """
+    if "Time Series (Daily)" not in data:
+        logger.error(f"Données de série temporelle non trouvées pour {symbol}")
+        raise ValueError(f"Données de série temporelle non trouvées pour {symbol}")
+    
+    time_series = data["Time Series (Daily)"]
+    df = pd.DataFrame.from_dict(time_series, orient="index")
+    
+    # Convertir les colonnes en nombres
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col])
+    
+    # Renommer les colonnes
+    df.columns = [col.split(". ")[1] for col in df.columns]
+    
+    # Ajouter une colonne de date
+    df.index = pd.to_datetime(df.index)
+    df.sort_index(inplace=True)
+    
+    return df
+
+
+def save_time_series(df: pd.DataFrame, path: str):
+    """
+    Enregistre une série temporelle au format colonnes numpy (.npz non compressé) :
+    l'index de dates et chaque colonne sont stockés comme tableaux typés.
+    
+    Args:
+        df: Les données de série temporelle
+        path: Le chemin du fichier .npz
+    """
+    arrays = {f"column_{i}": df[col].to_numpy() for i, col in enumerate(df.columns)}
+    
+    temp_path = f"{path}.part"
+    with open(temp_path, 'wb') as f:
+        np.savez(f, index=df.index.to_numpy(), columns=np.array(df.columns, dtype=str), **arrays)
+    os.replace(temp_path, path)
+
+
+@functools.lru_cache(maxsize=ALPHA_VANTAGE_SERIES_CACHE_SIZE)
+def load_time_series(path: str, mtime_ns: int) -> pd.DataFrame:
+    """
+    Charge une série temporelle enregistrée par save_time_series. La date de modification
+    ne sert qu'à la clé du cache : un fichier réécrit n'est jamais servi depuis la mémoire.
+    """
+    with np.load(path) as data:
+        columns = [str(col) for col in data['columns']]
+        df = pd.DataFrame(
+            {col: data[f"column_{i}"] for i, col in enumerate(columns)},
+            index=pd.DatetimeIndex(data['index'])
+        )
+    return df
+
 class AlphaVantageIntegration:
     """Classe pour l'intégration avec l'API Alpha Vantage."""
     
@@ -39,6 +119,13 @@ class AlphaVantageIntegration:
         self.data_dir = os.path.join(DATA_DIR, "alpha_vantage")
         os.makedirs(self.data_dir, exist_ok=True)
         
+        # Seau à jetons commun à tous les processus : une requête n'attend que si le quota est épuisé
+        self.rate_limiter = FileTokenBucket(
+            ALPHA_VANTAGE_RATE_LIMIT_PATH,
+            rate=ALPHA_VANTAGE_RATE_LIMIT / 60,
+            capacity=ALPHA_VANTAGE_BURST
+        )
+        
         # Vérifier si la clé API est configurée
         if not self.api_key or self.api_key == "demo":
             logger.warning("La clé API Alpha Vantage n'est pas configurée ou utilise la valeur par défaut 'demo'.")
@@ -56,7 +143,7 @@ class AlphaVantageIntegration:
             Dict[str, Any]: Les données retournées par l'API
         """
         # Respecter la limite de taux de l'API Alpha Vantage
-        time.sleep(60 / ALPHA_VANTAGE_RATE_LIMIT)
+        self.rate_limiter.acquire()
         
         # Construire les paramètres de la requête
         params = {
@@ -108,11 +195,25 @@ class AlphaVantageIntegration:
         Returns:
             pd.DataFrame: Les données de série temporelle
         """
-        # Vérifier si les données sont déjà en cache
+        # Vérifier si les données sont déjà en cache : réponse brute (JSON) et série analysée (.npz)
         cache_file = os.path.join(self.data_dir, f"{symbol.lower()}_daily_{outputsize}.json")
+        series_file = os.path.join(self.data_dir, f"{symbol.lower()}_daily_{outputsize}.npz")
         
         # Si le fichier de cache existe et a moins de 24 heures, l'utiliser
-        if os.path.exists(cache_file) and (time.time() - os.path.getmtime(cache_file)) < 86400:
+        try:
+            cache_stat = os.stat(cache_file)
+        except FileNotFoundError:
+            cache_stat = None
+        
+        if cache_stat is not None and (time.time() - cache_stat.st_mtime) < 86400:
+            # Série déjà analysée depuis cette réponse : la charger (depuis la mémoire si elle y est)
+            try:
+                series_stat = os.stat(series_file)
+                if series_stat.st_mtime_ns >= cache_stat.st_mtime_ns:
+                    return load_time_series(series_file, series_stat.st_mtime_ns).copy()
+            except FileNotFoundError:
+                pass
+            
             logger.info(f"Utilisation des données en cache pour {symbol}")
             with open(cache_file, 'r') as f:
                 data = json.load(f)
@@ -129,23 +230,13 @@ class AlphaVantageIntegration:
                 json.dump(data, f, indent=2)
         
         # Convertir les données en DataFrame
-        if "Time Series (Daily)" not in data:
-            logger.error(f"Données de série temporelle non trouvées pour {symbol}")
-            raise ValueError(f"Données de série temporelle non trouvées pour {symbol}")
-        
-        time_series = data["Time Series (Daily)"]
-        df = pd.DataFrame.from_dict(time_series, orient="index")
-        
-        # Convertir les colonnes en nombres
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col])
-        
-        # Renommer les colonnes
-        df.columns = [col.split(". ")[1] for col in df.columns]
+        df = parse_time_series(data, symbol)
         
-        # Ajouter une colonne de date
-        df.index = pd.to_datetime(df.index)
-        df.sort_index(inplace=True)
+        # Enregistrer la série analysée pour les prochains appels
+        try:
+            save_time_series(df, series_file)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer la série analysée pour {symbol}: {str(e)}")
         
         return df
     
@@ -304,6 +395,31 @@ class AlphaVantageIntegration:
         
         return data
     
+    def iter_financial_data(self, symbol: str,
+                            endpoints: Iterable[str] = tuple(ENDPOINT_METHODS)) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Récupère des données financières d'une entreprise en parallèle, et les produit au fur et
+        à mesure de leur arrivée. Les données en cache arrivent immédiatement ; les requêtes
+        restent soumises au seau à jetons commun et partent dès que le quota le permet.
+        
+        Args:
+            symbol: Le symbole boursier de l'entreprise
+            endpoints: Les données à récupérer, parmi les clés de ENDPOINT_METHODS
+            
+        Returns:
+            Iterator[Tuple[str, Dict]]: Les couples (nom, données) dans l'ordre d'arrivée ; une
+            erreur est levée au moment où arrive la donnée concernée
+        """
+        endpoints = list(endpoints)
+        
+        with ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix='alpha-vantage') as executor:
+            futures = {
+                executor.submit(getattr(self, ENDPOINT_METHODS[endpoint]), symbol): endpoint
+                for endpoint in endpoints
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
     def get_financial_data(self, symbol: str) -> Dict[str, Any]:
         """
         Récupère toutes les données financières d'une entreprise.
@@ -317,21 +433,9 @@ class AlphaVantageIntegration:
         logger.info(f"Récupération des données financières pour {symbol}")
         
         try:
-            # Récupérer les différentes données
-            overview = self.get_company_overview(symbol)
-            income_statement = self.get_income_statement(symbol)
-            balance_sheet = self.get_balance_sheet(symbol)
-            cash_flow = self.get_cash_flow(symbol)
-            earnings = self.get_earnings(symbol)
-            
-            # Combiner les données
-            financial_data = {
-                "overview": overview,
-                "income_statement": income_statement,
-                "balance_sheet": balance_sheet,
-                "cash_flow": cash_flow,
-                "earnings": earnings
-            }
+            # Récupérer les différentes données en parallèle, puis les combiner
+            results = dict(self.iter_financial_data(symbol))
+            financial_data = {endpoint: results[endpoint] for endpoint in ENDPOINT_METHODS}
             
             # Sauvegarder les données combinées
             output_file = os.path.join(self.data_dir, f"{symbol.lower()}_financial_data.json")
@@ -358,8 +462,8 @@ class AlphaVantageIntegration:
         logger.info(f"Extraction des métriques clés pour {symbol}")
         
         try:
-            # Récupérer les données financières
-            financial_data = self.get_financial_data(symbol)
+            # Récupérer en parallèle les seules données utilisées, sans réécrire les données combinées
+            financial_data = dict(self.iter_financial_data(symbol, KEY_METRICS_ENDPOINTS))
             
             # Extraire les métriques clés
             metrics = {
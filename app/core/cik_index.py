@@ -0,0 +1,246 @@
+"""
+Module pour la correspondance entre tickers et CIK (Central Index Key) de la SEC.
+Ce module charge le fichier company_tickers.json publié par la SEC dans un index en mémoire
+(recherche exacte, inverse et par préfixe), conservé sur disque pour ne pas relire le JSON.
+"""
+
+import os
+import sys
+import json
+import pickle
+import bisect
+import logging
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.config import SEC_COMPANY_TICKERS_PATH, SEC_COMPANY_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+# Version du format de l'index sur disque ; l'incrémenter force sa reconstruction
+INDEX_VERSION = 1
+
+# Attributs de l'index conservés sur disque
+INDEX_ATTRIBUTES = ('tickers', 'ciks', 'names', 'positions', 'cik_positions', 'sorted_names')
+
+
+class CIKIndex:
+    """
+    Index des entreprises cotées : les tickers sont triés (recherche par préfixe par
+    dichotomie) et associés par position aux CIK et aux noms des entreprises.
+    """
+    
+    def __init__(self, source_path: str = SEC_COMPANY_TICKERS_PATH, index_path: str = SEC_COMPANY_INDEX_PATH):
+        """
+        Initialise l'index, chargé à la première recherche.
+        
+        Args:
+            source_path: Chemin vers le fichier company_tickers.json de la SEC
+            index_path: Chemin vers l'index conservé sur disque
+        """
+        self.source_path = source_path
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+    
+    def _reset(self):
+        """
+        Vide l'index.
+        """
+        self.tickers = []
+        self.ciks = array('q')
+        self.names = []
+        self.positions = {}
+        self.cik_positions = {}
+        self.sorted_names = []
+    
+    def _source_signature(self) -> Optional[List[int]]:
+        """
+        Retourne la taille et la date de modification du fichier source, ou None s'il n'existe pas.
+        """
+        try:
+            stat = os.stat(self.source_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def _build(self, companies: Dict):
+        """
+        Construit l'index à partir du contenu de company_tickers.json.
+        
+        Args:
+            companies: Le JSON de la SEC, {"0": {"cik_str": ..., "ticker": ..., "title": ...}, ...}
+        """
+        # Ordre du fichier : le premier ticker d'une entreprise est sa cotation principale
+        entries = [
+            (company['ticker'].upper(), int(company['cik_str']), company['title'])
+            for company in companies.values()
+        ]
+        
+        self._reset()
+        seen = set()
+        for ticker, cik, name in sorted(entries, key=lambda entry: entry[0]):
+            if ticker in seen:
+                continue
+            seen.add(ticker)
+            self.tickers.append(ticker)
+            self.ciks.append(cik)
+            self.names.append(name)
+        self.positions = {ticker: position for position, ticker in enumerate(self.tickers)}
+        
+        for ticker, cik, _ in reversed(entries):
+            self.cik_positions[cik] = self.positions[ticker]
+        
+        self.sorted_names = sorted(
+            (name.lower(), position) for position, name in enumerate(self.names)
+        )
+    
+    def _ensure_loaded(self):
+        """
+        Charge l'index depuis le disque, ou le reconstruit si le fichier source a changé.
+        """
+        if self._loaded:
+            return
+        
+        with self.lock:
+            if self._loaded:
+                return
+            
+            signature = self._source_signature()
+            try:
+                with open(self.index_path, 'rb') as f:
+                    state = pickle.load(f)
+                if state['version'] == INDEX_VERSION and state['signature'] == signature:
+                    for attribute in INDEX_ATTRIBUTES:
+                        setattr(self, attribute, state[attribute])
+                    self._loaded = True
+                    return
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+                pass
+            
+            if signature is None:
+                logger.warning(f"Fichier des tickers de la SEC introuvable: {self.source_path}")
+                self._reset()
+                self._loaded = True
+                return
+            
+            logger.info(f"Construction de l'index des tickers depuis {self.source_path}")
+            with open(self.source_path, 'r', encoding='utf-8') as f:
+                self._build(json.load(f))
+            self._save(signature)
+            self._loaded = True
+    
+    def _save(self, signature: List[int]):
+        """
+        Écrit l'index sur disque (fichier temporaire renommé).
+        """
+        state = {attribute: getattr(self, attribute) for attribute in INDEX_ATTRIBUTES}
+        state.update(version=INDEX_VERSION, signature=signature)
+        temp_path = f"{self.index_path}.part"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer l'index des tickers: {str(e)}")
+    
+    def reload(self):
+        """
+        Force le rechargement de l'index à la prochaine recherche.
+        """
+        with self.lock:
+            self._loaded = False
+    
+    def _entry(self, position: int) -> Dict[str, str]:
+        """
+        Retourne l'entreprise à une position de l'index.
+        """
+        return {
+            'ticker': self.tickers[position],
+            'cik': f"{self.ciks[position]:010d}",
+            'name': self.names[position]
+        }
+    
+    def get_cik(self, ticker: str) -> Optional[str]:
+        """
+        Retourne le CIK d'un ticker.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+        
+        Returns:
+            str: Le CIK sur 10 chiffres, ou None si le ticker est inconnu
+        """
+        self._ensure_loaded()
+        position = self.positions.get(ticker.upper())
+        return None if position is None else f"{self.ciks[position]:010d}"
+    
+    def get_ticker(self, cik) -> Optional[str]:
+        """
+        Retourne le ticker principal d'une entreprise à partir de son CIK.
+        
+        Args:
+            cik: Le CIK, avec ou sans zéros initiaux
+        
+        Returns:
+            str: Le ticker, ou None si le CIK est inconnu
+        """
+        self._ensure_loaded()
+        position = self.cik_positions.get(int(cik))
+        return None if position is None else self.tickers[position]
+    
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        Recherche les entreprises dont le ticker, ou à défaut le nom, commence par un préfixe.
+        
+        Args:
+            prefix: Le début du ticker ou du nom de l'entreprise
+            limit: Le nombre maximal de résultats
+        
+        Returns:
+            List[Dict]: Les entreprises (ticker, CIK et nom), les correspondances sur le ticker en premier
+        """
+        self._ensure_loaded()
+        prefix = prefix.strip()
+        if not prefix or limit <= 0:
+            return []
+        
+        positions = []
+        
+        # Tickers commençant par le préfixe : plage contiguë de la liste triée
+        ticker_prefix = prefix.upper()
+        start = bisect.bisect_left(self.tickers, ticker_prefix)
+        for position in range(start, min(start + limit, len(self.tickers))):
+            if not self.tickers[position].startswith(ticker_prefix):
+                break
+            positions.append(position)
+        
+        # Compléter avec les noms commençant par le préfixe
+        name_prefix = prefix.lower()
+        index = bisect.bisect_left(self.sorted_names, (name_prefix,))
+        while len(positions) < limit and index < len(self.sorted_names):
+            name, position = self.sorted_names[index]
+            if not name.startswith(name_prefix):
+                break
+            if position not in positions:
+                positions.append(position)
+            index += 1
+        
+        return [self._entry(position) for position in positions]
+    
+    def __len__(self) -> int:
+        """
+        Retourne le nombre de tickers de l'index.
+        """
+        self._ensure_loaded()
+        return len(self.tickers)
+
+
+# Créer une instance de l'index des tickers
+cik_index = CIKIndex()
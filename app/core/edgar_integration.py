@@ -8,18 +8,32 @@ import sys
 import time
 import logging
 import re
+import json
+import datetime
+import tempfile
+import threading
 import requests
-from bs4 import BeautifulSoup
-from sec_edgar_downloader import Downloader
-from typing import Dict, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from lxml import etree
+from lxml import html as lxml_html
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier, le manifeste reste partagé entre threads
+    fcntl = None
 
 # Ajouter le répertoire parent au chemin d'importation
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from app.config import (
     DATA_DIR, EDGAR_USER_AGENT, EDGAR_RATE_LIMIT,
-    COMPANIES
+    EDGAR_DOWNLOAD_WORKERS, EDGAR_MAX_RETRIES, COMPANIES
 )
+from app.core.token_bucket import TokenBucket
+from app.core.cik_index import cik_index
 
 # Configuration du logging
 logging.basicConfig(
@@ -29,16 +43,329 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Points d'accès EDGAR
+EDGAR_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
+EDGAR_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{document}"
+
+# Codes HTTP pour lesquels une requête est retentée
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Nombre de documents conservés par ticker et type dans le manifeste
+MANIFEST_HISTORY = 100
+
+# Balises HTML qui terminent une ligne de texte
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'table', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'section', 'article', 'header', 'footer', 'blockquote', 'pre', 'hr', 'center'
+}
+
+# Balises dont le contenu n'est pas du texte affiché
+SKIPPED_TAGS = {'head', 'script', 'style', 'ix:header', 'noscript'}
+
+# Cellules qui sont rattachées à leur voisine dans les tableaux EDGAR
+CELL_PREFIXES = {'$', '(', '$('}
+CELL_SUFFIXES = {')', '%', ')%', '%)'}
+
+# Fichiers d'un dépôt qui ne sont pas le document principal :
+# pièces jointes (ex21.htm, a10-kexhibit2110.htm), pages du visualiseur XBRL (R1.htm)
+SECONDARY_DOCUMENT_PATTERN = re.compile(r'ex(?:hibit)?[-_]?\d{2}|^R\d+\.htm|^filing-details', re.IGNORECASE)
+
+WHITESPACE_PATTERN = re.compile(r'[\s\xa0]+')
+
+# Concepts XBRL de chaque métrique, par ordre de préférence
+XBRL_CONCEPTS = {
+    'revenue': [
+        'us-gaap:Revenues',
+        'us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax',
+        'us-gaap:RevenueFromContractWithCustomerIncludingAssessedTax',
+        'us-gaap:SalesRevenueNet'
+    ],
+    'net_income': [
+        'us-gaap:NetIncomeLoss',
+        'us-gaap:ProfitLoss',
+        'us-gaap:NetIncomeLossAvailableToCommonStockholdersBasic'
+    ],
+    'gross_profit': [
+        'us-gaap:GrossProfit'
+    ]
+}
+
+# Durée maximale d'une période retenue (un exercice, avec les exercices de 53 semaines)
+MAX_PERIOD_DAYS = 380
+
+
+class InlineXBRLFacts:
+    """
+    Collecte les faits numériques XBRL intégrés (ix:nonFraction) d'un document HTML,
+    avec les contextes (périodes) et unités déclarés dans son en-tête ix:header.
+    Les éléments sont transmis par iter_html_lines pendant son parcours du document.
+    """
+    
+    def __init__(self):
+        """Initialise le collecteur."""
+        self.contexts = {}
+        self.units = {}
+        self.facts = []
+        self._concepts = {concept.lower() for concepts in XBRL_CONCEPTS.values() for concept in concepts}
+    
+    def handle(self, elem) -> None:
+        """
+        Traite un élément XBRL dont le contenu a été entièrement parcouru.
+        
+        Args:
+            elem: L'élément lxml (balises et attributs en minuscules)
+        """
+        local_name = elem.tag.rsplit(':', 1)[-1]
+        
+        if elem.tag == 'ix:nonfraction':
+            if elem.get('name', '').lower() in self._concepts:
+                value = self._parse_value(elem)
+                if value is not None:
+                    self.facts.append((elem.get('name').lower(), elem.get('contextref'), elem.get('unitref'), value))
+        elif local_name == 'context':
+            self._handle_context(elem)
+        elif local_name == 'unit':
+            measures = [child.text.strip() for child in elem.iter() if isinstance(child.tag, str)
+                        and child.tag.rsplit(':', 1)[-1] == 'measure' and child.text]
+            self.units[elem.get('id')] = measures
+    
+    def _handle_context(self, elem) -> None:
+        """
+        Enregistre la période d'un contexte. Les contextes avec segment (ventilation par
+        produit, zone géographique, etc.) sont ignorés : seuls les totaux consolidés sont retenus.
+        """
+        dates = {}
+        for child in elem.iter():
+            if not isinstance(child.tag, str):
+                continue
+            local_name = child.tag.rsplit(':', 1)[-1]
+            if local_name == 'segment':
+                return
+            if local_name in ('startdate', 'enddate') and child.text:
+                dates[local_name] = child.text.strip()
+        
+        if 'startdate' in dates and 'enddate' in dates:
+            try:
+                start = datetime.date.fromisoformat(dates['startdate'])
+                end = datetime.date.fromisoformat(dates['enddate'])
+            except ValueError:
+                return
+            self.contexts[elem.get('id')] = (start, end)
+    
+    @staticmethod
+    def _parse_value(elem) -> Optional[float]:
+        """
+        Convertit la valeur affichée d'un fait selon son format, son échelle et son signe.
+        """
+        text = ''.join(elem.itertext()).strip()
+        number_format = elem.get('format', '').lower()
+        
+        if 'zero' in number_format:
+            value = 0.0
+        else:
+            # Formats ixt:num-comma-decimal / ixt:numcommadecimal : virgule décimale
+            if 'commadecimal' in number_format.replace('-', ''):
+                text = text.replace('.', '').replace(' ', '').replace(',', '.')
+            else:
+                text = text.replace(',', '').replace(' ', '')
+            try:
+                value = float(text)
+            except ValueError:
+                return None
+        
+        value *= 10 ** int(elem.get('scale', '0') or 0)
+        return -value if elem.get('sign') == '-' else value
+    
+    def metrics(self) -> Dict[str, Dict[int, float]]:
+        """
+        Construit les métriques par année à partir des faits collectés. Pour chaque année
+        (année de fin de période), la période la plus longue d'au plus un exercice est retenue.
+        Les montants sont exprimés en millions de dollars, la marge brute en pourcentage.
+        
+        Returns:
+            Dict: Les métriques, vides si le document ne contient pas de faits exploitables
+        """
+        # Meilleur fait par (métrique, année) : (rang du concept, -durée, valeur)
+        best = {}
+        concept_rank = {
+            concept.lower(): (metric, rank)
+            for metric, concepts in XBRL_CONCEPTS.items() for rank, concept in enumerate(concepts)
+        }
+        
+        for concept, context_ref, unit_ref, value in self.facts:
+            period = self.contexts.get(context_ref)
+            if period is None:
+                continue
+            measures = self.units.get(unit_ref)
+            if measures and not measures[0].upper().endswith('USD'):
+                continue
+            
+            start, end = period
+            days = (end - start).days
+            if days > MAX_PERIOD_DAYS:
+                continue
+            
+            metric, rank = concept_rank[concept]
+            key = (rank, -days)
+            if (metric, end.year) not in best or key < best[(metric, end.year)][0]:
+                best[(metric, end.year)] = (key, value / 1e6)
+        
+        data = {'revenue': {}, 'net_income': {}, 'gross_profit': {}}
+        for (metric, year), (_, value) in sorted(best.items()):
+            data[metric][year] = value
+        
+        financial_data = {
+            'revenue': data['revenue'],
+            'net_income': data['net_income'],
+            'gross_margin': {
+                year: round(gross_profit / data['revenue'][year] * 100, 1)
+                for year, gross_profit in data['gross_profit'].items()
+                if data['revenue'].get(year)
+            }
+        }
+        return financial_data if any(financial_data.values()) else {}
+
+
+def select_primary_document(filing_dir: str) -> str:
+    """
+    Choisit le document principal d'un dépôt parmi ses fichiers HTML :
+    les pièces jointes et pages annexes sont écartées, puis le plus volumineux est retenu.
+    
+    Args:
+        filing_dir: Le chemin vers le répertoire contenant le document
+    
+    Returns:
+        str: Le chemin vers le document principal
+    """
+    candidates = [
+        os.path.join(filing_dir, f) for f in os.listdir(filing_dir)
+        if f.lower().endswith(('.htm', '.html'))
+    ]
+    
+    if not candidates:
+        raise FileNotFoundError(f"Aucun fichier HTML trouvé dans {filing_dir}")
+    
+    return max(candidates, key=lambda path: (
+        not SECONDARY_DOCUMENT_PATTERN.search(os.path.basename(path)),
+        os.path.getsize(path)
+    ))
+
+
+def iter_html_lines(html_file: str, facts: Optional[InlineXBRLFacts] = None) -> Iterator[str]:
+    """
+    Produit les lignes de texte d'un document HTML, au fil du parcours de l'arbre
+    construit par le parseur C de lxml. Chaque bloc (paragraphe, titre, etc.) donne une
+    ligne ; chaque ligne de tableau donne ses cellules séparées par des tabulations.
+    
+    Args:
+        html_file: Le chemin vers le fichier HTML
+        facts: Collecteur auquel transmettre les éléments XBRL rencontrés pendant le même parcours
+    
+    Returns:
+        Iterator[str]: Les lignes de texte non vides, dans l'ordre du document
+    """
+    parser = etree.HTMLParser(huge_tree=True, remove_comments=True, remove_pis=True)
+    root = lxml_html.parse(html_file, parser=parser).getroot()
+    if root is None:
+        return
+    
+    line = []
+    row, row_elem = None, None
+    cell, cell_elem = None, None
+    skip_depth = 0
+    
+    def flush(parts):
+        text = WHITESPACE_PATTERN.sub(' ', ''.join(parts)).strip()
+        parts.clear()
+        return text
+    
+    for event, elem in etree.iterwalk(root, events=('start', 'end')):
+        tag = elem.tag if isinstance(elem.tag, str) else ''
+        
+        if facts is not None and event == 'end' and ':' in tag:
+            facts.handle(elem)
+        
+        # Ignorer les éléments non affichés et tout leur contenu
+        if skip_depth or tag in SKIPPED_TAGS or 'display:none' in elem.get('style', '').replace(' ', ''):
+            if event == 'start':
+                skip_depth += 1
+            else:
+                skip_depth -= 1
+                if not skip_depth and elem.tail:
+                    (cell if cell is not None else line).append(elem.tail)
+            continue
+        
+        if event == 'start':
+            # Les tableaux imbriqués dans une cellule sont traités comme du texte de la cellule
+            if tag == 'tr' and cell is None:
+                text = flush(line)
+                if text:
+                    yield text
+                row, row_elem = [], elem
+            elif tag in ('td', 'th') and row is not None and cell is None:
+                cell, cell_elem = [], elem
+            elif cell is not None and (tag in BLOCK_TAGS or tag in ('td', 'th')):
+                cell.append(' ')
+            elif tag in BLOCK_TAGS:
+                text = flush(line)
+                if text:
+                    yield text
+            
+            if elem.text:
+                (cell if cell is not None else line).append(elem.text)
+            continue
+        
+        if elem is cell_elem:
+            text = flush(cell)
+            cell, cell_elem = None, None
+            if text and row and (row[-1] in CELL_PREFIXES or text in CELL_SUFFIXES):
+                row[-1] += text
+            elif text:
+                row.append(text)
+        elif elem is row_elem:
+            if row:
+                yield '\t'.join(row)
+            row, row_elem = None, None
+        elif cell is not None and (tag in BLOCK_TAGS or tag in ('td', 'th')):
+            cell.append(' ')
+        elif tag in BLOCK_TAGS:
+            text = flush(line)
+            if text:
+                yield text
+        
+        if elem.tail:
+            (cell if cell is not None else line).append(elem.tail)
+    
+    text = flush(line)
+    if text:
+        yield text
+
 class EdgarIntegration:
     """Classe pour l'intégration avec l'API EDGAR de la SEC."""
     
     def __init__(self):
         """Initialise l'intégration avec EDGAR."""
-        self.downloader = Downloader(user_agent=EDGAR_USER_AGENT)
         self.data_dir = os.path.join(DATA_DIR, "edgar")
+        self.filings_dir = os.path.join(self.data_dir, "sec-edgar-filings")
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Mapper les tickers aux CIK (Central Index Key)
+        # Manifeste des numéros d'enregistrement déjà téléchargés, par ticker et type de document
+        self.manifest_path = os.path.join(self.data_dir, "manifest.json")
+        self.manifest = None
+        self.manifest_version = None
+        self.manifest_lock = threading.Lock()
+        
+        # Session HTTP partagée et seau à jetons commun à tous les threads,
+        # pour respecter la limite de taux de l'API EDGAR
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': EDGAR_USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=max(10, EDGAR_DOWNLOAD_WORKERS)))
+        self.rate_limiter = TokenBucket(EDGAR_RATE_LIMIT)
+        
+        # Index de toutes les entreprises cotées (company_tickers.json de la SEC)
+        self.cik_index = cik_index
+        
+        # Entreprises couvertes par défaut, et leurs CIK (Central Index Key)
         self.ticker_to_cik = {
             'AAPL': '0000320193',  # Apple
             'MSFT': '0000789019',  # Microsoft
@@ -47,6 +374,275 @@ class EdgarIntegration:
             'META': '0001326801'   # Meta (Facebook)
         }
     
+    def _request(self, url: str) -> requests.Response:
+        """
+        Effectue une requête GET vers EDGAR en respectant la limite de taux.
+        Les erreurs temporaires sont retentées avec un délai croissant.
+        
+        Args:
+            url: L'URL à récupérer
+        
+        Returns:
+            requests.Response: La réponse HTTP
+        """
+        for attempt in range(EDGAR_MAX_RETRIES):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, timeout=30)
+            except requests.ConnectionError as e:
+                if attempt == EDGAR_MAX_RETRIES - 1:
+                    raise
+                logger.warning(f"Erreur de connexion pour {url}: {str(e)}, nouvelle tentative")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == EDGAR_MAX_RETRIES - 1:
+                    response.raise_for_status()
+                    return response
+                logger.warning(f"Réponse {response.status_code} pour {url}, nouvelle tentative")
+            
+            time.sleep(2 ** attempt)
+    
+    def get_cik(self, ticker: str) -> str:
+        """
+        Retourne le CIK d'une entreprise, parmi les entreprises couvertes ou dans l'index des tickers.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+        
+        Returns:
+            str: Le CIK sur 10 chiffres
+        
+        Raises:
+            ValueError: Si le ticker est inconnu
+        """
+        ticker = ticker.upper()
+        cik = self.ticker_to_cik.get(ticker) or self.cik_index.get_cik(ticker)
+        
+        if cik is None:
+            logger.error(f"Ticker inconnu: {ticker}")
+            raise ValueError(f"Ticker inconnu: {ticker}")
+        return cik
+    
+    def get_recent_filings(self, ticker: str) -> List[Dict[str, str]]:
+        """
+        Récupère la liste des documents récents d'une entreprise, du plus récent au plus ancien.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+        
+        Returns:
+            List[Dict]: Les documents, avec leur numéro d'enregistrement, type,
+            document principal et date de dépôt
+        """
+        cik = self.get_cik(ticker)
+        submissions = self._request(EDGAR_SUBMISSIONS_URL.format(cik=cik)).json()
+        recent = submissions['filings']['recent']
+        
+        return [
+            {
+                'accession_number': accession_number,
+                'form': form,
+                'primary_document': primary_document,
+                'filing_date': filing_date
+            }
+            for accession_number, form, primary_document, filing_date in zip(
+                recent['accessionNumber'], recent['form'], recent['primaryDocument'], recent['filingDate']
+            )
+        ]
+    
+    def _load_manifest(self) -> Dict:
+        """
+        Charge le manifeste à la première utilisation, puis le relit s'il a été réécrit
+        depuis (par exemple par un autre processus). Doit être appelée avec le verrou acquis.
+        
+        Le manifeste a la forme {ticker: {'filings': {type: {numéro d'enregistrement: date de dépôt}},
+        'processed': {type: numéro d'enregistrement du dernier document extrait}}}.
+        """
+        try:
+            stat = os.stat(self.manifest_path)
+            version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        
+        if self.manifest is None or version != self.manifest_version:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except FileNotFoundError:
+                self.manifest = {}
+            except ValueError as e:
+                logger.warning(f"Manifeste EDGAR illisible, reconstruction: {str(e)}")
+                self.manifest = {}
+            self.manifest_version = version
+        return self.manifest
+    
+    @contextmanager
+    def _locked_manifest(self) -> Iterator[Dict]:
+        """
+        Donne le manifeste à jour sous un verrou exclusif (flock) sur un fichier voisin,
+        commun à tous les processus : la lecture, la fusion et la réécriture sont atomiques.
+        """
+        # Le verrou de thread protège le manifeste lorsque flock n'est pas disponible
+        with self.manifest_lock:
+            fd = os.open(f"{self.manifest_path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield self._load_manifest()
+            finally:
+                # Fermer le descripteur libère aussi le verrou
+                os.close(fd)
+    
+    def _write_manifest(self, manifest: Dict):
+        """
+        Réécrit le manifeste via un fichier temporaire renommé. Doit être appelée sous _locked_manifest.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.manifest_path), suffix='.part')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.manifest_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        stat = os.stat(self.manifest_path)
+        self.manifest_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def get_manifest_entry(self, ticker: str) -> Dict:
+        """
+        Retourne l'état du manifeste pour une entreprise.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+        
+        Returns:
+            Dict: Les documents connus par type (numéro d'enregistrement et date de dépôt)
+            et, par type, le numéro d'enregistrement du dernier document extrait
+        """
+        with self.manifest_lock:
+            entry = self._load_manifest().get(ticker.upper(), {})
+            return {
+                'filings': {form: dict(filings) for form, filings in entry.get('filings', {}).items()},
+                'processed': self._processed_by_form(entry)
+            }
+    
+    @staticmethod
+    def _processed_by_form(entry: Dict) -> Dict[str, str]:
+        """
+        Retourne les documents extraits par type d'une entrée du manifeste. Les manifestes
+        antérieurs ne conservaient qu'un numéro d'enregistrement, extrait dans les fichiers 10-K.
+        """
+        processed = entry.get('processed')
+        if isinstance(processed, str):
+            return {'10-K': processed}
+        return dict(processed or {})
+    
+    def _update_manifest(self, ticker: str, filings: Iterable[Dict[str, str]] = (),
+                         processed: Optional[Dict[str, str]] = None):
+        """
+        Enregistre des documents téléchargés ou extraits et réécrit le manifeste. Les
+        modifications sont fusionnées avec le manifeste relu sous le verrou, pour ne pas
+        perdre celles d'un autre processus.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+            filings: Les dépôts téléchargés, tels que retournés par get_recent_filings
+            processed: Le dépôt extrait, tel que retourné par get_recent_filings
+        """
+        with self._locked_manifest() as manifest:
+            entry = manifest.setdefault(ticker.upper(), {'filings': {}})
+            entry['processed'] = self._processed_by_form(entry)
+            changed = (
+                processed is not None
+                and entry['processed'].get(processed['form']) != processed['accession_number']
+            )
+            
+            for filing in filings:
+                known = entry['filings'].setdefault(filing['form'], {})
+                if filing['accession_number'] not in known:
+                    known[filing['accession_number']] = filing['filing_date']
+                    changed = True
+            
+            if not changed:
+                return
+            
+            # Ne conserver que les documents les plus récents de chaque type
+            for form, known in entry['filings'].items():
+                if len(known) > MANIFEST_HISTORY:
+                    entry['filings'][form] = dict(
+                        sorted(known.items(), key=lambda item: item[1], reverse=True)[:MANIFEST_HISTORY]
+                    )
+            if processed is not None:
+                entry['processed'][processed['form']] = processed['accession_number']
+            
+            self._write_manifest(manifest)
+    
+    def _fetch_filing(self, ticker: str, filing: Dict[str, str]) -> Tuple[str, bool]:
+        """
+        Télécharge le document principal d'un dépôt, s'il n'est pas déjà sur disque.
+        Le document est écrit dans un fichier temporaire puis renommé, de sorte qu'un
+        document présent sur disque est complet.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+            filing: Le dépôt, tel que retourné par get_recent_filings
+        
+        Returns:
+            Tuple[str, bool]: Le répertoire du document et un booléen indiquant s'il a été téléchargé
+        """
+        filing_dir = os.path.join(self.filings_dir, ticker, filing['form'], filing['accession_number'])
+        document_path = os.path.join(filing_dir, filing['primary_document'])
+        
+        if os.path.exists(document_path):
+            return filing_dir, False
+        
+        url = EDGAR_ARCHIVES_URL.format(
+            cik=int(self.get_cik(ticker)),
+            accession=filing['accession_number'].replace('-', ''),
+            document=filing['primary_document']
+        )
+        response = self._request(url)
+        
+        os.makedirs(filing_dir, exist_ok=True)
+        temp_path = f"{document_path}.part"
+        with open(temp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(temp_path, document_path)
+        return filing_dir, True
+    
+    def _download_filings(self, ticker: str, filing_type: str, count: int,
+                          recent_filings: Optional[List[Dict[str, str]]] = None) -> Tuple[List[str], int]:
+        """
+        Télécharge les documents principaux des derniers dépôts d'un type donné.
+        Les documents déjà présents sur disque ne sont pas téléchargés à nouveau.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+            filing_type: Le type de document (10-K, 10-Q, etc.)
+            count: Le nombre de documents à télécharger
+            recent_filings: La liste des documents récents, si elle a déjà été récupérée
+        
+        Returns:
+            Tuple[List[str], int]: Les répertoires des documents, du plus récent au plus
+            ancien, et le nombre de documents déjà présents qui n'ont pas été téléchargés
+        """
+        ticker = ticker.upper()
+        if recent_filings is None:
+            recent_filings = self.get_recent_filings(ticker)
+        
+        filings = [filing for filing in recent_filings if filing['form'] == filing_type][:count]
+        filing_dirs = []
+        skipped = 0
+        
+        for filing in filings:
+            filing_dir, downloaded = self._fetch_filing(ticker, filing)
+            filing_dirs.append(filing_dir)
+            if not downloaded:
+                skipped += 1
+        
+        self._update_manifest(ticker, filings)
+        return filing_dirs, skipped
+    
     def download_filing(self, ticker: str, filing_type: str = '10-K', count: int = 1) -> str:
         """
         Télécharge un document financier depuis EDGAR.
@@ -55,98 +651,123 @@ class EdgarIntegration:
             ticker: Le symbole boursier de l'entreprise
             filing_type: Le type de document (10-K, 10-Q, etc.)
             count: Le nombre de documents à télécharger
-            
+        
         Returns:
             str: Le chemin vers le répertoire contenant les documents téléchargés
         """
         ticker = ticker.upper()
         
-        if ticker not in self.ticker_to_cik:
-            logger.error(f"Ticker inconnu: {ticker}")
-            raise ValueError(f"Ticker inconnu: {ticker}")
-        
         logger.info(f"Téléchargement du document {filing_type} pour {ticker}")
         
         try:
-            # Définir le répertoire de sortie
-            self.downloader.set_output_dir(self.data_dir)
-            
-            # Télécharger le document
-            self.downloader.get(filing_type, ticker, count)
+            filing_dirs, _ = self._download_filings(ticker, filing_type, count)
             
             # Construire le chemin vers le répertoire des documents téléchargés
-            output_dir = os.path.join(self.data_dir, "sec-edgar-filings", ticker, filing_type)
+            output_dir = os.path.join(self.filings_dir, ticker, filing_type)
             
-            if not os.path.exists(output_dir):
-                logger.error(f"Le téléchargement a échoué. Le répertoire {output_dir} n'existe pas.")
-                raise FileNotFoundError(f"Le téléchargement a échoué. Le répertoire {output_dir} n'existe pas.")
+            if not filing_dirs:
+                logger.error(f"Le téléchargement a échoué. Aucun document {filing_type} trouvé pour {ticker}.")
+                raise FileNotFoundError(f"Le téléchargement a échoué. Aucun document {filing_type} trouvé pour {ticker}.")
             
             logger.info(f"Document téléchargé avec succès dans {output_dir}")
             return output_dir
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors du téléchargement du document: {str(e)}")
             raise
     
-    def extract_text_from_filing(self, filing_dir: str) -> str:
+    def bulk_download(self, tickers: Iterable[str], filing_types: Iterable[str] = ('10-K',), count: int = 1,
+                      max_workers: int = EDGAR_DOWNLOAD_WORKERS) -> Dict[str, Dict]:
+        """
+        Télécharge les documents de plusieurs entreprises en parallèle.
+        Toutes les requêtes partagent le même seau à jetons, de sorte que la limite de
+        taux de l'API EDGAR est respectée quel que soit le nombre de threads. Les documents
+        déjà présents sur disque ne sont pas téléchargés à nouveau : relancer l'appel après
+        une erreur reprend là où il s'était arrêté.
+        
+        Args:
+            tickers: Les symboles boursiers des entreprises
+            filing_types: Les types de documents (10-K, 10-Q, etc.)
+            count: Le nombre de documents à télécharger par type
+            max_workers: Le nombre d'entreprises traitées simultanément
+        
+        Returns:
+            Dict: Le résultat pour chaque ticker : succès, répertoires des documents par type,
+            nombre de documents téléchargés et déjà présents, et message d'erreur éventuel
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        filing_types = list(filing_types)
+        
+        logger.info(f"Téléchargement de {len(tickers)} entreprises ({', '.join(filing_types)}) sur {max_workers} threads")
+        
+        def download_company(ticker: str) -> Dict:
+            result = {'success': True, 'filings': {}, 'downloaded': 0, 'skipped': 0, 'message': None}
+            try:
+                # Une seule requête d'index par entreprise, quel que soit le nombre de types
+                recent_filings = self.get_recent_filings(ticker)
+                for filing_type in filing_types:
+                    filing_dirs, skipped = self._download_filings(ticker, filing_type, count, recent_filings)
+                    result['filings'][filing_type] = filing_dirs
+                    result['downloaded'] += len(filing_dirs) - skipped
+                    result['skipped'] += skipped
+            except Exception as e:
+                logger.error(f"Erreur lors du téléchargement des documents de {ticker}: {str(e)}")
+                result['success'] = False
+                result['message'] = str(e)
+            return result
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = dict(zip(tickers, executor.map(download_company, tickers)))
+        
+        failed = [ticker for ticker, result in results.items() if not result['success']]
+        logger.info(f"Téléchargement terminé: {len(tickers) - len(failed)} réussis, {len(failed)} échecs")
+        return results
+    
+    def extract_text_from_filing(self, filing_dir: str, facts: Optional[InlineXBRLFacts] = None) -> str:
         """
         Extrait le texte d'un document financier.
         
         Args:
             filing_dir: Le chemin vers le répertoire contenant le document
-            
+            facts: Collecteur des faits XBRL intégrés, rempli pendant le même parcours
+        
         Returns:
             str: Le texte extrait du document
         """
         logger.info(f"Extraction du texte depuis {filing_dir}")
         
         try:
-            # Trouver le fichier HTML complet
-            html_files = [f for f in os.listdir(filing_dir) if f.endswith('.html') and not f.startswith('filing-details')]
-            
-            if not html_files:
-                logger.error(f"Aucun fichier HTML trouvé dans {filing_dir}")
-                raise FileNotFoundError(f"Aucun fichier HTML trouvé dans {filing_dir}")
-            
-            # Utiliser le premier fichier HTML trouvé
-            html_file = os.path.join(filing_dir, html_files[0])
-            
-            # Lire le fichier HTML
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Extraire le texte avec BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Choisir le document principal du dépôt
+            html_file = select_primary_document(filing_dir)
             
-            # Supprimer les balises script et style
-            for script in soup(["script", "style"]):
-                script.extract()
+            # Extraire le texte ligne par ligne avec lxml
+            text = '\n'.join(iter_html_lines(html_file, facts))
             
-            # Obtenir le texte
-            text = soup.get_text()
-            
-            # Nettoyer le texte
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            logger.info(f"Texte extrait avec succès ({len(text)} caractères)")
+            logger.info(f"Texte extrait avec succès de {os.path.basename(html_file)} ({len(text)} caractères)")
             return text
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction du texte: {str(e)}")
             raise
     
-    def extract_financial_data(self, text: str) -> Dict[str, Dict[str, float]]:
+    def extract_financial_data(self, text: str, facts: Optional[InlineXBRLFacts] = None) -> Dict[str, Dict[str, float]]:
         """
-        Extrait les données financières du texte.
+        Extrait les données financières d'un document. Les faits XBRL intégrés sont
+        utilisés en priorité ; le texte n'est analysé que si le document n'en contient pas.
         
         Args:
             text: Le texte du document financier
-            
+            facts: Les faits XBRL intégrés collectés pendant l'extraction du texte
+        
         Returns:
             Dict: Les données financières extraites
         """
+        if facts is not None:
+            financial_data = facts.metrics()
+            if financial_data:
+                logger.info(f"Données financières extraites des faits XBRL: {financial_data}")
+                return financial_data
+        
         logger.info("Extraction des données financières du texte")
         
         financial_data = {
@@ -157,7 +778,7 @@ class EdgarIntegration:
         
         try:
             # Extraire les revenus
-            revenue_pattern = r'(Total net sales|Total revenue|Net sales|Revenue)\s+([0-9,]+)\s+([0-9,]+)\s+([0-9,]+)'
+            revenue_pattern = r'(Total net sales|Total revenue|Net sales|Revenue)\s+\$?([0-9,]+)\s+\$?([0-9,]+)\s+\$?([0-9,]+)'
             revenue_match = re.search(revenue_pattern, text)
             
             if revenue_match:
@@ -184,7 +805,7 @@ class EdgarIntegration:
                         pass
             
             # Extraire le bénéfice net
-            income_pattern = r'Net income\s+([0-9,]+)\s+([0-9,]+)\s+([0-9,]+)'
+            income_pattern = r'Net income\s+\$?([0-9,]+)\s+\$?([0-9,]+)\s+\$?([0-9,]+)'
             income_match = re.search(income_pattern, text)
             
             if income_match:
@@ -199,24 +820,43 @@ class EdgarIntegration:
             
             logger.info(f"Données financières extraites avec succès: {financial_data}")
             return financial_data
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction des données financières: {str(e)}")
             raise
     
-    def save_extracted_text(self, ticker: str, text: str) -> str:
+    def get_output_files(self, ticker: str, filing_type: str = '10-K') -> Tuple[str, str]:
+        """
+        Retourne les chemins des fichiers de texte et de données financières d'une entreprise,
+        propres à chaque type de document (les noms des fichiers 10-K sont inchangés).
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+            filing_type: Le type de document (10-K, 10-Q, etc.)
+        
+        Returns:
+            Tuple[str, str]: Les chemins vers les fichiers de texte et de données financières
+        """
+        ticker = ticker.lower()
+        form = re.sub(r'[^0-9a-z]', '', filing_type.lower())
+        return (
+            os.path.join(DATA_DIR, f"{ticker}_{form}_extracted.txt"),
+            os.path.join(DATA_DIR, f"{ticker}_financials.json" if form == '10k' else f"{ticker}_{form}_financials.json")
+        )
+    
+    def save_extracted_text(self, ticker: str, text: str, filing_type: str = '10-K') -> str:
         """
         Sauvegarde le texte extrait dans un fichier.
         
         Args:
             ticker: Le symbole boursier de l'entreprise
             text: Le texte à sauvegarder
-            
+            filing_type: Le type du document extrait
+        
         Returns:
             str: Le chemin vers le fichier sauvegardé
         """
-        ticker = ticker.lower()
-        output_file = os.path.join(DATA_DIR, f"{ticker}_10k_extracted.txt")
+        output_file = self.get_output_files(ticker, filing_type)[0]
         
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
@@ -224,28 +864,26 @@ class EdgarIntegration:
             
             logger.info(f"Texte sauvegardé dans {output_file}")
             return output_file
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du texte: {str(e)}")
             raise
     
-    def save_financial_data(self, ticker: str, data: Dict[str, Dict[str, float]]) -> str:
+    def save_financial_data(self, ticker: str, data: Dict[str, Dict[str, float]], filing_type: str = '10-K') -> str:
         """
         Sauvegarde les données financières dans un fichier JSON.
         
         Args:
             ticker: Le symbole boursier de l'entreprise
             data: Les données financières à sauvegarder
-            
+            filing_type: Le type du document extrait
+        
         Returns:
             str: Le chemin vers le fichier sauvegardé
         """
-        ticker = ticker.lower()
-        output_file = os.path.join(DATA_DIR, f"{ticker}_financials.json")
+        output_file = self.get_output_files(ticker, filing_type)[1]
         
         try:
-            import json
-            
             # Convertir les clés d'année en chaînes pour la sérialisation JSON
             serializable_data = {}
             for metric, years_data in data.items():
@@ -260,11 +898,132 @@ class EdgarIntegration:
             
             logger.info(f"Données financières sauvegardées dans {output_file}")
             return output_file
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde des données financières: {str(e)}")
             raise
     
+    def process_filing(self, ticker: str, filing_dir: str, filing_type: str = '10-K') -> Tuple[str, str]:
+        """
+        Extrait et sauvegarde le texte et les données financières d'un document téléchargé.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+            filing_dir: Le chemin vers le répertoire contenant le document
+            filing_type: Le type du document, qui détermine les fichiers produits
+        
+        Returns:
+            Tuple[str, str]: Les chemins vers les fichiers de texte et de données financières
+        """
+        # Extraire le texte et les faits XBRL intégrés en un seul parcours
+        facts = InlineXBRLFacts()
+        text = self.extract_text_from_filing(filing_dir, facts)
+        
+        # Sauvegarder le texte
+        text_file = self.save_extracted_text(ticker, text, filing_type)
+        
+        # Extraire les données financières
+        financial_data = self.extract_financial_data(text, facts)
+        
+        # Sauvegarder les données financières
+        data_file = self.save_financial_data(ticker, financial_data, filing_type)
+        
+        return text_file, data_file
+    
+    def sync_company(self, ticker: str, filing_type: str = '10-K', count: int = 1,
+                     recent_filings: Optional[List[Dict[str, str]]] = None) -> Dict:
+        """
+        Synchronise les documents d'une entreprise avec EDGAR. Seuls les dépôts plus récents
+        que le dernier numéro d'enregistrement du manifeste sont téléchargés, et le document le
+        plus récent de ce type n'est extrait que s'il ne l'a pas déjà été : sans nouveau dépôt, la
+        synchronisation se limite à la requête d'index.
+        
+        Args:
+            ticker: Le symbole boursier de l'entreprise
+            filing_type: Le type de document (10-K, 10-Q, etc.)
+            count: Le nombre de documents à télécharger lors de la première synchronisation
+            recent_filings: La liste des documents récents, si elle a déjà été récupérée
+        
+        Returns:
+            Dict: Les répertoires des nouveaux documents, un booléen indiquant si le document le
+            plus récent a été extrait, et les chemins vers les fichiers de texte et de données
+        """
+        ticker = ticker.upper()
+        if recent_filings is None:
+            recent_filings = self.get_recent_filings(ticker)
+        
+        filings = [filing for filing in recent_filings if filing['form'] == filing_type]
+        if not filings:
+            raise FileNotFoundError(f"Aucun document {filing_type} trouvé pour {ticker}")
+        
+        # Parcourir les dépôts du plus récent au plus ancien jusqu'au dernier déjà connu
+        entry = self.get_manifest_entry(ticker)
+        known = entry['filings'].get(filing_type, {})
+        last_seen = max(known.values(), default='')
+        new_filings = []
+        for filing in filings:
+            if filing['accession_number'] in known or filing['filing_date'] < last_seen:
+                break
+            new_filings.append(filing)
+        if not known:
+            new_filings = new_filings[:count]
+        
+        new_dirs = [self._fetch_filing(ticker, filing)[0] for filing in new_filings]
+        self._update_manifest(ticker, new_filings)
+        
+        # Extraire le document le plus récent de ce type s'il ne l'a pas déjà été
+        latest = filings[0]
+        text_file, data_file = self.get_output_files(ticker, filing_type)
+        processed = (
+            entry['processed'].get(filing_type) != latest['accession_number']
+            or not os.path.exists(text_file) or not os.path.exists(data_file)
+        )
+        if processed:
+            filing_dir, _ = self._fetch_filing(ticker, latest)
+            text_file, data_file = self.process_filing(ticker, filing_dir, filing_type)
+            self._update_manifest(ticker, [latest], processed=latest)
+        
+        logger.info(f"Synchronisation de {ticker} ({filing_type}): {len(new_dirs)} nouveaux documents")
+        return {
+            'new_filings': new_dirs,
+            'processed': processed,
+            'text_file': text_file,
+            'data_file': data_file
+        }
+    
+    def sync_all(self, tickers: Optional[Iterable[str]] = None, filing_type: str = '10-K',
+                 max_workers: int = EDGAR_DOWNLOAD_WORKERS) -> Dict[str, Dict]:
+        """
+        Synchronise les documents de plusieurs entreprises en parallèle, une requête d'index
+        par entreprise lorsqu'aucun nouveau document n'a été déposé.
+        
+        Args:
+            tickers: Les symboles boursiers des entreprises (par défaut, toutes celles couvertes)
+            filing_type: Le type de document (10-K, 10-Q, etc.)
+            max_workers: Le nombre d'entreprises traitées simultanément
+        
+        Returns:
+            Dict: Le résultat de sync_company pour chaque ticker, avec un indicateur de
+            succès et le message d'erreur éventuel
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in (tickers or self.ticker_to_cik)))
+        
+        def sync(ticker: str) -> Dict:
+            try:
+                result = self.sync_company(ticker, filing_type)
+                result.update(success=True, message=None)
+            except Exception as e:
+                logger.error(f"Erreur lors de la synchronisation de {ticker}: {str(e)}")
+                result = {'success': False, 'message': str(e)}
+            return result
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = dict(zip(tickers, executor.map(sync, tickers)))
+        
+        updated = [ticker for ticker, result in results.items() if result.get('new_filings')]
+        logger.info(f"Synchronisation terminée: {len(updated)} entreprises avec de nouveaux documents")
+        return results
+    
     def process_company(self, ticker: str, filing_type: str = '10-K') -> Tuple[str, str]:
         """
         Traite les documents financiers d'une entreprise.
@@ -272,34 +1031,19 @@ class EdgarIntegration:
         Args:
             ticker: Le symbole boursier de l'entreprise
             filing_type: Le type de document (10-K, 10-Q, etc.)
-            
+        
         Returns:
             Tuple[str, str]: Les chemins vers les fichiers de texte et de données financières
         """
         logger.info(f"Traitement des documents financiers pour {ticker}")
         
         try:
-            # Respecter la limite de taux de l'API EDGAR
-            time.sleep(1 / EDGAR_RATE_LIMIT)
-            
-            # Télécharger le document
-            filing_dir = self.download_filing(ticker, filing_type)
-            
-            # Extraire le texte
-            text = self.extract_text_from_filing(filing_dir)
-            
-            # Sauvegarder le texte
-            text_file = self.save_extracted_text(ticker, text)
-            
-            # Extraire les données financières
-            financial_data = self.extract_financial_data(text)
-            
-            # Sauvegarder les données financières
-            data_file = self.save_financial_data(ticker, financial_data)
+            # Ne télécharger et n'extraire que ce qui est nouveau depuis la dernière synchronisation
+            result = self.sync_company(ticker, filing_type)
             
             logger.info(f"Traitement terminé pour {ticker}")
-            return text_file, data_file
-            
+            return result['text_file'], result['data_file']
+        
         except Exception as e:
             logger.error(f"Erreur lors du traitement des documents pour {ticker}: {str(e)}")
             raise
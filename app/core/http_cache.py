@@ -0,0 +1,271 @@
+"""
+Module pour les requêtes HTTP mises en cache sur disque.
+Ce module fournit une session HTTP partagée (connexions maintenues ouvertes) et un cache
+des réponses revalidé par ETag / If-Modified-Since une fois le délai de fraîcheur écoulé.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.config import EDGAR_USER_AGENT, SEC_HTTP_CACHE_DIR, SEC_HTTP_CACHE_MAX_BYTES, SEC_SEARCH_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+# En-têtes de réponse conservés avec le contenu mis en cache
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Délai, en secondes, après lequel le répertoire du cache est de nouveau parcouru pour
+# recalculer sa taille (écritures des autres processus)
+EVICTION_SCAN_INTERVAL = 300
+
+
+class HTTPCache:
+    """
+    Cache HTTP sur disque. Chaque réponse est stockée dans deux fichiers, le contenu
+    (<empreinte de l'URL>.body) et ses métadonnées (<empreinte de l'URL>.json).
+    """
+    
+    def __init__(self, cache_dir: str = SEC_HTTP_CACHE_DIR, max_age: int = SEC_SEARCH_MAX_AGE,
+                 max_bytes: int = SEC_HTTP_CACHE_MAX_BYTES, user_agent: str = EDGAR_USER_AGENT):
+        """
+        Initialise le cache.
+        
+        Args:
+            cache_dir: Répertoire du cache
+            max_age: Durée, en secondes, pendant laquelle une réponse est servie sans revalidation
+            max_bytes: Taille maximale des contenus en cache
+            user_agent: User-Agent envoyé avec chaque requête
+        """
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        
+        # Taille des contenus en cache, tenue à jour à chaque écriture ; None avant le premier parcours
+        self._total_bytes = None
+        self._scanned_at = 0.0
+        
+        # Session partagée : les connexions TLS sont réutilisées d'une requête à l'autre
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': user_agent, 'Accept-Encoding': 'gzip, deflate'})
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=10))
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=10))
+    
+    def _paths(self, url: str):
+        """
+        Retourne les chemins du contenu et des métadonnées d'une URL.
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.body"), os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _load(self, url: str) -> Optional[Dict]:
+        """
+        Lit les métadonnées d'une URL en cache, ou None si elle n'y est pas.
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if meta.get('url') != url or not os.path.exists(body_path):
+            return None
+        return meta
+    
+    def _write_atomic(self, path: str, data: bytes):
+        """
+        Écrit un fichier via un fichier temporaire renommé, pour ne jamais laisser de fichier partiel.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _store(self, url: str, response: requests.Response):
+        """
+        Met une réponse en cache, sauf si le serveur l'interdit.
+        """
+        if 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return
+        
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'fetched_at': time.time(),
+            'encoding': response.encoding,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        }
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            try:
+                previous_size = os.stat(body_path).st_size
+            except OSError:
+                previous_size = 0
+            
+            # Le contenu d'abord : des métadonnées présentes impliquent un contenu complet
+            self._write_atomic(body_path, response.content)
+            self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            self._add_bytes(len(response.content) - previous_size)
+        except OSError as e:
+            logger.warning(f"Impossible de mettre en cache {url}: {str(e)}")
+    
+    def _touch(self, url: str, meta: Dict):
+        """
+        Enregistre une revalidation réussie : la réponse en cache redevient fraîche.
+        """
+        meta['fetched_at'] = time.time()
+        try:
+            self._write_atomic(self._paths(url)[1], json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Impossible de mettre à jour le cache de {url}: {str(e)}")
+    
+    def _add_bytes(self, delta: int):
+        """
+        Met à jour la taille du cache après une écriture. Le répertoire n'est parcouru
+        (voir _evict) qu'au-delà de max_bytes, au premier appel, ou toutes les
+        EVICTION_SCAN_INTERVAL secondes pour tenir compte des autres processus.
+        """
+        with self.lock:
+            if self._total_bytes is not None:
+                self._total_bytes += delta
+            scan = (
+                self._total_bytes is None
+                or self._total_bytes > self.max_bytes
+                or time.monotonic() - self._scanned_at > EVICTION_SCAN_INTERVAL
+            )
+        
+        if scan:
+            self._evict()
+    
+    def _evict(self):
+        """
+        Parcourt le répertoire du cache pour recalculer sa taille, et supprime les
+        réponses les moins récemment utilisées au-delà de max_bytes.
+        """
+        with self.lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.body'):
+                    continue
+                body_path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(body_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, body_path))
+                total += stat.st_size
+            
+            for _, size, body_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in (body_path, body_path[:-len('.body')] + '.json'):
+                    if os.path.exists(path):
+                        os.remove(path)
+                total -= size
+            
+            self._total_bytes = total
+            self._scanned_at = time.monotonic()
+    
+    def _cached_response(self, url: str, meta: Dict) -> requests.Response:
+        """
+        Construit une réponse à partir du contenu en cache.
+        """
+        body_path, _ = self._paths(url)
+        with open(body_path, 'rb') as f:
+            content = f.read()
+        # Marquer l'utilisation pour l'éviction
+        os.utime(body_path)
+        
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = content
+        response.encoding = meta.get('encoding')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.from_cache = True
+        return response
+    
+    def get(self, url: str, max_age: Optional[int] = None, timeout: int = 30) -> requests.Response:
+        """
+        Effectue une requête GET en passant par le cache. Une réponse plus récente que
+        max_age est servie sans requête ; au-delà, elle est revalidée auprès du serveur,
+        qui ne renvoie le contenu que s'il a changé (304 sinon).
+        
+        Args:
+            url: L'URL à récupérer
+            max_age: Fraîcheur en secondes (par défaut, celle du cache)
+            timeout: Délai d'attente de la requête, en secondes
+        
+        Returns:
+            requests.Response: La réponse, avec l'attribut from_cache
+        """
+        max_age = self.max_age if max_age is None else max_age
+        meta = self._load(url)
+        
+        if meta and time.time() - meta['fetched_at'] < max_age:
+            try:
+                logger.debug(f"Réponse fraîche en cache pour {url}")
+                return self._cached_response(url, meta)
+            except OSError:
+                # Contenu supprimé entre-temps (éviction par un autre processus)
+                meta = None
+        
+        # Requête conditionnelle si une version est déjà en cache
+        headers = {}
+        if meta:
+            if 'ETag' in meta['headers']:
+                headers['If-None-Match'] = meta['headers']['ETag']
+            if 'Last-Modified' in meta['headers']:
+                headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+        
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            if meta:
+                logger.warning(f"Serveur injoignable pour {url}, utilisation du cache: {str(e)}")
+                try:
+                    return self._cached_response(url, meta)
+                except OSError:
+                    # Contenu supprimé entre-temps : l'erreur réseau d'origine est transmise
+                    pass
+            raise
+        
+        if response.status_code == 304 and meta:
+            logger.debug(f"Réponse en cache revalidée pour {url}")
+            self._touch(url, meta)
+            try:
+                return self._cached_response(url, meta)
+            except OSError:
+                # Contenu supprimé entre-temps : nouvelle requête, sans condition
+                response = self.session.get(url, timeout=timeout)
+        
+        if response.status_code == 200:
+            self._store(url, response)
+        
+        response.from_cache = False
+        return response
+
+
+# Créer une instance du cache HTTP
+http_cache = HTTPCache()
@@ -0,0 +1,283 @@
+"""
+Module pour le traitement des fichiers PDF en arrière-plan.
+Ce module fournit une file de tâches qui exécute le traitement des PDF dans un pool borné,
+afin que les requêtes HTTP n'attendent pas la fin de l'extraction et de l'OCR. L'état des
+tâches est stocké dans une base SQLite, consultable par tous les processus de l'application.
+"""
+
+import os
+import sys
+import logging
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.config import LOGS_DIR, PDF_CACHE_PATH, PDF_JOB_WORKERS, PDF_JOB_MAX_PENDING, PDF_JOB_TTL
+from app.core.pdf_processor import pdf_processor
+
+# Configuration du logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(LOGS_DIR, 'pdf_processor.log')),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Champs de l'état d'une tâche, dans l'ordre des colonnes de la table jobs
+JOB_FIELDS = (
+    'job_id', 'filename', 'status', 'stage', 'pages_done', 'pages_total',
+    'text_file', 'data_file', 'financial_data', 'message', 'created_at', 'finished_at'
+)
+
+
+class QueueFullError(Exception):
+    """
+    Levée lorsque la file de tâches a atteint sa capacité maximale.
+    """
+    pass
+
+
+class PDFJobManager:
+    """
+    Classe pour gérer les tâches de traitement des PDF en arrière-plan.
+    Les tâches s'exécutent dans le processus qui les a reçues ; leur état est stocké
+    dans une base SQLite partagée, pour que tout processus puisse répondre au suivi.
+    """
+    
+    def __init__(self, processor=None, max_workers: int = PDF_JOB_WORKERS,
+                 max_pending: int = PDF_JOB_MAX_PENDING, job_ttl: int = PDF_JOB_TTL,
+                 db_path: str = PDF_CACHE_PATH):
+        """
+        Initialise le gestionnaire de tâches.
+        
+        Args:
+            processor: Processeur PDF utilisé par les tâches (par défaut, l'instance partagée)
+            max_workers: Nombre de tâches traitées simultanément
+            max_pending: Nombre maximal de tâches en attente ou en cours, tous processus confondus
+            job_ttl: Durée de conservation des tâches terminées, en secondes ; une tâche
+                en cours d'exécution sans progression depuis cette durée est considérée
+                comme interrompue (une tâche en attente d'un thread ne l'est jamais)
+            db_path: Chemin vers la base SQLite de l'état des tâches
+        """
+        self.processor = processor or pdf_processor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.db_path = db_path
+        
+        self.lock = threading.Lock()
+        self._executor = None
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion à la base, en créant la table des tâches si nécessaire.
+        Une connexion par opération : elles ne doivent pas être partagées entre threads.
+        """
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    pages_done INTEGER NOT NULL DEFAULT 0,
+                    pages_total INTEGER,
+                    text_file TEXT,
+                    data_file TEXT,
+                    financial_data TEXT,
+                    message TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+            """)
+            self._initialized = True
+        return conn
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Crée le pool à la première tâche, pour ne pas démarrer de threads à l'import.
+        """
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pdf-job')
+            return self._executor
+    
+    def submit(self, pdf_path: str, filename: Optional[str] = None) -> str:
+        """
+        Ajoute le traitement d'un PDF à la file et retourne immédiatement.
+        
+        Args:
+            pdf_path: Chemin vers le fichier PDF
+            filename: Nom du fichier tel que téléchargé
+        
+        Returns:
+            Identifiant de la tâche
+        
+        Raises:
+            QueueFullError: Si trop de tâches sont en attente ou en cours
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        
+        with closing(self._connect()) as conn, conn:
+            # Verrou d'écriture : le comptage et l'insertion sont atomiques entre processus
+            conn.execute("BEGIN IMMEDIATE")
+            self._clean_jobs(conn)
+            
+            active = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if active >= self.max_pending:
+                raise QueueFullError(f"Trop de documents en cours de traitement ({active})")
+            
+            conn.execute(
+                "INSERT INTO jobs (job_id, filename, status, pages_done, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', 0, ?, ?)",
+                (job_id, filename or os.path.basename(pdf_path), now, now)
+            )
+        
+        self._get_executor().submit(self._run, job_id, pdf_path)
+        logger.info(f"Tâche {job_id} ajoutée à la file pour {pdf_path}")
+        return job_id
+    
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'état d'une tâche, quel que soit le processus qui l'exécute.
+        
+        Args:
+            job_id: Identifiant de la tâche
+        
+        Returns:
+            État de la tâche, ou None si elle n'existe pas
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        job = dict(zip(JOB_FIELDS, row))
+        if job['financial_data'] is not None:
+            job['financial_data'] = json.loads(job['financial_data'])
+        return job
+    
+    def _update(self, job_id: str, **fields: Any):
+        """
+        Met à jour l'état d'une tâche.
+        """
+        if 'financial_data' in fields:
+            fields['financial_data'] = json.dumps(fields['financial_data'])
+        fields['updated_at'] = time.time()
+        
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE job_id = ?",
+                    (*fields.values(), job_id)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Mise à jour de la tâche {job_id} impossible ({self.db_path}): {str(e)}")
+    
+    def _start(self, job_id: str) -> bool:
+        """
+        Passe une tâche en attente à l'état en cours, lorsqu'un thread du pool la prend en charge.
+        
+        Returns:
+            bool: False si la tâche n'est plus en attente (par exemple déjà marquée comme échouée)
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                return conn.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ? AND status = 'queued'",
+                    (time.time(), job_id)
+                ).rowcount == 1
+        except sqlite3.Error as e:
+            # Base indisponible : traiter le document, comme pour les autres mises à jour
+            logger.warning(f"Mise à jour de la tâche {job_id} impossible ({self.db_path}): {str(e)}")
+            return True
+    
+    def _run(self, job_id: str, pdf_path: str):
+        """
+        Exécute une tâche dans le pool et enregistre son résultat.
+        """
+        if not self._start(job_id):
+            logger.warning(f"Tâche {job_id} ignorée: elle n'est plus en attente")
+            return
+        
+        def progress(stage: str, done: int, total: int):
+            self._update(job_id, stage=stage, pages_done=done, pages_total=total)
+        
+        try:
+            text_file, data_file = self.processor.process_pdf(pdf_path, progress=progress)
+            
+            # Lire les données financières extraites
+            with open(data_file, 'r') as f:
+                financial_data = json.load(f)
+            
+            self._update(
+                job_id,
+                status='done',
+                text_file=text_file,
+                data_file=data_file,
+                financial_data=financial_data,
+                finished_at=time.time()
+            )
+            logger.info(f"Tâche {job_id} terminée")
+        except Exception as e:
+            logger.error(f"Erreur lors de la tâche {job_id}: {str(e)}")
+            self._update(
+                job_id,
+                status='failed',
+                message=f"Erreur lors du traitement du document: {str(e)}",
+                finished_at=time.time()
+            )
+    
+    def _clean_jobs(self, conn: sqlite3.Connection):
+        """
+        Supprime les tâches terminées depuis plus de job_ttl secondes, et marque comme
+        échouées les tâches en cours sans progression depuis job_ttl secondes (processus
+        arrêté). Les tâches en attente ne sont pas concernées : leur updated_at date de
+        la mise en file, et elles peuvent attendre un thread libre plus longtemps que job_ttl.
+        Doit être appelée dans une transaction.
+        """
+        now = time.time()
+        expiry = now - self.job_ttl
+        
+        interrupted = conn.execute(
+            "UPDATE jobs SET status = 'failed', message = ?, finished_at = ?, updated_at = ? "
+            "WHERE status = 'running' AND updated_at < ?",
+            ("Traitement interrompu", now, now, expiry)
+        ).rowcount
+        expired = conn.execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (expiry,)
+        ).rowcount
+        
+        if interrupted:
+            logger.warning(f"Tâches interrompues: {interrupted} tâches sans progression")
+        if expired:
+            logger.debug(f"Tâches nettoyées: {expired} tâches supprimées")
+
+
+# Créer une instance du gestionnaire de tâches
+pdf_job_manager = PDFJobManager()
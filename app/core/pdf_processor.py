@@ -10,14 +10,26 @@ import re
 import json
 import hashlib
 import time
-from typing import Dict, Any, Tuple, List, Optional
+import sqlite3
+import threading
+from typing import Dict, Any, Tuple, List, Optional, Union, Callable
 from datetime import datetime
 import functools
+import itertools
+import multiprocessing
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
 
 # Ajouter le répertoire parent au chemin d'importation
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from app.config import DATA_DIR, LOGS_DIR
+from app.config import (
+    DATA_DIR, LOGS_DIR, PDF_EXTRACTION_WORKERS, PDF_TASKS_PER_WORKER,
+    PDF_OCR_WORKERS, PDF_OCR_MAX_PAGES_IN_FLIGHT, PDF_OCR_WINDOW, PDF_OCR_MIN_PAGE_CHARS,
+    PDF_CACHE_PATH, PDF_CACHE_MAX_BYTES
+)
 
 # Configuration du logging
 logging.basicConfig(
@@ -31,7 +43,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 try:
-    from pdfminer.high_level import extract_text
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
     from pdfminer.pdfparser import PDFSyntaxError
     HAS_PDFMINER = True
 except ImportError:
@@ -39,7 +54,7 @@ except ImportError:
     HAS_PDFMINER = False
 
 try:
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, pdfinfo_from_path
     import pytesseract
     HAS_OCR = True
 except ImportError:
@@ -47,23 +62,39 @@ except ImportError:
     HAS_OCR = False
 
 
-# Cache pour les résultats d'extraction de texte
-@functools.lru_cache(maxsize=20)
+# Version des règles d'extraction : l'incrémenter invalide le cache disque
+EXTRACTION_VERSION = 2
+
+# Facteurs de conversion vers les millions, indexés par la première lettre de l'unité
+UNIT_SCALES = {'t': 0.001, 'k': 0.001, 'm': 1.0, 'b': 1000.0}
+
+
 def get_pdf_hash(pdf_path: str) -> str:
     """
-    Calcule le hash MD5 d'un fichier PDF.
-    Utilise un cache pour éviter de recalculer le hash à chaque appel.
+    Calcule l'empreinte SHA-256 du contenu d'un fichier PDF.
+    Le cache est indexé sur la taille et la date de modification du fichier,
+    pour qu'un fichier remplacé sous le même nom soit haché à nouveau.
     
     Args:
         pdf_path: Chemin vers le fichier PDF
         
     Returns:
-        Hash MD5 du fichier PDF
+        Empreinte SHA-256 du fichier PDF
     """
     if not os.path.exists(pdf_path):
         return ""
     
-    hasher = hashlib.md5()
+    stat = os.stat(pdf_path)
+    return _hash_file(pdf_path, stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _hash_file(pdf_path: str, size: int, mtime_ns: int) -> str:
+    """
+    Hache un fichier par blocs. La taille et la date de modification ne servent
+    qu'à la clé du cache.
+    """
+    hasher = hashlib.sha256()
     with open(pdf_path, 'rb') as f:
         buf = f.read(65536)  # Lire par blocs de 64k
         while len(buf) > 0:
@@ -73,6 +104,325 @@ def get_pdf_hash(pdf_path: str) -> str:
     return hasher.hexdigest()
 
 
+class PDFExtractionCache:
+    """
+    Cache disque des extractions, indexé par l'empreinte du contenu des PDF.
+    Stocké dans une base SQLite, il survit aux redémarrages et peut être partagé
+    entre processus. La taille totale est bornée par une éviction LRU.
+    """
+    
+    def __init__(self, db_path: str = PDF_CACHE_PATH, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        """
+        Initialise le cache.
+        
+        Args:
+            db_path: Chemin vers la base SQLite du cache
+            max_bytes: Taille maximale des entrées stockées, en octets
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion à la base, en la créant si nécessaire.
+        Une connexion par opération : elles ne doivent pas être partagées entre processus.
+        """
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS entries (
+                    digest TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    pages TEXT,
+                    financial_data TEXT,
+                    artifacts TEXT,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+            """)
+            
+            # Ajouter la colonne des fichiers produits aux bases créées avant elle
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(entries)")]
+            if 'artifacts' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN artifacts TEXT")
+            self._initialized = True
+        return conn
+    
+    def file_digest(self, pdf_path: str) -> str:
+        """
+        Retourne l'empreinte du contenu d'un fichier. Si la taille et la date de
+        modification n'ont pas changé depuis le dernier hachage, même dans un autre
+        processus, l'empreinte enregistrée est réutilisée sans relire le fichier.
+        
+        Args:
+            pdf_path: Chemin vers le fichier PDF
+            
+        Returns:
+            Empreinte SHA-256 du fichier, ou une chaîne vide s'il n'existe pas
+        """
+        if not os.path.exists(pdf_path):
+            return ""
+        
+        path = os.path.abspath(pdf_path)
+        stat = os.stat(path)
+        
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (path, stat.st_size, stat.st_mtime_ns)
+                ).fetchone()
+                if row:
+                    return row[0]
+                
+                digest = _hash_file(path, stat.st_size, stat.st_mtime_ns)
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, digest)
+                )
+            return digest
+        except sqlite3.Error as e:
+            logger.warning(f"Cache disque indisponible ({self.db_path}): {str(e)}")
+            return _hash_file(path, stat.st_size, stat.st_mtime_ns)
+    
+    def remember_digest(self, pdf_path: str, digest: str):
+        """
+        Enregistre l'empreinte d'un fichier déjà calculée ailleurs, par exemple pendant
+        son téléchargement, pour éviter de le relire lors du prochain file_digest.
+        
+        Args:
+            pdf_path: Chemin vers le fichier PDF
+            digest: Empreinte SHA-256 du contenu du fichier
+        """
+        path = os.path.abspath(pdf_path)
+        stat = os.stat(path)
+        
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, digest)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture dans le cache disque impossible ({self.db_path}): {str(e)}")
+    
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Lit l'entrée associée à une empreinte et la marque comme récemment utilisée.
+        
+        Args:
+            digest: Empreinte du contenu du PDF
+            
+        Returns:
+            Dictionnaire avec les clés 'text', 'pages', 'financial_data' et 'artifacts'
+            (None si absentes), ou None si l'entrée n'existe pas
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT pages, financial_data, artifacts FROM entries WHERE digest = ? AND version = ?",
+                    (digest, EXTRACTION_VERSION)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE entries SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du cache disque impossible ({self.db_path}): {str(e)}")
+            return None
+        
+        pages, financial_data, artifacts = row
+        pages = json.loads(pages) if pages is not None else None
+        return {
+            'text': "".join(pages) if pages is not None else None,
+            'pages': pages,
+            'financial_data': json.loads(financial_data) if financial_data is not None else None,
+            'artifacts': json.loads(artifacts) if artifacts is not None else None
+        }
+    
+    def put(self, digest: str, **fields: Any):
+        """
+        Enregistre ou complète l'entrée associée à une empreinte, puis évince les
+        entrées les moins récemment utilisées si la taille maximale est dépassée.
+        
+        Args:
+            digest: Empreinte du contenu du PDF
+            **fields: Valeurs à enregistrer parmi 'pages', 'financial_data' et 'artifacts'
+                (le texte complet est la concaténation des pages)
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT pages, financial_data, artifacts FROM entries WHERE digest = ? AND version = ?",
+                    (digest, EXTRACTION_VERSION)
+                ).fetchone()
+                values = dict(zip(('pages', 'financial_data', 'artifacts'), row or (None, None, None)))
+                
+                for key, value in fields.items():
+                    values[key] = json.dumps(value)
+                size = sum(len(value.encode('utf-8')) for value in values.values() if value is not None)
+                
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (digest, version, pages, financial_data, artifacts, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (digest, EXTRACTION_VERSION, values['pages'], values['financial_data'], values['artifacts'],
+                     size, time.time())
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture dans le cache disque impossible ({self.db_path}): {str(e)}")
+    
+    def _evict(self, conn: sqlite3.Connection):
+        """
+        Supprime les entrées les moins récemment utilisées au-delà de la taille maximale.
+        """
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        evicted = 0
+        for digest, size in conn.execute("SELECT digest, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+            total -= size
+            evicted += 1
+        
+        logger.debug(f"Cache disque: {evicted} entrées évincées")
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """
+    Compte les pages d'un fichier PDF sans interpréter leur contenu.
+    
+    Args:
+        pdf_path: Chemin vers le fichier PDF
+        
+    Returns:
+        Nombre de pages du PDF
+    """
+    with open(pdf_path, 'rb') as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+
+def extract_page_range(pdf_path: str, first_page: int, last_page: int) -> List[str]:
+    """
+    Extrait le texte d'une plage de pages avec pdfminer, page par page.
+    Fonction de niveau module pour pouvoir être exécutée dans un processus séparé.
+    
+    Args:
+        pdf_path: Chemin vers le fichier PDF
+        first_page: Index de la première page (à partir de 0, inclus)
+        last_page: Index de la dernière page (exclu)
+        
+    Returns:
+        Liste des textes des pages, dans l'ordre, chacun terminé par un saut de page
+    """
+    resource_manager = PDFResourceManager(caching=True)
+    output = StringIO()
+    pages = []
+    
+    with open(pdf_path, 'rb') as f, TextConverter(resource_manager, output, laparams=LAParams()) as device:
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        for page in PDFPage.get_pages(f, pagenos=range(first_page, last_page)):
+            interpreter.process_page(page)
+            pages.append(output.getvalue())
+            output.seek(0)
+            output.truncate(0)
+    
+    return pages
+
+
+# Pool de processus d'extraction, partagé par tous les documents traités simultanément
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Retourne le pool de processus d'extraction, créé au premier appel. Le pool est
+    partagé par les tâches de traitement en arrière-plan : quel que soit le nombre de
+    documents traités simultanément, au plus workers processus extraient des pages.
+    Les processus sont démarrés par 'spawn' et non par fork, le processus appelant
+    ayant plusieurs threads.
+    
+    Args:
+        workers: Nombre de processus du pool, pris en compte à sa création
+        
+    Returns:
+        Le pool de processus partagé
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _extraction_pool
+
+
+def _discard_extraction_pool(pool: ProcessPoolExecutor):
+    """
+    Abandonne le pool partagé devenu inutilisable (processus terminé brutalement) ;
+    le suivant est créé au prochain appel à get_extraction_pool.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False)
+
+
+def split_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Découpe les pages d'un document en plages contiguës pour le pool de processus.
+    Chaque processus reçoit plusieurs plages afin d'absorber les pages plus lourdes.
+    
+    Args:
+        page_count: Nombre de pages du document
+        workers: Nombre de processus disponibles
+        
+    Returns:
+        Liste de plages (première page incluse, dernière page exclue)
+    """
+    tasks = max(1, workers * PDF_TASKS_PER_WORKER)
+    size = max(1, -(-page_count // tasks))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def split_ocr_windows(page_numbers: List[int], window: int) -> List[Tuple[int, int]]:
+    """
+    Regroupe les pages à traiter par OCR en fenêtres de pages consécutives,
+    pour rastériser chaque fenêtre en un seul appel à pdf2image.
+    
+    Args:
+        page_numbers: Index des pages à traiter (à partir de 0)
+        window: Nombre maximal de pages par fenêtre
+        
+    Returns:
+        Liste de fenêtres (première page incluse, dernière page exclue)
+    """
+    windows = []
+    for page_number in sorted(page_numbers):
+        if windows and windows[-1][1] == page_number and page_number - windows[-1][0] < window:
+            windows[-1] = (windows[-1][0], page_number + 1)
+        else:
+            windows.append((page_number, page_number + 1))
+    return windows
+
+
 class PDFProcessor:
     """
     Classe pour traiter les fichiers PDF et extraire des informations financières.
@@ -85,35 +435,183 @@ class PDFProcessor:
         self.extracted_dir = os.path.join(DATA_DIR, 'extracted')
         os.makedirs(self.extracted_dir, exist_ok=True)
         
-        # Modèles regex pour l'extraction de données financières
+        # Modèles regex pour l'extraction de données financières, par ordre de priorité.
+        # Le premier groupe capture la valeur, le second l'unité éventuelle. Les libellés
+        # sont sensibles à la casse, et les libellés d'état financier (Total revenue,
+        # Net sales, Net income) priment sur les mentions du texte courant (sales, net income).
         self.regex_patterns = {
             'revenue': [
-                r'(?:Total\s+)?(?:Net\s+)?(?:Revenue|Sales)(?:\s+was|\s+were|\s+of|\s+:|\s+\()?\s*(?:\$|USD)?\s*([\d,\.]+)\s*(?:million|billion|m|b|M|B)?',
-                r'(?:Revenue|Sales)(?:\s+was|\s+were|\s+of|\s+:|\s+\()?\s*(?:\$|USD)?\s*([\d,\.]+)\s*(?:million|billion|m|b|M|B)?'
+                r'(?-i:(?:[Tt]otal\s+(?:[Nn]et\s+)?|[Nn]et\s+)(?:[Rr]evenues?|[Ss]ales))(?:\s+was|\s+were|\s+of|\s*:|\s*\()?\s*(?:\$|USD)?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:(millions?|billions?|thousands?|[mbk])\b)?',
+                r'(?-i:[Rr]evenues?|[Ss]ales)(?:\s+was|\s+were|\s+of|\s*:|\s*\()?\s*(?:\$|USD)?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:(millions?|billions?|thousands?|[mbk])\b)?'
             ],
             'gross_margin': [
-                r'Gross\s+margin(?:\s+was|\s+of|\s+:|\s+\()?\s*([\d,\.]+)\s*%',
-                r'Gross\s+margin(?:\s+was|\s+of|\s+:|\s+\()?\s*([\d,\.]+)'
+                r'(?-i:[Gg]ross\s+margin)(?:\s+was|\s+of|\s*:|\s*\()?\s*(\d[\d,]*(?:\.\d+)?)\s*%',
+                r'(?-i:[Gg]ross\s+margin)(?:\s+was|\s+of|\s*:|\s*\()?\s*(\d[\d,]*(?:\.\d+)?)'
             ],
             'net_income': [
-                r'(?:Net\s+income|Net\s+earnings|Net\s+profit)(?:\s+was|\s+were|\s+of|\s+:|\s+\()?\s*(?:\$|USD)?\s*([\d,\.]+)\s*(?:million|billion|m|b|M|B)?',
-                r'(?:Net\s+income|Net\s+earnings|Net\s+profit)(?:\s+was|\s+were|\s+of|\s+:|\s+\()?\s*(?:\$|USD)?\s*([\d,\.]+)'
+                r'(?-i:Net\s+(?:income|earnings|profit))(?:\s+was|\s+were|\s+of|\s*:|\s*\()?\s*(?:\$|USD)?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:(millions?|billions?|thousands?|[mbk])\b)?',
+                r'(?-i:net\s+(?:income|earnings|profit))(?:\s+was|\s+were|\s+of|\s*:|\s*\()?\s*(?:\$|USD)?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:(millions?|billions?|thousands?|[mbk])\b)?'
             ]
         }
+        self._compile_scanner()
         
         # Cache pour les résultats d'extraction
         self.cache = {}
         self.cache_ttl = 3600  # 1 heure
+        
+        # Nombre de processus pour l'extraction page par page
+        self.extraction_workers = PDF_EXTRACTION_WORKERS
+        
+        # Paramètres de l'OCR des pages sans couche texte
+        self.ocr_workers = PDF_OCR_WORKERS
+        self.ocr_max_in_flight = max(1, PDF_OCR_MAX_PAGES_IN_FLIGHT)
+        
+        # Cache disque partagé, indexé par l'empreinte du contenu des PDF
+        self.disk_cache = PDFExtractionCache()
+    
+    def _compile_scanner(self):
+        """
+        Compile tous les modèles en une seule expression, parcourue une seule fois.
+        L'expression ignore la casse pour les unités ; les libellés la respectent,
+        chaque modèle les plaçant dans un groupe (?-i:...).
+        Les alternatives sont ordonnées par priorité : à une même position, le modèle
+        le plus prioritaire l'emporte. Chaque alternative est associée à sa métrique,
+        à sa priorité et aux index de ses groupes valeur et unité.
+        """
+        alternatives = []
+        self._scanner_groups = {}
+        group = 1
+        
+        depth = max(len(patterns) for patterns in self.regex_patterns.values())
+        for priority in range(depth):
+            for metric, patterns in self.regex_patterns.items():
+                if priority >= len(patterns):
+                    continue
+                pattern = patterns[priority]
+                inner_groups = re.compile(pattern).groups
+                alternatives.append(f"({pattern})")
+                self._scanner_groups[group] = (
+                    metric, priority, group + 1, group + 2 if inner_groups > 1 else None
+                )
+                group += inner_groups + 1
+        
+        self._scanner = re.compile("|".join(alternatives), re.IGNORECASE)
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
+    def _extract_pages(self, pdf_path: str, progress: Optional[Callable[[str, int, int], None]] = None) -> List[str]:
+        """
+        Extrait le texte de chaque page avec pdfminer, en répartissant les plages
+        de pages sur le pool de processus partagé et en les fusionnant dans l'ordre.
+        
+        Args:
+            pdf_path: Chemin vers le fichier PDF
+            progress: Fonction appelée avec ('extraction', pages traitées, pages totales)
+            
+        Returns:
+            Liste des textes des pages, dans l'ordre du document
+        """
+        page_count = count_pdf_pages(pdf_path)
+        ranges = split_page_ranges(page_count, self.extraction_workers)
+        workers = min(self.extraction_workers, len(ranges))
+        pages = []
+        
+        if progress:
+            progress('extraction', 0, page_count)
+        
+        if workers <= 1:
+            for first, last in ranges:
+                pages.extend(extract_page_range(pdf_path, first, last))
+                if progress:
+                    progress('extraction', len(pages), page_count)
+        else:
+            logger.info(f"Extraction de {page_count} pages en {len(ranges)} plages sur {workers} processus")
+            firsts, lasts = zip(*ranges)
+            executor = get_extraction_pool(self.extraction_workers)
+            try:
+                # map conserve l'ordre des plages, quel que soit l'ordre de fin des processus
+                for range_pages in executor.map(extract_page_range, itertools.repeat(pdf_path), firsts, lasts):
+                    pages.extend(range_pages)
+                    if progress:
+                        progress('extraction', len(pages), page_count)
+            except BrokenProcessPool:
+                _discard_extraction_pool(executor)
+                raise
+        
+        return pages
+    
+    def _ocr_pages(self, pdf_path: str, page_numbers: List[int],
+                   progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[int, str]:
+        """
+        Applique l'OCR aux pages indiquées. Les pages sont rastérisées par petites
+        fenêtres (first_page/last_page) et reconnues par un pool de threads, tesseract
+        s'exécutant dans son propre processus. Le nombre d'images de pages en mémoire
+        est borné par self.ocr_max_in_flight.
+        
+        Args:
+            pdf_path: Chemin vers le fichier PDF
+            page_numbers: Index des pages à traiter (à partir de 0)
+            progress: Fonction appelée avec ('ocr', pages reconnues, pages à reconnaître)
+            
+        Returns:
+            Dictionnaire associant l'index de chaque page reconnue à son texte
+        """
+        window = min(PDF_OCR_WINDOW, self.ocr_max_in_flight)
+        in_flight = threading.BoundedSemaphore(self.ocr_max_in_flight)
+        futures = {}
+        done_pages = itertools.count(1)
+        
+        def page_done(_):
+            in_flight.release()
+            if progress:
+                progress('ocr', next(done_pages), len(page_numbers))
+        
+        if progress:
+            progress('ocr', 0, len(page_numbers))
+        
+        with ThreadPoolExecutor(max_workers=max(1, self.ocr_workers)) as executor:
+            for first, last in split_ocr_windows(page_numbers, window):
+                # Réserver une place par image avant de rastériser la fenêtre
+                for _ in range(last - first):
+                    in_flight.acquire()
+                
+                try:
+                    images = convert_from_path(pdf_path, first_page=first + 1, last_page=last)
+                except Exception as e:
+                    logger.error(f"Erreur lors de la conversion des pages {first + 1}-{last} en images: {str(e)}")
+                    images = []
+                
+                for _ in range(last - first - len(images)):
+                    in_flight.release()
+                
+                for page_number, image in zip(range(first, last), images):
+                    logger.info(f"OCR sur la page {page_number + 1}...")
+                    future = executor.submit(pytesseract.image_to_string, image, lang='fra+eng')
+                    future.add_done_callback(page_done)
+                    futures[future] = page_number
+                
+                # Ne pas garder de référence aux images : le pool les libère après l'OCR
+                del images
+        
+        ocr_text = {}
+        for future, page_number in futures.items():
+            try:
+                ocr_text[page_number] = future.result()
+            except Exception as e:
+                logger.error(f"Erreur lors de l'OCR de la page {page_number + 1}: {str(e)}")
+        
+        return ocr_text
+    
+    def extract_text_from_pdf(self, pdf_path: str, per_page: bool = False,
+                              progress: Optional[Callable[[str, int, int], None]] = None) -> Union[str, List[str]]:
         """
         Extrait le texte d'un fichier PDF.
         
         Args:
             pdf_path: Chemin vers le fichier PDF
+            per_page: Si True, retourne la liste des textes de chaque page
+            progress: Fonction appelée avec (étape, pages traitées, pages totales)
             
         Returns:
-            Le texte extrait du PDF
+            Le texte extrait du PDF, ou la liste des textes par page si per_page est True
         """
         logger.info(f"Extraction du texte du fichier PDF: {pdf_path}")
         
@@ -121,44 +619,53 @@ class PDFProcessor:
             raise FileNotFoundError(f"Le fichier PDF n'existe pas: {pdf_path}")
         
         # Vérifier si le texte est déjà en cache
-        pdf_hash = get_pdf_hash(pdf_path)
+        pdf_hash = self.disk_cache.file_digest(pdf_path)
         cache_key = f"text_{pdf_hash}"
         
         if cache_key in self.cache:
             cache_entry = self.cache[cache_key]
             if time.time() - cache_entry['timestamp'] < self.cache_ttl:
                 logger.info(f"Utilisation du texte en cache pour {pdf_path}")
-                return cache_entry['text']
-        
+                return cache_entry['pages'] if per_page else cache_entry['text']
+        
+        # Vérifier si ce contenu a déjà été extrait, par ce processus ou un autre
+        disk_entry = self.disk_cache.get(pdf_hash)
+        if disk_entry and disk_entry['pages'] is not None:
+            logger.info(f"Utilisation du texte en cache disque pour {pdf_path}")
+            self.cache[cache_key] = {
+                'text': disk_entry['text'],
+                'pages': disk_entry['pages'],
+                'timestamp': time.time()
+            }
+            return disk_entry['pages'] if per_page else disk_entry['text']
+        
+        pages = []
         text = ""
         
         # Essayer d'extraire le texte avec pdfminer
         if HAS_PDFMINER:
             try:
-                text = extract_text(pdf_path)
-                logger.info(f"Texte extrait avec pdfminer: {len(text)} caractères")
+                pages = self._extract_pages(pdf_path, progress)
+                text = "".join(pages)
+                logger.info(f"Texte extrait avec pdfminer: {len(text)} caractères sur {len(pages)} pages")
             except PDFSyntaxError as e:
                 logger.error(f"Erreur lors de l'extraction du texte avec pdfminer: {str(e)}")
             except Exception as e:
                 logger.error(f"Erreur inattendue lors de l'extraction du texte avec pdfminer: {str(e)}")
         
-        # Si le texte est vide ou trop court, essayer l'OCR
-        if (not text or len(text) < 1000) and HAS_OCR:
-            logger.info("Texte insuffisant extrait avec pdfminer, tentative avec OCR...")
+        # Appliquer l'OCR aux seules pages sans couche texte
+        if HAS_OCR:
             try:
-                # Convertir les pages PDF en images
-                images = convert_from_path(pdf_path)
+                if not pages:
+                    pages = ["" for _ in range(pdfinfo_from_path(pdf_path)['Pages'])]
                 
-                # Extraire le texte de chaque image
-                ocr_text = []
-                for i, image in enumerate(images):
-                    logger.info(f"OCR sur la page {i+1}/{len(images)}...")
-                    page_text = pytesseract.image_to_string(image, lang='fra+eng')
-                    ocr_text.append(page_text)
-                
-                # Combiner le texte de toutes les pages
-                text = "\n".join(ocr_text)
-                logger.info(f"Texte extrait avec OCR: {len(text)} caractères")
+                missing = [i for i, page in enumerate(pages) if len(page.strip()) < PDF_OCR_MIN_PAGE_CHARS]
+                if missing:
+                    logger.info(f"{len(missing)}/{len(pages)} pages sans couche texte, tentative avec OCR...")
+                    for page_number, page_text in self._ocr_pages(pdf_path, missing, progress).items():
+                        pages[page_number] = page_text + "\x0c"
+                    text = "".join(pages)
+                    logger.info(f"Texte extrait avec OCR: {len(text)} caractères")
             except Exception as e:
                 logger.error(f"Erreur lors de l'extraction du texte avec OCR: {str(e)}")
         
@@ -168,14 +675,18 @@ class PDFProcessor:
         # Mettre en cache le texte extrait
         self.cache[cache_key] = {
             'text': text,
+            'pages': pages,
             'timestamp': time.time()
         }
+        if text:
+            self.disk_cache.put(pdf_hash, pages=pages)
         
-        return text
+        return pages if per_page else text
     
     def extract_financial_data(self, text: str) -> Dict[str, Any]:
         """
         Extrait les données financières du texte.
+        Les montants sont exprimés en millions ; les marges en pourcentage.
         
         Args:
             text: Texte extrait du PDF
@@ -195,30 +706,31 @@ class PDFProcessor:
                 logger.info("Utilisation des données financières en cache")
                 return cache_entry['data']
         
-        financial_data = {
-            'revenue': None,
-            'gross_margin': None,
-            'net_income': None
-        }
+        financial_data = {metric: None for metric in self.regex_patterns}
         
-        # Extraire les données pour chaque métrique
-        for metric, patterns in self.regex_patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, text)
-                if matches:
-                    # Prendre la première correspondance
-                    value_str = matches[0]
-                    
-                    # Nettoyer la valeur
-                    value_str = value_str.replace(',', '')
-                    
-                    try:
-                        value = float(value_str)
-                        financial_data[metric] = value
-                        logger.info(f"Métrique extraite: {metric} = {value}")
-                        break
-                    except ValueError:
-                        logger.warning(f"Impossible de convertir la valeur en nombre: {value_str}")
+        # Un seul parcours du texte ; pour chaque métrique, on garde la première
+        # correspondance du modèle le plus prioritaire
+        best_priority = {}
+        for match in self._scanner.finditer(text):
+            metric, priority, value_group, unit_group = self._scanner_groups[match.lastindex]
+            if best_priority.get(metric, len(self.regex_patterns[metric])) <= priority:
+                continue
+            
+            # Nettoyer la valeur et la convertir en millions selon l'unité
+            value = float(match.group(value_group).replace(',', ''))
+            unit = match.group(unit_group) if unit_group else None
+            if unit:
+                value *= UNIT_SCALES[unit[0].lower()]
+            
+            financial_data[metric] = value
+            best_priority[metric] = priority
+            
+            # Arrêter dès que chaque métrique a son modèle le plus prioritaire
+            if len(best_priority) == len(self.regex_patterns) and not any(best_priority.values()):
+                break
+        
+        for metric in best_priority:
+            logger.info(f"Métrique extraite: {metric} = {financial_data[metric]}")
         
         # Mettre en cache les données extraites
         self.cache[cache_key] = {
@@ -276,12 +788,14 @@ class PDFProcessor:
         logger.info(f"Données financières sauvegardées dans: {json_filepath}")
         return json_filepath
     
-    def process_pdf(self, pdf_path: str) -> Tuple[str, str]:
+    def process_pdf(self, pdf_path: str,
+                    progress: Optional[Callable[[str, int, int], None]] = None) -> Tuple[str, str]:
         """
         Traite un fichier PDF pour extraire le texte et les données financières.
         
         Args:
             pdf_path: Chemin vers le fichier PDF
+            progress: Fonction appelée avec (étape, pages traitées, pages totales)
             
         Returns:
             Tuple contenant les chemins vers les fichiers texte et JSON sauvegardés
@@ -292,7 +806,7 @@ class PDFProcessor:
         self._clean_cache()
         
         # Vérifier si le PDF a déjà été traité
-        pdf_hash = get_pdf_hash(pdf_path)
+        pdf_hash = self.disk_cache.file_digest(pdf_path)
         cache_key = f"process_{pdf_hash}"
         
         if cache_key in self.cache:
@@ -303,15 +817,35 @@ class PDFProcessor:
                     logger.info(f"Utilisation des résultats en cache pour {pdf_path}")
                     return cache_entry['text_filepath'], cache_entry['json_filepath']
         
-        # Extraire le texte
-        text = self.extract_text_from_pdf(pdf_path)
-        
-        # Extraire les données financières
-        financial_data = self.extract_financial_data(text)
-        
-        # Sauvegarder le texte et les données
-        text_filepath = self.save_extracted_text(text, pdf_path)
-        json_filepath = self.save_financial_data(financial_data, pdf_path)
+        # Un contenu déjà traité, même sous un autre nom, n'est pas extrait à nouveau
+        # et réutilise les fichiers déjà produits s'ils existent toujours
+        disk_entry = self.disk_cache.get(pdf_hash) or {}
+        artifacts = disk_entry.get('artifacts')
+        if artifacts and os.path.exists(artifacts['text_filepath']) and os.path.exists(artifacts['json_filepath']):
+            logger.info(f"Contenu déjà traité, réutilisation des fichiers existants pour {pdf_path}")
+            text_filepath = artifacts['text_filepath']
+            json_filepath = artifacts['json_filepath']
+        else:
+            if disk_entry.get('pages') is not None and disk_entry.get('financial_data') is not None:
+                logger.info(f"Contenu déjà traité, utilisation du cache disque pour {pdf_path}")
+                text = disk_entry['text']
+                financial_data = disk_entry['financial_data']
+            else:
+                # Extraire le texte
+                text = self.extract_text_from_pdf(pdf_path, progress=progress)
+                
+                # Extraire les données financières
+                financial_data = self.extract_financial_data(text)
+            
+            # Sauvegarder le texte et les données
+            text_filepath = self.save_extracted_text(text, pdf_path)
+            json_filepath = self.save_financial_data(financial_data, pdf_path)
+            
+            if text:
+                self.disk_cache.put(pdf_hash, financial_data=financial_data, artifacts={
+                    'text_filepath': os.path.abspath(text_filepath),
+                    'json_filepath': os.path.abspath(json_filepath)
+                })
         
         # Mettre en cache les résultats
         self.cache[cache_key] = {
@@ -0,0 +1,127 @@
+"""
+Module pour la limitation du débit des appels aux API externes.
+Ce module fournit un seau à jetons partagé entre les threads d'un processus, et une variante
+dont l'état est stocké dans un fichier verrouillé, partagée entre processus.
+"""
+
+import os
+import time
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier, l'état reste partagé entre threads
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Seau à jetons : autorise en moyenne `rate` opérations par seconde,
+    avec des rafales d'au plus `capacity` opérations.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Initialise le seau à jetons.
+        
+        Args:
+            rate: Nombre de jetons ajoutés par seconde
+            capacity: Nombre maximal de jetons accumulés
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _take(self) -> float:
+        """
+        Prend un jeton s'il est disponible.
+        
+        Returns:
+            float: 0 si un jeton a été pris, sinon le délai avant le prochain jeton
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            
+            return (1 - self.tokens) / self.rate
+    
+    def acquire(self):
+        """
+        Prend un jeton, en attendant qu'il soit disponible.
+        """
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            
+            # Attendre hors du verrou pour ne pas bloquer les autres threads
+            time.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Seau à jetons partagé entre processus (par exemple les workers Flask) : le nombre de
+    jetons et la date de mise à jour sont stockés dans un fichier, lu et réécrit sous un
+    verrou exclusif (flock) à chaque prise de jeton.
+    """
+    
+    def __init__(self, path: str, rate: float, capacity: float = 1):
+        """
+        Initialise le seau à jetons.
+        
+        Args:
+            path: Chemin vers le fichier d'état, commun à tous les processus
+            rate: Nombre de jetons ajoutés par seconde
+            capacity: Nombre maximal de jetons accumulés
+        """
+        super().__init__(rate, capacity)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        if fcntl is None:
+            logger.warning(f"Verrous de fichier indisponibles, limite de débit propre à chaque processus: {path}")
+    
+    def _take(self) -> float:
+        """
+        Prend un jeton s'il est disponible, sous le verrou du fichier d'état.
+        
+        Returns:
+            float: 0 si un jeton a été pris, sinon le délai avant le prochain jeton
+        """
+        # Le verrou de thread protège le fichier lorsque flock n'est pas disponible
+        with self.lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                
+                # Horloge murale : time.monotonic() n'est pas comparable d'un processus à l'autre
+                now = time.time()
+                try:
+                    tokens, updated = (float(value) for value in os.read(fd, 64).split())
+                except ValueError:
+                    # Fichier vide ou illisible : seau plein
+                    tokens, updated = self.capacity, now
+                
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+                if not wait:
+                    tokens -= 1
+                
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, f"{tokens!r} {now!r}".encode())
+                return wait
+            finally:
+                # Fermer le descripteur libère aussi le verrou
+                os.close(fd)
@@ -0,0 +1,76 @@
+"""
+Module pour l'enregistrement des fichiers téléchargés.
+Les fichiers sont hachés pendant leur écriture sur disque et rangés par empreinte de contenu,
+de sorte qu'un même document téléchargé plusieurs fois n'est stocké qu'une seule fois.
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import tempfile
+from typing import Tuple
+
+from werkzeug.utils import secure_filename
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.config import UPLOADS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs lus depuis le flux du téléchargement
+UPLOAD_CHUNK_SIZE = 65536
+
+
+def save_upload(file, upload_dir: str = UPLOADS_DIR) -> Tuple[str, str, bool]:
+    """
+    Enregistre un fichier téléchargé en calculant son empreinte SHA-256 au fil de l'écriture.
+    Le fichier est rangé sous upload_dir/<empreinte>/<nom du fichier> ; si ce contenu a déjà
+    été téléchargé, la copie existante est réutilisée et rien n'est écrit.
+    
+    Args:
+        file: Fichier téléchargé (FileStorage de werkzeug)
+        upload_dir: Répertoire des téléchargements
+    
+    Returns:
+        Tuple contenant le chemin du fichier enregistré, son empreinte, et un booléen
+        indiquant s'il s'agit d'un doublon d'un téléchargement précédent
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    hasher = hashlib.sha256()
+    
+    # Écrire dans un fichier temporaire du même répertoire, pour un renommage atomique
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            while chunk:
+                hasher.update(chunk)
+                f.write(chunk)
+                chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+        
+        digest = hasher.hexdigest()
+        content_dir = os.path.join(upload_dir, digest)
+        
+        # Contenu déjà téléchargé, éventuellement sous un autre nom
+        if os.path.isdir(content_dir):
+            existing = sorted(os.listdir(content_dir))
+            if existing:
+                logger.info(f"Téléchargement en double de {file.filename}, réutilisation de {existing[0]}")
+                return os.path.join(content_dir, existing[0]), digest, True
+        
+        # Premier téléchargement de ce contenu
+        filename = secure_filename(file.filename)
+        extension = os.path.splitext(file.filename)[1].lower()
+        if not filename or not filename.lower().endswith(extension):
+            filename = f"document{extension}"
+        os.makedirs(content_dir, exist_ok=True)
+        file_path = os.path.join(content_dir, filename)
+        os.replace(temp_path, file_path)
+        logger.info(f"Fichier téléchargé enregistré dans: {file_path}")
+        return file_path, digest, False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
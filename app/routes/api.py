@@ -5,7 +5,6 @@ Routes API pour l'application.
 from flask import Blueprint, jsonify, request, send_file, session
 import os
 import sys
-import json
 import time
 
 # Ajouter le répertoire parent au chemin d'importation
@@ -15,15 +14,18 @@ from app.config import (
     QUERY_FILE, RESPONSE_FILE, STATUS_FILE,
     OPENAI_API_KEY, PINECONE_API_KEY, ALLOWED_EXTENSIONS,
     MAX_UPLOAD_SIZE, UPLOADS_DIR, EXPORT_FORMATS,
-    EXPORTS_DIR, DATA_DIR
+    EXPORTS_DIR, DATA_DIR, EDGAR_SYNC_MAX_TICKERS
 )
 from app.core.data_loader import (
     load_company_data, load_comparative_data, load_prediction_data
 )
 from app.core.ai_manager import ai_manager
 from app.core.edgar_integration import edgar_integration
+from app.core.cik_index import cik_index
 from app.core.alpha_vantage_integration import alpha_vantage_integration
 from app.core.pdf_processor import pdf_processor
+from app.core.pdf_job_manager import pdf_job_manager, QueueFullError
+from app.core.upload_manager import save_upload
 from app.core.export_manager import export_manager
 from app.core.security_manager import security_manager
 
@@ -188,9 +190,8 @@ def load_document():
     
     file = request.files['file']
     
-    # Sauvegarder le fichier
-    filename = os.path.join(UPLOADS_DIR, file.filename)
-    file.save(filename)
+    # Sauvegarder le fichier, sauf s'il a déjà été téléchargé
+    filename, digest, duplicate = save_upload(file, UPLOADS_DIR)
     
     # Traiter le document (à implémenter)
     # TODO: Implémenter le traitement du document et l'indexation dans Pinecone
@@ -198,7 +199,8 @@ def load_document():
     return jsonify({
         'success': True,
         'message': f"Document '{file.filename}' chargé avec succès.",
-        'filename': file.filename
+        'filename': file.filename,
+        'duplicate': duplicate
     })
 
 @api_bp.route('/edgar/download/<ticker>', methods=['POST'])
@@ -304,6 +306,84 @@ def process_edgar_filing(ticker):
             'message': f"Erreur lors du traitement des documents: {str(e)}"
         }), 500
 
+@api_bp.route('/edgar/companies', methods=['GET'])
+@security_manager.limit_rate
+def search_edgar_companies():
+    """
+    Route pour l'autocomplétion des entreprises, par début de ticker ou de nom.
+    """
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    
+    # Valider la recherche
+    if not security_manager.input_validator.validate_string(query, max_length=50):
+        return jsonify({
+            'success': False,
+            'message': "Invalid query"
+        }), 400
+    
+    # Valider le nombre de résultats
+    if not security_manager.input_validator.validate_integer(limit, min_value=1, max_value=50):
+        return jsonify({
+            'success': False,
+            'message': "Invalid limit (must be between 1 and 50)"
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'results': cik_index.search(query, limit)
+    })
+
+@api_bp.route('/edgar/sync', methods=['POST'])
+@security_manager.require_csrf_token
+@security_manager.limit_rate
+def sync_edgar_filings():
+    """
+    Route pour synchroniser les documents de plusieurs entreprises avec EDGAR.
+    Seuls les documents déposés depuis la dernière synchronisation sont téléchargés et extraits.
+    """
+    data = request.json or {}
+    tickers = data.get('tickers')
+    filing_type = data.get('filing_type', '10-K')
+    
+    # Valider les tickers (par défaut, toutes les entreprises couvertes)
+    if tickers is not None and (
+        not isinstance(tickers, list)
+        or not all(security_manager.input_validator.validate_string(ticker, pattern=r'^[A-Z]+$') for ticker in tickers)
+    ):
+        return jsonify({
+            'success': False,
+            'message': "Invalid ticker symbol"
+        }), 400
+    
+    # Limiter le nombre d'entreprises : la synchronisation s'exécute pendant la requête
+    if tickers is not None and len(tickers) > EDGAR_SYNC_MAX_TICKERS:
+        return jsonify({
+            'success': False,
+            'message': f"Too many tickers (maximum {EDGAR_SYNC_MAX_TICKERS})"
+        }), 400
+    
+    # Valider le type de document
+    if not security_manager.input_validator.validate_string(filing_type, pattern=r'^[0-9A-Z\-]+$'):
+        return jsonify({
+            'success': False,
+            'message': "Invalid filing type"
+        }), 400
+    
+    try:
+        results = edgar_integration.sync_all(tickers, filing_type)
+        
+        return jsonify({
+            'success': True,
+            'message': f"{len(results)} entreprises synchronisées.",
+            'results': results
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f"Erreur lors de la synchronisation des documents: {str(e)}"
+        }), 500
+
 @api_bp.route('/alpha-vantage/time-series/<ticker>', methods=['GET'])
 @security_manager.limit_rate
 def get_time_series(ticker):
@@ -478,7 +558,10 @@ def get_key_metrics(ticker):
 @api_bp.route('/pdf/process', methods=['POST'])
 @security_manager.limit_rate
 def process_pdf():
-    """Route pour traiter un fichier PDF."""
+    """
+    Route pour traiter un fichier PDF.
+    Le traitement est mis en file d'attente ; l'état est disponible sur /api/pdf/jobs/<job_id>.
+    """
     # Valider le fichier
     error = security_manager.validate_file_upload(
         request.files.get('file'),
@@ -494,31 +577,64 @@ def process_pdf():
     
     file = request.files['file']
     
-    # Sauvegarder le fichier
-    filename = os.path.join(UPLOADS_DIR, file.filename)
-    file.save(filename)
-    
     try:
-        # Traiter le fichier PDF
-        text_file, data_file = pdf_processor.process_pdf(filename)
+        # Sauvegarder le fichier, sauf s'il a déjà été téléchargé ; l'empreinte
+        # calculée pendant l'écriture évite de relire le fichier pour le cache
+        filename, digest, duplicate = save_upload(file, UPLOADS_DIR)
+        pdf_processor.disk_cache.remember_digest(filename, digest)
         
-        # Lire les données financières extraites
-        with open(data_file, 'r') as f:
-            financial_data = json.load(f)
+        # Mettre le traitement du fichier PDF en file d'attente
+        job_id = pdf_job_manager.submit(filename, file.filename)
         
         return jsonify({
             'success': True,
-            'message': f"Document '{file.filename}' traité avec succès.",
-            'text_file': text_file,
-            'data_file': data_file,
-            'financial_data': financial_data
-        })
+            'message': f"Document '{file.filename}' en cours de traitement.",
+            'job_id': job_id,
+            'status_url': f"/api/pdf/jobs/{job_id}",
+            'duplicate': duplicate
+        }), 202
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'message': f"{str(e)}. Veuillez réessayer plus tard."
+        }), 503
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f"Erreur lors du traitement du document: {str(e)}"
         }), 500
 
+@api_bp.route('/pdf/jobs/<job_id>', methods=['GET'])
+@security_manager.limit_rate
+def get_pdf_job(job_id):
+    """
+    Route pour obtenir l'état du traitement d'un fichier PDF.
+    
+    Args:
+        job_id: L'identifiant de la tâche retourné par /api/pdf/process
+    """
+    job = pdf_job_manager.get_status(job_id)
+    
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': f"Tâche non trouvée: {job_id}"
+        }), 404
+    
+    return jsonify({
+        'success': job['status'] != 'failed',
+        'job_id': job_id,
+        'filename': job['filename'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'pages_done': job['pages_done'],
+        'pages_total': job['pages_total'],
+        'text_file': job['text_file'],
+        'data_file': job['data_file'],
+        'financial_data': job['financial_data'],
+        'message': job['message']
+    })
+
 @api_bp.route('/export/<format>', methods=['POST'])
 @security_manager.limit_rate
 def export_data(format):
@@ -1,9 +1,15 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import os
+import sys
 from flask import Blueprint, render_template_string, request, jsonify
 
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import SEC_SEARCH_MAX_AGE, SEC_DOCUMENT_MAX_AGE
+from app.core.http_cache import http_cache
+
 # Créer un Blueprint Flask pour la fonctionnalité SEC
 sec_bp = Blueprint('sec', __name__)
 
@@ -21,14 +27,9 @@ def search_sec_filings(ticker, filing_type="10-K"):
     # URL de base de l'API EDGAR pour rechercher les rapports
     url = f"https://www.sec.gov/cgi-bin/browse-edgar?CIK={ticker}&type={filing_type}&action=getcompany"
     
-    # Ajouter un User-Agent comme recommandé par la SEC
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
-        # Envoyer une requête à l'API
-        response = requests.get(url, headers=headers)
+        # Envoyer une requête à l'API (session partagée, réponse en cache revalidée au-delà de SEC_SEARCH_MAX_AGE)
+        response = http_cache.get(url, max_age=SEC_SEARCH_MAX_AGE)
         
         # Vérifier si la requête est réussie
         if response.status_code == 200:
@@ -80,13 +81,9 @@ def get_filing_content(url):
     Returns:
         dict: Les informations extraites du dépôt
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
-        # Envoyer une requête à l'URL
-        response = requests.get(url, headers=headers)
+        # Envoyer une requête à l'URL ; les documents déposés ne changent pas, ils restent frais plus longtemps
+        response = http_cache.get(url, max_age=SEC_DOCUMENT_MAX_AGE)
         
         # Vérifier si la requête est réussie
         if response.status_code == 200:
@@ -103,7 +100,7 @@ def get_filing_content(url):
             
             if html_link:
                 # Récupérer le document HTML
-                doc_response = requests.get(html_link, headers=headers)
+                doc_response = http_cache.get(html_link, max_age=SEC_DOCUMENT_MAX_AGE)
                 if doc_response.status_code == 200:
                     return {
                         'url': html_link,
@@ -1,16 +1,25 @@
 import re
 import os
 import json
+import mmap
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib.style
 import argparse
+import functools
+import hashlib
+import heapq
 from collections import defaultdict
-from scipy.stats import linregress
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from scipy.stats import t as student_t
 import matplotlib.ticker as mtick
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
 
 def read_file(file_path):
     """Lit le fichier texte extrait du PDF."""
@@ -19,167 +28,503 @@ def read_file(file_path):
         text = file.read()
     return text
 
+
+# Taille (en octets) des blocs lus par read_file_chunks
+STREAM_CHUNK_SIZE = 1 << 20
+
+
+def read_file_chunks(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lit le fichier texte extrait du PDF par blocs, via mmap, sans jamais le
+    charger entièrement en mémoire.
+    
+    Les blocs sont coupés sur une frontière de caractère UTF-8 et les fins de
+    ligne sont normalisées comme par read_file : la concaténation des blocs
+    est identique au texte retourné par read_file.
+    """
+    print(f"📂 Lecture du fichier par blocs : {file_path}")
+    return _iter_file_chunks(file_path, chunk_size)
+
+
+def _iter_file_chunks(file_path, chunk_size):
+    """Générateur des blocs de read_file_chunks."""
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = released = 0
+            while start < size:
+                end = min(start + chunk_size, size)
+                # Ne pas couper un caractère multi-octets ni une fin de ligne \r\n
+                while end < size and (mm[end] & 0xC0) == 0x80:
+                    end += 1
+                if end < size and mm[end - 1] == 0x0D and mm[end] == 0x0A:
+                    end += 1
+                
+                chunk = mm[start:end].decode('utf-8')
+                yield chunk.replace('\r\n', '\n').replace('\r', '\n')
+                
+                # Libérer les pages déjà lues pour que la mémoire résidente reste bornée
+                read = end - end % mmap.PAGESIZE
+                if hasattr(mmap, 'MADV_DONTNEED') and read > released:
+                    mm.madvise(mmap.MADV_DONTNEED, released, read - released)
+                    released = read
+                start = end
+
+
+# Nombre d'entrées de la table de fréquence des lignes (puissance de 2)
+LINE_TABLE_SIZE = 1 << 16
+
+# Une ligne d'en-tête ou de pied de page apparaît au moins MIN_FURNITURE_REPEATS
+# fois, et en moyenne au moins une fois toutes les MAX_PAGE_LINES lignes
+MIN_FURNITURE_REPEATS = 5
+MAX_PAGE_LINES = 150
+
+# Deux occurrences séparées de moins de MIN_PAGE_LINES lignes ne sont pas sur
+# des pages différentes ; une ligne d'en-tête tolère MAX_SHORT_GAP_RATIO de tels écarts
+MIN_PAGE_LINES = 10
+MAX_SHORT_GAP_RATIO = 0.1
+
+# Numéros de page isolés sur une ligne
+PAGE_NUMBER_PATTERN = re.compile(r'\n\s*\d+\s*\n')
+
+# Nombres, ignorés lors de la comparaison des lignes (numéros de page, dates, etc.)
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# Longueur maximale (en caractères) d'une suite de lignes vides et numériques
+# conservée en attente par clean_chunks
+MAX_CLEAN_CARRY = 1 << 20
+
+
+def _line_key(line):
+    """Empreinte d'une ligne normalisée (espaces, casse et nombres ignorés), None si elle est vide."""
+    normalized = NUMBER_PATTERN.sub('#', ' '.join(line.split())).lower()
+    return hash(normalized) if normalized else None
+
+
+def iter_lines(chunks):
+    """Découpe une suite de blocs de texte en lignes, fin de ligne comprise."""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+
+def find_page_furniture(lines):
+    """
+    Repère en une passe les en-têtes et pieds de page répétés, quel que soit
+    l'émetteur, et retourne l'ensemble de leurs empreintes (voir _line_key).
+    
+    Une ligne est retenue lorsqu'elle se répète à des intervalles de l'ordre
+    d'une page : au moins une fois toutes les MAX_PAGE_LINES lignes en
+    moyenne, rarement à moins de MIN_PAGE_LINES lignes d'intervalle, et sur
+    au moins la moitié du document. Les statistiques sont tenues dans une
+    table de taille fixe (LINE_TABLE_SIZE) : une ligne vue une seule fois
+    cède sa place en cas de collision, une ligne déjà répétée la conserve.
+    """
+    print("🔎 Repérage des en-têtes et pieds de page répétés...")
+    
+    mask = LINE_TABLE_SIZE - 1
+    # Chaque entrée : [empreinte, occurrences, première ligne, dernière ligne, écarts courts]
+    table = [None] * LINE_TABLE_SIZE
+    
+    total = 0
+    for index, line in enumerate(lines):
+        total = index + 1
+        key = _line_key(line)
+        if key is None:
+            continue
+        
+        entry = table[key & mask]
+        if entry is None or (entry[0] != key and entry[1] == 1):
+            table[key & mask] = [key, 1, index, index, 0]
+        elif entry[0] == key:
+            if index - entry[3] < MIN_PAGE_LINES:
+                entry[4] += 1
+            entry[1] += 1
+            entry[3] = index
+    
+    min_repeats = max(MIN_FURNITURE_REPEATS, total // MAX_PAGE_LINES)
+    return frozenset(
+        key for key, count, first, last, short_gaps in filter(None, table)
+        if count >= min_repeats
+        and short_gaps <= MAX_SHORT_GAP_RATIO * (count - 1)
+        and last - first >= total / 2
+    )
+
+
 def clean_text(text):
-    """Nettoie le texte en supprimant les caractères spéciaux et les sections inutiles."""
+    """Nettoie le texte en supprimant les en-têtes et pieds de page répétés et les numéros de page."""
     print("🧹 Nettoyage du texte...")
     
-    # Suppression des en-têtes et pieds de page répétitifs
-    text = re.sub(r'Tesla, Inc. \/ Form 10-K \/ December 31, 2024.*?http:\/\/www\.sec\.gov', '', text, flags=re.DOTALL)
-    
-    # Suppression des numéros de page
-    text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
-    
-    return text
+    furniture = find_page_furniture(iter_lines([text]))
+    return ''.join(_iter_clean_chunks([text], furniture))
+
+
+def _trailing_blank_start(text):
+    """Retourne la position du suffixe de text composé uniquement d'espaces et de chiffres."""
+    i = len(text)
+    while i > 0 and (text[i - 1].isspace() or text[i - 1].isdecimal()):
+        i -= 1
+    return i
+
+
+def clean_chunks(chunks, furniture=frozenset()):
+    """
+    Version paresseuse de clean_text : nettoie une suite de blocs de texte et
+    produit les blocs nettoyés au fur et à mesure.
+    
+    furniture est l'ensemble des lignes à supprimer, tel que retourné par
+    find_page_furniture sur un premier parcours du même texte. Seule la
+    partie d'un bloc qui peut encore être modifiée par la suite est conservée
+    en attente : une ligne incomplète, ou une fin de bloc composée d'espaces
+    et de chiffres (numéro de page potentiel). Le résultat concaténé est
+    identique à celui de clean_text, sauf pour une suite de lignes numériques
+    de plus de MAX_CLEAN_CARRY caractères, qui est alors traitée en l'état.
+    """
+    print("🧹 Nettoyage du texte par blocs...")
+    return _iter_clean_chunks(chunks, furniture)
 
-def extract_key_metrics(text):
-    """Extrait les métriques financières clés du texte."""
+
+def _iter_clean_chunks(chunks, furniture):
+    """Générateur des blocs nettoyés de clean_chunks."""
+    pending = ''
+    blank_tail = ''
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        
+        # Suppression des en-têtes et pieds de page, ligne par ligne (la dernière ligne peut être incomplète)
+        lines = (pending + (chunk or '')).split('\n')
+        pending = lines.pop()
+        if furniture:
+            lines = [line for line in lines if _line_key(line) not in furniture]
+        text = ''.join(line + '\n' for line in lines)
+        if final and pending and _line_key(pending) not in furniture:
+            text += pending
+        text = blank_tail + text
+        
+        # Suppression des numéros de page, en gardant en attente une fin de bloc qui pourrait en faire partie
+        cut = len(text)
+        if not final:
+            cut = _trailing_blank_start(text)
+            if len(text) - cut > MAX_CLEAN_CARRY:
+                cut = len(text)
+        blank_tail = text[cut:]
+        cleaned = PAGE_NUMBER_PATTERN.sub('\n', text[:cut])
+        if cleaned:
+            yield cleaned
+
+
+# Registre des motifs d'extraction, organisé en packs par émetteur.
+# L'ordre des packs définit la priorité : pour chaque métrique, le premier
+# motif (dans l'ordre des packs) qui trouve une correspondance l'emporte.
+ISSUER_PATTERN_PACKS = {
+    'Tesla': {
+        'revenue': r"Total revenues\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)",
+        'net_income': r"Net income\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)",
+        'gross_profit': r"Gross profit\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)",
+        'total_assets': r"Total assets\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)",
+        'total_liabilities': r"Total liabilities\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)",
+        'operating_cash_flow': r"Cash flows from operating activities.*?Net cash provided by operating activities\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)",
+    },
+    'Apple': {
+        'revenue': r"Total net sales\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)",
+        'net_income': r"Net income.*?(\$[\d,]+)\s+(\$[\d,]+)\s+(\$[\d,]+)",
+        'gross_profit': r"Gross margin\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)",
+        'total_assets': r"Total assets.*?(\$[\d,]+)\s+(\$[\d,]+)",
+        'total_liabilities': r"Total liabilities.*?(\$[\d,]+)\s+(\$[\d,]+)",
+        'operating_cash_flow': r"Cash generated by operating activities\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)",
+    },
+    'Microsoft': {
+        'revenue': r"Total revenue\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)",
+    },
+}
+
+# Années associées aux groupes capturés, de la colonne la plus récente à la plus ancienne
+METRIC_YEARS = ['2024', '2023', '2022']
+
+# Messages affichés pour chaque métrique (succès, échec)
+METRIC_MESSAGES = {
+    'revenue': ("Revenus totaux extraits", "les revenus totaux"),
+    'net_income': ("Bénéfice net extrait", "le bénéfice net"),
+    'gross_profit': ("Bénéfice brut extrait", "le bénéfice brut"),
+    'total_assets': ("Actifs totaux extraits", "les actifs totaux"),
+    'total_liabilities': ("Passifs totaux extraits", "les passifs totaux"),
+    'operating_cash_flow': ("Flux de trésorerie d'exploitation extraits", "les flux de trésorerie d'exploitation"),
+}
+
+# Motifs dont le libellé peut s'étendre sur plusieurs lignes
+MULTILINE_METRICS = {'operating_cash_flow'}
+
+
+def _pattern_label(pattern):
+    """Retourne le libellé littéral par lequel commence un motif."""
+    return re.match(r"[A-Za-z ]+", pattern).group(0).rstrip()
+
+
+@functools.lru_cache(maxsize=16)
+def compile_metric_scanner(issuers=None):
+    """
+    Compile le registre des motifs pour une sélection ordonnée d'émetteurs.
+    
+    Retourne un tuple (ancre, candidats_par_libellé) où l'ancre est une
+    alternative de tous les libellés, utilisée pour parcourir le texte en une
+    seule passe, et candidats_par_libellé associe chaque libellé à la liste
+    des motifs compilés (métrique, priorité, émetteur, motif) qui en dépendent.
+    """
+    issuers = issuers or tuple(ISSUER_PATTERN_PACKS)
+    
+    candidates = defaultdict(list)
+    priorities = defaultdict(int)
+    for issuer in issuers:
+        for metric, pattern in ISSUER_PATTERN_PACKS[issuer].items():
+            flags = re.DOTALL if metric in MULTILINE_METRICS else 0
+            candidates[_pattern_label(pattern)].append(
+                (metric, priorities[metric], issuer, re.compile(pattern, flags))
+            )
+            priorities[metric] += 1
+    
+    # Les libellés les plus longs d'abord pour que l'alternative préfère la correspondance complète
+    labels = sorted(candidates, key=len, reverse=True)
+    anchor = re.compile('|'.join(re.escape(label) for label in labels))
+    
+    return anchor, dict(candidates)
+
+
+# États financiers dans lesquels chaque métrique est recherchée
+METRIC_SECTIONS = {
+    'revenue': 'income_statement',
+    'net_income': 'income_statement',
+    'gross_profit': 'income_statement',
+    'total_assets': 'balance_sheet',
+    'total_liabilities': 'balance_sheet',
+    'operating_cash_flow': 'cash_flow',
+}
+
+# Titres des états financiers et titres qui marquent la fin d'un état
+SECTION_HEADINGS = re.compile(
+    r"Consolidated (?:"
+    r"(?P<income_statement>Statements? of (?:Operations|Income)\b)"
+    r"|(?P<balance_sheet>Balance Sheets?\b)"
+    r"|(?P<cash_flow>Statements? of Cash Flows?\b)"
+    r"|(?P<boundary>Statements? of [A-Z][A-Za-z ,]*|Financial Statements)"
+    r")"
+)
+
+# Taille maximale d'une fenêtre d'état financier (en caractères)
+MAX_SECTION_LENGTH = 50000
+
+# Recouvrement (en caractères) entre deux fenêtres glissantes de scan_metrics_stream ; doit dépasser MAX_SECTION_LENGTH
+STREAM_OVERLAP = 2 * MAX_SECTION_LENGTH
+
+
+def build_section_index(text):
+    """
+    Localise en une passe les états financiers (compte de résultat, bilan,
+    tableau des flux de trésorerie) et retourne un index réutilisable.
+    
+    L'index associe chaque état à la liste ordonnée des fenêtres (début, fin)
+    qui commencent à l'un de ses titres et s'arrêtent au titre suivant, quel
+    qu'il soit, ou après MAX_SECTION_LENGTH caractères. Les états absents du
+    texte n'apparaissent pas dans l'index.
+    """
+    headings = [(match.start(), match.lastgroup) for match in SECTION_HEADINGS.finditer(text)]
+    
+    sections = defaultdict(list)
+    for i, (start, kind) in enumerate(headings):
+        if kind == 'boundary':
+            continue
+        next_heading = headings[i + 1][0] if i + 1 < len(headings) else len(text)
+        sections[kind].append((start, min(next_heading, start + MAX_SECTION_LENGTH)))
+    
+    return dict(sections)
+
+
+def _scan_window(text, start, end, anchor, candidates, wanted, stop=None):
+    """
+    Parcourt text[start:end] en une seule passe à la recherche des métriques
+    demandées et retourne {métrique: (priorité, émetteur, match)}.
+    
+    Le motif de plus haute priorité qui correspond dans la fenêtre l'emporte,
+    et pour ce motif sa première occurrence. Le parcours s'arrête dès que
+    toutes les métriques demandées sont résolues par leur motif prioritaire.
+    Si stop est fourni, seules les correspondances qui commencent avant stop
+    sont retenues.
+    """
+    best = {}
+    resolved = set()
+    stop = end if stop is None else stop
+    
+    pos = start
+    while len(resolved) < len(wanted):
+        anchor_match = anchor.search(text, pos, end)
+        if not anchor_match or anchor_match.start() >= stop:
+            break
+        label_start = anchor_match.start()
+        pos = label_start + 1
+        
+        for label, entries in candidates.items():
+            if not text.startswith(label, label_start, end):
+                continue
+            for metric, priority, issuer, pattern in entries:
+                if metric not in wanted or metric in resolved:
+                    continue
+                if metric in best and best[metric][0] <= priority:
+                    continue
+                match = pattern.match(text, label_start, end)
+                if match:
+                    best[metric] = (priority, issuer, match)
+                    if priority == 0:
+                        resolved.add(metric)
+    
+    return best
+
+
+def scan_metrics(text, issuers=None, sections=None):
+    """
+    Recherche toutes les métriques du registre et retourne, pour chaque
+    métrique trouvée, la correspondance retenue sous la forme (émetteur, match).
+    
+    Chaque métrique n'est recherchée que dans les fenêtres de son état
+    financier (voir build_section_index), dans l'ordre du texte : la première
+    fenêtre qui contient une correspondance l'emporte. Les métriques dont
+    l'état n'a pas été localisé, ou qui ne figurent dans aucune de ses
+    fenêtres (un titre cité dans le texte courant, par exemple), sont
+    recherchées dans tout le texte.
+    """
+    anchor, candidates = compile_metric_scanner(tuple(issuers) if issuers else None)
+    
+    if sections is None:
+        sections = build_section_index(text)
+    
+    # Regrouper les métriques par liste de fenêtres à parcourir
+    windows_to_metrics = defaultdict(set)
+    for entries in candidates.values():
+        for metric, _, _, _ in entries:
+            windows = sections.get(METRIC_SECTIONS.get(metric), [])
+            windows_to_metrics[tuple(windows)].add(metric)
+    
+    results = {}
+    remaining = set()
+    for windows, metrics in windows_to_metrics.items():
+        metrics = set(metrics)
+        for start, end in windows:
+            if not metrics:
+                break
+            found = _scan_window(text, start, end, anchor, candidates, metrics)
+            for metric, (_, issuer, match) in found.items():
+                results[metric] = (issuer, match)
+            metrics -= found.keys()
+        remaining |= metrics
+    
+    # Recherche dans tout le texte des métriques introuvables dans les fenêtres de leur état
+    if remaining:
+        found = _scan_window(text, 0, len(text), anchor, candidates, remaining)
+        for metric, (_, issuer, match) in found.items():
+            results[metric] = (issuer, match)
+    
+    return results
+
+
+def scan_metrics_stream(chunks, issuers=None, overlap=STREAM_OVERLAP):
+    """
+    Version en flux de scan_metrics : recherche les métriques dans une suite
+    de blocs de texte (par exemple produits par clean_chunks) sans les
+    concaténer.
+    
+    Les blocs sont parcourus dans une fenêtre glissante dont les overlap
+    derniers caractères sont repris au début de la fenêtre suivante. Chaque
+    fenêtre d'état financier et chaque correspondance commence dans une seule
+    fenêtre glissante, qui la contient entièrement puisque overlap dépasse
+    MAX_SECTION_LENGTH : le résultat est celui de scan_metrics sur le texte
+    complet, à ceci près qu'une correspondance recherchée dans tout le texte
+    ne peut pas dépasser overlap caractères.
+    """
+    anchor, candidates = compile_metric_scanner(tuple(issuers) if issuers else None)
+    
+    # Métriques restant à trouver, par état financier (None : recherchées dans tout le texte)
+    remaining = defaultdict(set)
+    for entries in candidates.values():
+        for metric, _, _, _ in entries:
+            remaining[METRIC_SECTIONS.get(metric)].add(metric)
+    
+    results = {}
+    fallback = {}
+    
+    buffer = ''
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        buffer += chunk or ''
+        if not final and len(buffer) < 2 * overlap:
+            continue
+        
+        # Les fenêtres et correspondances qui commencent après stop sont laissées à la fenêtre glissante suivante
+        stop = len(buffer) if final else len(buffer) - overlap
+        
+        sections = build_section_index(buffer)
+        for kind, windows in sections.items():
+            for start, end in windows:
+                if start >= stop or not remaining[kind]:
+                    break
+                found = _scan_window(buffer, start, end, anchor, candidates, remaining[kind])
+                for metric, (_, issuer, match) in found.items():
+                    results[metric] = (issuer, match)
+                remaining[kind] -= found.keys()
+        
+        # Arrêt anticipé : inutile de lire la suite du fichier
+        if not any(remaining.values()):
+            break
+        
+        # Recherche dans tout le texte des métriques pas encore trouvées dans les fenêtres de leur état,
+        # retenue seulement si aucune fenêtre ne les contient jusqu'à la fin du texte
+        wanted = set().union(*remaining.values())
+        wanted -= {metric for metric, (priority, _, _) in fallback.items() if priority == 0}
+        if wanted:
+            found = _scan_window(buffer, 0, len(buffer), anchor, candidates, wanted, stop)
+            for metric, best in found.items():
+                if metric not in fallback or best[0] < fallback[metric][0]:
+                    fallback[metric] = best
+        
+        buffer = buffer[stop:]
+    
+    for metrics in remaining.values():
+        for metric in metrics & fallback.keys():
+            _, issuer, match = fallback[metric]
+            results[metric] = (issuer, match)
+    
+    return results
+
+
+def extract_key_metrics(text, issuers=None, sections=None):
+    """
+    Extrait les métriques financières clés du texte.
+    
+    text peut aussi être un itérable de blocs de texte (voir clean_chunks),
+    parcouru alors en flux par scan_metrics_stream.
+    """
     print("📊 Extraction des métriques financières clés...")
     
-    metrics = {
-        'revenue': {},
-        'net_income': {},
-        'gross_profit': {},
-        'total_assets': {},
-        'total_liabilities': {},
-        'operating_cash_flow': {}
-    }
+    metrics = {metric: {} for metric in METRIC_MESSAGES}
     
-    # Extraction des revenus
-    # Pattern pour Tesla
-    revenue_pattern = r"Total revenues\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)"
-    revenue_match = re.search(revenue_pattern, text)
-    
-    # Pattern pour Apple
-    apple_revenue_pattern = r"Total net sales\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)"
-    apple_revenue_match = re.search(apple_revenue_pattern, text)
-    
-    # Pattern pour Microsoft
-    microsoft_revenue_pattern = r"Total revenue\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)"
-    microsoft_revenue_match = re.search(microsoft_revenue_pattern, text)
-    
-    if revenue_match:
-        metrics['revenue']['2024'] = revenue_match.group(1)
-        metrics['revenue']['2023'] = revenue_match.group(2)
-        metrics['revenue']['2022'] = revenue_match.group(3)
-        print(f"✅ Revenus totaux extraits avec succès : {metrics['revenue']}")
-    elif apple_revenue_match:
-        metrics['revenue']['2024'] = apple_revenue_match.group(1)
-        metrics['revenue']['2023'] = apple_revenue_match.group(2)
-        metrics['revenue']['2022'] = apple_revenue_match.group(3)
-        print(f"✅ Revenus totaux extraits avec succès (Apple) : {metrics['revenue']}")
-    elif microsoft_revenue_match:
-        metrics['revenue']['2024'] = microsoft_revenue_match.group(1)
-        metrics['revenue']['2023'] = microsoft_revenue_match.group(2)
-        metrics['revenue']['2022'] = microsoft_revenue_match.group(3)
-        print(f"✅ Revenus totaux extraits avec succès (Microsoft) : {metrics['revenue']}")
-    else:
-        print("❌ Impossible de trouver les revenus totaux")
-    
-    # Extraction du bénéfice net
-    # Pattern pour Tesla
-    net_income_pattern = r"Net income\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)"
-    net_income_match = re.search(net_income_pattern, text)
-    
-    # Pattern alternatif pour Apple et Microsoft
-    alt_net_income_pattern = r"Net income.*?(\$[\d,]+)\s+(\$[\d,]+)\s+(\$[\d,]+)"
-    alt_net_income_match = re.search(alt_net_income_pattern, text)
-    
-    if net_income_match:
-        metrics['net_income']['2024'] = net_income_match.group(1)
-        metrics['net_income']['2023'] = net_income_match.group(2)
-        metrics['net_income']['2022'] = net_income_match.group(3)
-        print(f"✅ Bénéfice net extrait avec succès : {metrics['net_income']}")
-    elif alt_net_income_match:
-        metrics['net_income']['2024'] = alt_net_income_match.group(1)
-        metrics['net_income']['2023'] = alt_net_income_match.group(2)
-        metrics['net_income']['2022'] = alt_net_income_match.group(3)
-        print(f"✅ Bénéfice net extrait avec succès : {metrics['net_income']}")
-    else:
-        print("❌ Impossible de trouver le bénéfice net")
-    
-    # Extraction du bénéfice brut
-    # Pattern pour Tesla
-    gross_profit_pattern = r"Gross profit\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)"
-    gross_profit_match = re.search(gross_profit_pattern, text)
-    
-    # Pattern alternatif pour Apple et Microsoft
-    alt_gross_profit_pattern = r"Gross margin\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)"
-    alt_gross_profit_match = re.search(alt_gross_profit_pattern, text)
-    
-    if gross_profit_match:
-        metrics['gross_profit']['2024'] = gross_profit_match.group(1)
-        metrics['gross_profit']['2023'] = gross_profit_match.group(2)
-        metrics['gross_profit']['2022'] = gross_profit_match.group(3)
-        print(f"✅ Bénéfice brut extrait avec succès : {metrics['gross_profit']}")
-    elif alt_gross_profit_match:
-        metrics['gross_profit']['2024'] = alt_gross_profit_match.group(1)
-        metrics['gross_profit']['2023'] = alt_gross_profit_match.group(2)
-        metrics['gross_profit']['2022'] = alt_gross_profit_match.group(3)
-        print(f"✅ Bénéfice brut extrait avec succès : {metrics['gross_profit']}")
+    if isinstance(text, str):
+        matches = scan_metrics(text, issuers, sections)
     else:
-        print("❌ Impossible de trouver le bénéfice brut")
-    
-    # Extraction des actifs totaux
-    # Pattern pour Tesla
-    total_assets_pattern = r"Total assets\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)"
-    total_assets_match = re.search(total_assets_pattern, text)
-    
-    # Pattern alternatif pour Apple et Microsoft
-    alt_total_assets_pattern = r"Total assets.*?(\$[\d,]+)\s+(\$[\d,]+)"
-    alt_total_assets_match = re.search(alt_total_assets_pattern, text)
-    
-    if total_assets_match:
-        metrics['total_assets']['2024'] = total_assets_match.group(1)
-        metrics['total_assets']['2023'] = total_assets_match.group(2)
-        print(f"✅ Actifs totaux extraits avec succès : {metrics['total_assets']}")
-    elif alt_total_assets_match:
-        metrics['total_assets']['2024'] = alt_total_assets_match.group(1)
-        metrics['total_assets']['2023'] = alt_total_assets_match.group(2)
-        print(f"✅ Actifs totaux extraits avec succès : {metrics['total_assets']}")
-    else:
-        print("❌ Impossible de trouver les actifs totaux")
-    
-    # Extraction des passifs totaux
-    # Pattern pour Tesla
-    total_liabilities_pattern = r"Total liabilities\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)"
-    total_liabilities_match = re.search(total_liabilities_pattern, text)
-    
-    # Pattern alternatif pour Apple et Microsoft
-    alt_total_liabilities_pattern = r"Total liabilities.*?(\$[\d,]+)\s+(\$[\d,]+)"
-    alt_total_liabilities_match = re.search(alt_total_liabilities_pattern, text)
-    
-    if total_liabilities_match:
-        metrics['total_liabilities']['2024'] = total_liabilities_match.group(1)
-        metrics['total_liabilities']['2023'] = total_liabilities_match.group(2)
-        print(f"✅ Passifs totaux extraits avec succès : {metrics['total_liabilities']}")
-    elif alt_total_liabilities_match:
-        metrics['total_liabilities']['2024'] = alt_total_liabilities_match.group(1)
-        metrics['total_liabilities']['2023'] = alt_total_liabilities_match.group(2)
-        print(f"✅ Passifs totaux extraits avec succès : {metrics['total_liabilities']}")
-    else:
-        print("❌ Impossible de trouver les passifs totaux")
-    
-    # Extraction du flux de trésorerie d'exploitation
-    # Pattern pour Tesla
-    operating_cash_flow_pattern = r"Cash flows from operating activities.*?Net cash provided by operating activities\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)\s*\$?\s*([\d,]+)"
-    operating_cash_flow_match = re.search(operating_cash_flow_pattern, text, re.DOTALL)
-    
-    # Pattern alternatif pour Apple et Microsoft
-    alt_operating_cash_flow_pattern = r"Cash generated by operating activities\s*\$?([\d,]+)\s*\$?([\d,]+)\s*\$?([\d,]+)"
-    alt_operating_cash_flow_match = re.search(alt_operating_cash_flow_pattern, text)
-    
-    if operating_cash_flow_match:
-        metrics['operating_cash_flow']['2024'] = operating_cash_flow_match.group(1)
-        metrics['operating_cash_flow']['2023'] = operating_cash_flow_match.group(2)
-        metrics['operating_cash_flow']['2022'] = operating_cash_flow_match.group(3)
-        print(f"✅ Flux de trésorerie d'exploitation extraits avec succès : {metrics['operating_cash_flow']}")
-    elif alt_operating_cash_flow_match:
-        metrics['operating_cash_flow']['2024'] = alt_operating_cash_flow_match.group(1)
-        metrics['operating_cash_flow']['2023'] = alt_operating_cash_flow_match.group(2)
-        metrics['operating_cash_flow']['2022'] = alt_operating_cash_flow_match.group(3)
-        print(f"✅ Flux de trésorerie d'exploitation extraits avec succès : {metrics['operating_cash_flow']}")
-    else:
-        print("❌ Impossible de trouver les flux de trésorerie d'exploitation")
+        matches = scan_metrics_stream(text, issuers)
+    
+    for metric, (success_message, failure_label) in METRIC_MESSAGES.items():
+        if metric in matches:
+            issuer, match = matches[metric]
+            for year, value in zip(METRIC_YEARS, match.groups()):
+                metrics[metric][year] = value
+            print(f"✅ {success_message} avec succès ({issuer}) : {metrics[metric]}")
+        else:
+            print(f"❌ Impossible de trouver {failure_label}")
     
     return metrics
 
@@ -207,226 +552,579 @@ def clean_value(value):
     
     return float(value)
 
+# Métriques et années du cube utilisé pour le calcul des ratios
+RATIO_METRICS = ['revenue', 'net_income', 'gross_profit', 'total_assets', 'total_liabilities']
+RATIO_YEARS = sorted(METRIC_YEARS)
+
+# Métriques pour lesquelles les taux de croissance et le CAGR sont calculés
+GROWTH_METRICS = ['revenue', 'net_income', 'gross_profit']
+
+# Messages affichés pour chaque ratio calculé ({period} : année ou période, par exemple 2022-2024)
+RATIO_MESSAGES = {
+    'net_margin': "Marge nette {period} calculée",
+    'gross_margin': "Marge brute {period} calculée",
+    'debt_ratio': "Ratio d'endettement {period} calculé",
+    'financial_autonomy': "Ratio d'autonomie financière {period} calculé",
+    'roa': "ROA {period} calculé",
+    'roe': "ROE {period} calculé",
+}
+RATIO_MESSAGES.update({f'{metric}_cagr': f"CAGR {metric} ({{period}}) calculé" for metric in GROWTH_METRICS})
+RATIO_MESSAGES.update({f'{metric}_growth': f"Croissance {metric} {{period}} calculée" for metric in GROWTH_METRICS})
+
+
+def parse_values(raw_values):
+    """
+    Convertit une séquence de valeurs financières brutes ('$1,234', '(56)',
+    78.9, None...) en tableau de nombres avec les règles de clean_value.
+    
+    Les valeurs sont d'abord dédoublonnées, de sorte que chaque valeur brute
+    distincte n'est analysée qu'une seule fois.
+    """
+    codes, uniques = pd.factorize(pd.Series(raw_values, dtype=object), use_na_sentinel=False)
+    parsed = np.array([clean_value(value) for value in uniques], dtype=float)
+    return np.nan_to_num(parsed, nan=0.0)[codes]
+
+
+def build_metrics_cube(all_metrics, years=None, metric_names=None):
+    """
+    Construit un cube entreprise x année x métrique à partir des métriques
+    brutes de plusieurs entreprises ({entreprise: metrics}).
+    
+    Chaque valeur brute n'est convertie qu'une seule fois. Les valeurs absentes
+    valent NaN, les valeurs présentes mais illisibles valent 0 (comme clean_value).
+    
+    Returns:
+        Tuple (entreprises, années, métriques, cube de forme (E, A, M))
+    """
+    years = list(years or RATIO_YEARS)
+    metric_names = list(metric_names or RATIO_METRICS)
+    companies = list(all_metrics)
+    
+    cube = np.full((len(companies), len(years), len(metric_names)), np.nan)
+    
+    positions = []
+    raw_values = []
+    for c, company in enumerate(companies):
+        for m, metric in enumerate(metric_names):
+            metric_values = all_metrics[company].get(metric, {})
+            for y, year in enumerate(years):
+                if year in metric_values:
+                    positions.append((c, y, m))
+                    raw_values.append(metric_values[year])
+    
+    if positions:
+        c, y, m = np.array(positions).T
+        cube[c, y, m] = parse_values(raw_values)
+    
+    return companies, years, metric_names, cube
+
+
+def compute_ratio_arrays(cube, years, metric_names):
+    """
+    Calcule tous les ratios financiers sous forme d'expressions vectorisées
+    sur le cube entreprise x année x métrique.
+    
+    Les ratios annuels ont la forme (E, A), les taux de croissance la forme
+    (E, A - 1) et les CAGR la forme (E,). Un ratio non calculable vaut NaN.
+    """
+    index = {metric: i for i, metric in enumerate(metric_names)}
+    revenue = cube[:, :, index['revenue']]
+    net_income = cube[:, :, index['net_income']]
+    gross_profit = cube[:, :, index['gross_profit']]
+    total_assets = cube[:, :, index['total_assets']]
+    total_liabilities = cube[:, :, index['total_liabilities']]
+    equity = total_assets - total_liabilities
+    
+    def percent(numerator, denominator, valid):
+        return np.where(valid, numerator / denominator * 100, np.nan)
+    
+    arrays = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Marges
+        arrays['net_margin'] = percent(net_income, revenue, revenue > 0)
+        arrays['gross_margin'] = percent(gross_profit, revenue, revenue > 0)
+        
+        # Structure financière et rentabilité
+        arrays['debt_ratio'] = percent(total_liabilities, total_assets, total_assets > 0)
+        arrays['financial_autonomy'] = percent(equity, total_assets, total_assets > 0)
+        arrays['roa'] = percent(net_income, total_assets, total_assets > 0)
+        arrays['roe'] = percent(net_income, equity, (total_assets > 0) & (equity > 0))
+        
+        # Taux de croissance annuels et CAGR
+        span = len(years) - 1
+        for metric in GROWTH_METRICS:
+            values = cube[:, :, index[metric]]
+            complete = ~np.isnan(values).any(axis=1)
+            previous, current = values[:, :-1], values[:, 1:]
+            
+            arrays[f'{metric}_growth'] = np.where(
+                complete[:, None] & (previous > 0), (current - previous) / previous * 100, np.nan
+            )
+            arrays[f'{metric}_cagr'] = np.where(
+                complete & (values[:, 0] > 0), ((values[:, -1] / values[:, 0]) ** (1 / span) - 1) * 100, np.nan
+            )
+    
+    return arrays
+
+
+def ratio_arrays_to_dict(companies, years, arrays):
+    """Convertit les tableaux de ratios au format {entreprise: ratios} de calculate_financial_ratios."""
+    yearly = ['net_margin', 'gross_margin', 'debt_ratio', 'financial_autonomy', 'roa', 'roe']
+    growth_periods = [f'{years[i]}_{years[i + 1]}' for i in range(len(years) - 1)]
+    cagr_period = f'{years[0]}_{years[-1]}'
+    
+    all_ratios = {}
+    for c, company in enumerate(companies):
+        ratios = defaultdict(dict)
+        
+        for name in yearly:
+            for y in reversed(range(len(years))):
+                value = arrays[name][c, y]
+                if not np.isnan(value):
+                    ratios[name][years[y]] = float(value)
+        
+        for metric in GROWTH_METRICS:
+            value = arrays[f'{metric}_cagr'][c]
+            if not np.isnan(value):
+                ratios[f'{metric}_cagr'][cagr_period] = float(value)
+            for p, period in enumerate(growth_periods):
+                value = arrays[f'{metric}_growth'][c, p]
+                if not np.isnan(value):
+                    ratios[f'{metric}_growth'][period] = float(value)
+        
+        all_ratios[company] = ratios
+    
+    return all_ratios
+
+
+def calculate_ratios_batch(all_metrics, as_dict=False):
+    """
+    Calcule les ratios financiers de plusieurs entreprises en un seul appel.
+    
+    Args:
+        all_metrics: Dictionnaire {entreprise: metrics} au format d'extract_key_metrics
+        as_dict: Si True, retourne {entreprise: ratios} au format de calculate_financial_ratios
+        
+    Returns:
+        Tuple (entreprises, années, {ratio: tableau}) ou dictionnaire des ratios par entreprise
+    """
+    companies, years, metric_names, cube = build_metrics_cube(all_metrics)
+    arrays = compute_ratio_arrays(cube, years, metric_names)
+    
+    if as_dict:
+        return ratio_arrays_to_dict(companies, years, arrays)
+    return companies, years, arrays
+
+
 def calculate_financial_ratios(metrics):
     """Calcule les ratios financiers importants."""
     print("🧮 Calcul des ratios financiers...")
     
-    ratios = defaultdict(dict)
+    ratios = calculate_ratios_batch({None: metrics}, as_dict=True)[None]
     
-    for year in ['2024', '2023', '2022']:
-        if year in metrics['revenue'] and year in metrics['net_income']:
-            # Marge nette
-            revenue = clean_value(metrics['revenue'].get(year, 0))
-            net_income = clean_value(metrics['net_income'].get(year, 0))
-            
-            if revenue > 0:
-                ratios['net_margin'][year] = (net_income / revenue) * 100
-                print(f"✅ Marge nette {year} calculée : {ratios['net_margin'][year]:.2f}%")
-        
-        if year in metrics['revenue'] and year in metrics['gross_profit']:
-            # Marge brute
-            revenue = clean_value(metrics['revenue'].get(year, 0))
-            gross_profit = clean_value(metrics['gross_profit'].get(year, 0))
-            
-            if revenue > 0:
-                ratios['gross_margin'][year] = (gross_profit / revenue) * 100
-                print(f"✅ Marge brute {year} calculée : {ratios['gross_margin'][year]:.2f}%")
-    
-    # Ratio d'endettement (2024 et 2023 seulement)
-    for year in ['2024', '2023']:
-        if year in metrics['total_assets'] and year in metrics['total_liabilities']:
-            total_assets = clean_value(metrics['total_assets'].get(year, 0))
-            total_liabilities = clean_value(metrics['total_liabilities'].get(year, 0))
-            
-            if total_assets > 0:
-                ratios['debt_ratio'][year] = (total_liabilities / total_assets) * 100
-                print(f"✅ Ratio d'endettement {year} calculé : {ratios['debt_ratio'][year]:.2f}%")
-                
-                # Ratio d'autonomie financière (Capitaux propres / Total actif)
-                equity = total_assets - total_liabilities
-                ratios['financial_autonomy'][year] = (equity / total_assets) * 100
-                print(f"✅ Ratio d'autonomie financière {year} calculé : {ratios['financial_autonomy'][year]:.2f}%")
-                
-                # ROA (Return on Assets) - Rentabilité des actifs
-                if year in metrics['net_income']:
-                    net_income = clean_value(metrics['net_income'].get(year, 0))
-                    ratios['roa'][year] = (net_income / total_assets) * 100
-                    print(f"✅ ROA {year} calculé : {ratios['roa'][year]:.2f}%")
-                
-                # ROE (Return on Equity) - Rentabilité des capitaux propres
-                if year in metrics['net_income'] and equity > 0:
-                    net_income = clean_value(metrics['net_income'].get(year, 0))
-                    ratios['roe'][year] = (net_income / equity) * 100
-                    print(f"✅ ROE {year} calculé : {ratios['roe'][year]:.2f}%")
-    
-    # Calcul des taux de croissance
-    for metric in ['revenue', 'net_income', 'gross_profit']:
-        if all(year in metrics[metric] for year in ['2022', '2023', '2024']):
-            # Taux de croissance annuel composé (CAGR) sur 2 ans
-            value_2022 = clean_value(metrics[metric]['2022'])
-            value_2024 = clean_value(metrics[metric]['2024'])
-            
-            if value_2022 > 0:
-                cagr = ((value_2024 / value_2022) ** (1/2) - 1) * 100
-                # Utiliser une chaîne de caractères comme clé au lieu d'un tuple
-                ratios[f'{metric}_cagr']['2022_2024'] = cagr
-                print(f"✅ CAGR {metric} (2022-2024) calculé : {cagr:.2f}%")
-            
-            # Taux de croissance annuels
-            value_2023 = clean_value(metrics[metric]['2023'])
-            
-            if value_2022 > 0:
-                growth_2022_2023 = ((value_2023 - value_2022) / value_2022) * 100
-                ratios[f'{metric}_growth']['2022_2023'] = growth_2022_2023
-                print(f"✅ Croissance {metric} 2022-2023 calculée : {growth_2022_2023:.2f}%")
-            
-            if value_2023 > 0:
-                growth_2023_2024 = ((value_2024 - value_2023) / value_2023) * 100
-                ratios[f'{metric}_growth']['2023_2024'] = growth_2023_2024
-                print(f"✅ Croissance {metric} 2023-2024 calculée : {growth_2023_2024:.2f}%")
+    for name, values in ratios.items():
+        for period, value in values.items():
+            message = RATIO_MESSAGES[name].format(period=period.replace('_', '-'))
+            print(f"✅ {message} : {value:.2f}%")
     
     return ratios
 
-def create_visualizations(metrics, ratios, output_dir):
-    """Crée des visualisations pour les métriques financières clés."""
-    print("📊 Création des visualisations...")
-    
-    # Création du répertoire de sortie s'il n'existe pas
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Années disponibles
-    years = ['2022', '2023', '2024']
-    years_for_assets = ['2023', '2024']  # Seulement 2023 et 2024 pour les actifs et passifs
-    
-    # Configuration des graphiques
-    plt.style.use('ggplot')
-    plt.rcParams['figure.figsize'] = (12, 8)
-    plt.rcParams['font.size'] = 12
-    
-    # 1. Graphique des revenus
-    plt.figure()
-    revenue_values = [clean_value(metrics['revenue'].get(year, 0)) for year in years]
-    bars = plt.bar(years, revenue_values, color='#1f77b4')
-    plt.title('Revenus de Tesla (en millions $)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Millions $', fontsize=14)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """Calcule l'empreinte SHA-256 du contenu d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_digest(*objects):
+    """Calcule l'empreinte SHA-256 d'objets sérialisables en JSON, indépendamment de l'ordre des clés."""
+    payload = json.dumps(objects, sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Fichier, dans chaque répertoire de sortie, qui conserve l'empreinte des données de chaque graphique
+CHART_MANIFEST = '.charts_manifest.json'
+
+# Formats d'image pris en charge pour les graphiques
+CHART_FORMATS = ['png', 'svg']
+
+
+def _format_currency_axis(value, pos):
+    """Formate l'axe Y pour afficher les valeurs en millions/milliards."""
+    if value >= 1e9:
+        return f'${value/1e9:.1f}B'
+    elif value >= 1e6:
+        return f'${value/1e6:.1f}M'
+    else:
+        return f'${value:.0f}'
+
+
+def _draw_growth_bars(fig, years, values, title, color, value_offset, growth_offset):
+    """Histogramme d'une métrique avec les valeurs et les taux de croissance annuels."""
+    ax = fig.add_subplot()
+    bars = ax.bar(years, values, color=color)
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Année', fontsize=14)
+    ax.set_ylabel('Millions $', fontsize=14)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
     
     # Ajout des valeurs sur les barres
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 1000,
-                 f'${height:,.0f}', ha='center', va='bottom', fontsize=12)
+        ax.text(bar.get_x() + bar.get_width()/2., height + value_offset,
+                f'${height:,.0f}', ha='center', va='bottom', fontsize=12)
     
     # Ajout des pourcentages de croissance
-    for i in range(1, len(revenue_values)):
-        growth = ((revenue_values[i] - revenue_values[i-1]) / revenue_values[i-1]) * 100
-        plt.text(i, revenue_values[i] - 5000, f'{growth:.2f}%', 
-                 ha='center', va='top', fontsize=12, color='white', fontweight='bold')
-    
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'tesla_revenue.png'), dpi=300)
-    plt.close()
-    
-    # 2. Graphique du bénéfice net
-    plt.figure()
-    net_income_values = [clean_value(metrics['net_income'].get(year, 0)) for year in years]
-    bars = plt.bar(years, net_income_values, color='#2ca02c')
-    plt.title('Bénéfice Net de Tesla (en millions $)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Millions $', fontsize=14)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    for i in range(1, len(values)):
+        if values[i-1]:
+            growth = ((values[i] - values[i-1]) / values[i-1]) * 100
+            ax.text(i, values[i] - growth_offset, f'{growth:.2f}%',
+                    ha='center', va='top', fontsize=12, color='white', fontweight='bold')
+    
+    fig.tight_layout()
+
+
+def _draw_margins(fig, years, gross_margin_values, net_margin_values, title):
+    """Courbes des marges brute et nette."""
+    ax = fig.add_subplot()
+    ax.plot(years, gross_margin_values, 'o-', linewidth=3, markersize=10, label='Marge Brute')
+    ax.plot(years, net_margin_values, 's-', linewidth=3, markersize=10, label='Marge Nette')
+    
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Année', fontsize=14)
+    ax.set_ylabel('Pourcentage (%)', fontsize=14)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(fontsize=12)
+    
+    # Ajout des valeurs sur les points
+    for i, value in enumerate(gross_margin_values):
+        ax.text(i, value + 1, f'{value:.2f}%', ha='center', fontsize=12)
+    
+    for i, value in enumerate(net_margin_values):
+        ax.text(i, value - 1, f'{value:.2f}%', ha='center', fontsize=12)
+    
+    fig.tight_layout()
+
+
+def _draw_percent_bars(fig, years, values, title, color):
+    """Histogramme d'un ratio exprimé en pourcentage."""
+    ax = fig.add_subplot()
+    bars = ax.bar(years, values, color=color)
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Année', fontsize=14)
+    ax.set_ylabel('Pourcentage (%)', fontsize=14)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
     
     # Ajout des valeurs sur les barres
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 500,
-                 f'${height:,.0f}', ha='center', va='bottom', fontsize=12)
+        ax.text(bar.get_x() + bar.get_width()/2., height + 1,
+                f'{height:.2f}%', ha='center', va='bottom', fontsize=12)
     
-    # Ajout des pourcentages de croissance
-    for i in range(1, len(net_income_values)):
-        growth = ((net_income_values[i] - net_income_values[i-1]) / net_income_values[i-1]) * 100
-        plt.text(i, net_income_values[i] - 500, f'{growth:.2f}%', 
-                 ha='center', va='top', fontsize=12, color='white', fontweight='bold')
+    fig.tight_layout()
+
+
+def _draw_assets_liabilities(fig, years, assets_values, liabilities_values, title):
+    """Histogramme comparatif des actifs et passifs."""
+    ax = fig.add_subplot()
+    x = range(len(years))
+    width = 0.35
     
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'tesla_net_income.png'), dpi=300)
-    plt.close()
+    ax.bar([i - width/2 for i in x], assets_values, width, label='Actifs Totaux', color='#1f77b4')
+    ax.bar([i + width/2 for i in x], liabilities_values, width, label='Passifs Totaux', color='#ff7f0e')
     
-    # 3. Graphique des marges
-    plt.figure()
-    gross_margin_values = [ratios['gross_margin'].get(year, 0) for year in years]
-    net_margin_values = [ratios['net_margin'].get(year, 0) for year in years]
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Année', fontsize=14)
+    ax.set_ylabel('Millions $', fontsize=14)
+    ax.set_xticks(list(x), years)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(fontsize=12)
     
-    plt.plot(years, gross_margin_values, 'o-', linewidth=3, markersize=10, label='Marge Brute')
-    plt.plot(years, net_margin_values, 's-', linewidth=3, markersize=10, label='Marge Nette')
+    # Ajout des valeurs sur les barres
+    for i, value in enumerate(assets_values):
+        ax.text(i - width/2, value + 2000, f'${value:,.0f}', ha='center', va='bottom', fontsize=12)
     
-    plt.title('Évolution des Marges de Tesla (%)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Pourcentage (%)', fontsize=14)
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.legend(fontsize=12)
+    for i, value in enumerate(liabilities_values):
+        ax.text(i + width/2, value + 2000, f'${value:,.0f}', ha='center', va='bottom', fontsize=12)
     
-    # Ajout des valeurs sur les points
-    for i, value in enumerate(gross_margin_values):
-        plt.text(i, value + 1, f'{value:.2f}%', ha='center', fontsize=12)
+    fig.tight_layout()
+
+
+def _draw_grouped_bars(fig, years, series, title, ylabel):
+    """Histogramme groupé comparant plusieurs entreprises ({entreprise: valeurs})."""
+    ax = fig.add_subplot()
+    x = range(len(years))
+    width = 0.8 / len(series)
     
-    for i, value in enumerate(net_margin_values):
-        plt.text(i, value - 1, f'{value:.2f}%', ha='center', fontsize=12)
+    for i, (company, values) in enumerate(series.items()):
+        ax.bar([pos + i * width - (len(series) - 1) * width / 2 for pos in x],
+               values, width, label=company)
     
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'tesla_margins.png'), dpi=300)
-    plt.close()
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Année', fontsize=14)
+    ax.set_ylabel(ylabel, fontsize=14)
+    ax.set_xticks(list(x), years)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(fontsize=12)
     
-    # 4. Graphique du ratio d'endettement
-    plt.figure()
-    debt_ratio_values = [ratios['debt_ratio'].get(year, 0) for year in years_for_assets]
-    bars = plt.bar(years_for_assets, debt_ratio_values, color='#d62728')
-    plt.title('Ratio d\'Endettement de Tesla (%)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Pourcentage (%)', fontsize=14)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+
+
+def _draw_comparative_lines(fig, years, series, title, label_suffix):
+    """Courbes comparant un ratio entre plusieurs entreprises ({entreprise: valeurs})."""
+    ax = fig.add_subplot()
+    for company, values in series.items():
+        ax.plot(years, values, 'o-', linewidth=3, markersize=10, label=f"{company} - {label_suffix}")
+    
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Année', fontsize=14)
+    ax.set_ylabel('Pourcentage (%)', fontsize=14)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(fontsize=12)
+    
+    fig.tight_layout()
+
+
+def _plot_prediction_series(ax, series, linewidth, markersize, labels):
+    """Trace l'historique, la prédiction et la zone de confiance d'une série sur un axe."""
+    historical_color = '#1f77b4'  # Bleu
+    prediction_color = '#ff7f0e'  # Orange
+    confidence_color = '#ff7f0e20'  # Orange transparent pour l'intervalle de confiance
     
-    # Ajout des valeurs sur les barres
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 1,
-                 f'{height:.2f}%', ha='center', va='bottom', fontsize=12)
+    ax.plot(series['historical_years'], series['historical_values'], 'o-', color=historical_color,
+            linewidth=linewidth, markersize=markersize, label=labels[0])
+    ax.plot(series['future_years'], series['predicted_values'], 'o--', color=prediction_color,
+            linewidth=linewidth, markersize=markersize, label=labels[1])
+    
+    # Ajouter la zone de l'intervalle de prédiction si disponible
+    if 'lower' in series and 'upper' in series:
+        ax.fill_between(
+            series['future_years'], series['lower'], series['upper'],
+            color=confidence_color, alpha=0.5,
+            label=f"{labels[2]} ({series['interval_level']:.0%})"
+        )
+
+
+def _draw_prediction(fig, series, kind, title, growth_rate=None):
+    """Graphique de prédiction d'une métrique ('currency') ou d'un ratio ('percent')."""
+    ax = fig.add_subplot()
+    _plot_prediction_series(ax, series, 3, 10, ['Données historiques', 'Prédictions', 'Intervalle de confiance'])
+    
+    # Ajouter les valeurs sur les points
+    value_format = '${:,.0f}' if kind == 'currency' else '{:.2f}%'
+    points = [(year, value, None) for year, value in zip(series['historical_years'], series['historical_values'])]
+    points += [(year, value, '#ff7f0e') for year, value in zip(series['future_years'], series['predicted_values'])]
+    for year, value, color in points:
+        ax.annotate(value_format.format(value),
+                    xy=(year, value),
+                    xytext=(0, 10),
+                    textcoords='offset points',
+                    ha='center', va='bottom',
+                    fontsize=9, fontweight='bold',
+                    color=color)
+    
+    # Ajouter le taux de croissance prédit
+    if growth_rate is not None:
+        growth_text = f'Taux de croissance annuel moyen prédit: {growth_rate:.2f}%'
+        fig.text(0.5, 0.01, growth_text, ha='center', fontsize=12, fontweight='bold')
+    
+    if kind == 'currency':
+        ax.yaxis.set_major_formatter(mtick.FuncFormatter(_format_currency_axis))
+        ylabel = 'Valeur ($)'
+    else:
+        ax.yaxis.set_major_formatter(mtick.PercentFormatter())
+        ylabel = 'Pourcentage (%)'
     
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'tesla_debt_ratio.png'), dpi=300)
-    plt.close()
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
+    ax.set_xlabel('Année', fontsize=12, labelpad=10)
+    ax.set_ylabel(ylabel, fontsize=12, labelpad=10)
     
-    # 5. Graphique comparatif des actifs et passifs
-    plt.figure()
-    assets_values = [clean_value(metrics['total_assets'].get(year, 0)) for year in years_for_assets]
-    liabilities_values = [clean_value(metrics['total_liabilities'].get(year, 0)) for year in years_for_assets]
+    # Personnaliser les ticks de l'axe X
+    all_years = series['historical_years'] + series['future_years']
+    ax.set_xticks(all_years)
+    ax.tick_params(axis='both', labelsize=10)
     
-    x = range(len(years_for_assets))
-    width = 0.35
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(loc='best', fontsize=10)
     
-    plt.bar([i - width/2 for i in x], assets_values, width, label='Actifs Totaux', color='#1f77b4')
-    plt.bar([i + width/2 for i in x], liabilities_values, width, label='Passifs Totaux', color='#ff7f0e')
+    if kind == 'currency':
+        fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+    else:
+        fig.tight_layout()
+
+
+def _draw_prediction_panels(fig, panels, kind):
+    """Graphique combiné : une prédiction par sous-graphique ({titre: série ou None})."""
+    axes = fig.subplots(1, len(panels))
     
-    plt.title('Actifs et Passifs de Tesla (en millions $)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Millions $', fontsize=14)
-    plt.xticks(x, years_for_assets)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend(fontsize=12)
+    for ax, (title, series) in zip(axes, panels.items()):
+        if series is None:
+            continue
+        
+        _plot_prediction_series(ax, series, 2, 8, ['Historique', 'Prédiction', 'Confiance'])
+        
+        if kind == 'currency':
+            ax.yaxis.set_major_formatter(mtick.FuncFormatter(_format_currency_axis))
+        else:
+            ax.yaxis.set_major_formatter(mtick.PercentFormatter())
+        
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_xlabel('Année', fontsize=10)
+        
+        # Personnaliser les ticks de l'axe X
+        all_years = series['historical_years'] + series['future_years']
+        ax.set_xticks(all_years)
+        ax.set_xticklabels(all_years, fontsize=9, rotation=45)
+        
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend(loc='best', fontsize=9)
     
-    # Ajout des valeurs sur les barres
-    for i, value in enumerate(assets_values):
-        plt.text(i - width/2, value + 2000, f'${value:,.0f}', ha='center', va='bottom', fontsize=12)
+    fig.tight_layout()
+
+
+def chart_job(filename, draw, figsize, style, savefig_options=None, **data):
+    """
+    Décrit un graphique à produire : fonction de tracé, dimensions, style
+    matplotlib et données. Les données doivent être sérialisables en JSON,
+    car leur empreinte permet d'éviter de redessiner un graphique inchangé.
+    """
+    return {
+        'filename': filename,
+        'draw': draw,
+        'figsize': figsize,
+        'style': style,
+        'savefig_options': savefig_options or {},
+        'data': data
+    }
+
+
+def _chart_digest(job, image_format):
+    """Calcule l'empreinte SHA-256 des données et paramètres d'un graphique."""
+    return content_digest(job['draw'].__name__, job['figsize'], job['style'], job['savefig_options'],
+                          job['data'], image_format)
+
+
+def _render_chart(job, path):
+    """Dessine un graphique sur une figure Agg indépendante de l'état global de pyplot."""
+    with matplotlib.style.context(job['style']):
+        fig = Figure(figsize=job['figsize'])
+        FigureCanvasAgg(fig)
+        job['draw'](fig, **job['data'])
+        fig.savefig(path, dpi=300, **job['savefig_options'])
+    return path
+
+
+def render_charts(jobs, output_dir, image_format='png', workers=1, force=False):
+    """
+    Produit une liste de graphiques dans output_dir.
     
-    for i, value in enumerate(liabilities_values):
-        plt.text(i + width/2, value + 2000, f'${value:,.0f}', ha='center', va='bottom', fontsize=12)
+    Un graphique n'est redessiné que si l'empreinte de ses données diffère de
+    celle du dernier rendu (enregistrée dans CHART_MANIFEST), si le fichier
+    a disparu ou si force est vrai. Avec workers > 1, les graphiques sont
+    dessinés dans un pool de processus.
+    
+    Returns:
+        Liste des chemins des graphiques (dessinés ou déjà à jour)
+    """
+    if image_format not in CHART_FORMATS:
+        raise ValueError(f"Format de graphique non pris en charge: {image_format}")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    manifest_path = os.path.join(output_dir, CHART_MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+    
+    paths = []
+    pending = []
+    for job in jobs:
+        filename = f"{job['filename']}.{image_format}"
+        path = os.path.join(output_dir, filename)
+        digest = _chart_digest(job, image_format)
+        paths.append(path)
+        
+        if not force and manifest.get(filename) == digest and os.path.exists(path):
+            print(f"⏭️  Graphique inchangé, rendu ignoré : {path}")
+            continue
+        pending.append((job, path, filename, digest))
+    
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_render_chart, [job for job, _, _, _ in pending], [path for _, path, _, _ in pending]))
+    else:
+        for job, path, _, _ in pending:
+            _render_chart(job, path)
+    
+    for _, path, filename, digest in pending:
+        manifest[filename] = digest
+        print(f"✅ Graphique sauvegardé dans {path}")
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    
+    return paths
+
+
+def create_visualizations(metrics, ratios, output_dir, image_format='png', workers=1, force=False):
+    """Crée des visualisations pour les métriques financières clés."""
+    print("📊 Création des visualisations...")
     
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'tesla_assets_liabilities.png'), dpi=300)
-    plt.close()
+    # Années disponibles
+    years = ['2022', '2023', '2024']
+    years_for_assets = ['2023', '2024']  # Seulement 2023 et 2024 pour les actifs et passifs
+    
+    # Configuration des graphiques
+    style = ['ggplot', {'font.size': 12}]
+    figsize = (12, 8)
+    
+    jobs = [
+        # 1. Graphique des revenus
+        chart_job('tesla_revenue', _draw_growth_bars, figsize, style,
+                  years=years,
+                  values=[clean_value(metrics['revenue'].get(year, 0)) for year in years],
+                  title='Revenus de Tesla (en millions $)', color='#1f77b4',
+                  value_offset=1000, growth_offset=5000),
+        
+        # 2. Graphique du bénéfice net
+        chart_job('tesla_net_income', _draw_growth_bars, figsize, style,
+                  years=years,
+                  values=[clean_value(metrics['net_income'].get(year, 0)) for year in years],
+                  title='Bénéfice Net de Tesla (en millions $)', color='#2ca02c',
+                  value_offset=500, growth_offset=500),
+        
+        # 3. Graphique des marges
+        chart_job('tesla_margins', _draw_margins, figsize, style,
+                  years=years,
+                  gross_margin_values=[ratios['gross_margin'].get(year, 0) for year in years],
+                  net_margin_values=[ratios['net_margin'].get(year, 0) for year in years],
+                  title='Évolution des Marges de Tesla (%)'),
+        
+        # 4. Graphique du ratio d'endettement
+        chart_job('tesla_debt_ratio', _draw_percent_bars, figsize, style,
+                  years=years_for_assets,
+                  values=[ratios['debt_ratio'].get(year, 0) for year in years_for_assets],
+                  title='Ratio d\'Endettement de Tesla (%)', color='#d62728'),
+        
+        # 5. Graphique comparatif des actifs et passifs
+        chart_job('tesla_assets_liabilities', _draw_assets_liabilities, figsize, style,
+                  years=years_for_assets,
+                  assets_values=[clean_value(metrics['total_assets'].get(year, 0)) for year in years_for_assets],
+                  liabilities_values=[clean_value(metrics['total_liabilities'].get(year, 0)) for year in years_for_assets],
+                  title='Actifs et Passifs de Tesla (en millions $)'),
+    ]
+    
+    paths = render_charts(jobs, output_dir, image_format, workers, force)
     
     print(f"✅ Visualisations créées et enregistrées dans le répertoire {output_dir}")
+    return paths
 
 def save_results(metrics, ratios, output_dir):
     """Sauvegarde les résultats dans des fichiers CSV et JSON."""
@@ -645,127 +1343,245 @@ def save_results(metrics, ratios, output_dir):
     print(f"   - {csv_path}")
     print(f"   - {json_path}")
     print(f"   - {report_path}")
+    
+    return [csv_path, json_path, report_path]
 
-def process_multiple_reports(file_paths, output_dir):
-    """Traite plusieurs rapports financiers et les compare."""
-    print("🔄 Traitement de plusieurs rapports financiers...")
+# Fichier, dans chaque répertoire de sortie, qui conserve l'empreinte des entrées et du résultat de chaque étape
+PIPELINE_MANIFEST = '.pipeline_manifest.json'
+
+# Version du manifeste : l'incrémenter invalide les résultats enregistrés par une version antérieure des étapes
+PIPELINE_VERSION = 2
+
+
+def load_pipeline_manifest(output_dir):
+    """Charge le manifeste des étapes d'un répertoire de sortie (vide s'il est absent, illisible ou périmé)."""
+    manifest_path = os.path.join(output_dir, PIPELINE_MANIFEST)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    
+    if manifest.get('version') != PIPELINE_VERSION:
+        manifest = {'version': PIPELINE_VERSION, 'stages': {}}
+    return manifest
+
+
+def save_pipeline_manifest(manifest, output_dir):
+    """Enregistre le manifeste des étapes de manière atomique."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, PIPELINE_MANIFEST)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def run_stage(manifest, stage, input_digest, compute, force=False, writes_files=False):
+    """
+    Exécute une étape du pipeline, sauf si ses entrées n'ont pas changé.
+    
+    L'étape est ignorée, et son résultat enregistré est réutilisé, lorsque
+    l'empreinte de ses entrées est identique à celle de la dernière exécution.
+    Pour une étape qui écrit des fichiers (writes_files), compute() retourne
+    la liste des chemins écrits et l'étape est rejouée si l'un d'eux a disparu.
+    
+    Args:
+        manifest: Manifeste chargé par load_pipeline_manifest
+        stage: Nom de l'étape
+        input_digest: Empreinte des entrées de l'étape
+        compute: Fonction sans argument qui exécute l'étape
+        force: Si True, exécute l'étape dans tous les cas
+        writes_files: Si True, le résultat est la liste des fichiers écrits
+        
+    Returns:
+        Tuple (résultat, empreinte du résultat)
+    """
+    entry = manifest['stages'].get(stage)
+    if (not force and entry and entry['input'] == input_digest
+            and (not writes_files or all(os.path.exists(path) for path in entry['result']))):
+        print(f"⏭️  Étape {stage} inchangée depuis la dernière exécution, ignorée")
+        return entry['result'], entry['output']
+    
+    result = compute()
+    output_digest = content_digest(result)
+    manifest['stages'][stage] = {
+        'input': input_digest,
+        'output': output_digest,
+        'result': result
+    }
+    return result, output_digest
+
+
+def run_pipeline(file_path, output_dir, image_format='png', workers=1, force=False, with_predictions=False):
+    """
+    Exécute le pipeline complet sur un rapport : extraction, ratios,
+    prédictions (optionnelles), visualisations et sauvegarde des résultats.
     
-    all_metrics = {}
-    all_ratios = {}
+    Les empreintes du fichier d'entrée et du résultat de chaque étape sont
+    conservées dans PIPELINE_MANIFEST : une nouvelle exécution sur un rapport
+    inchangé ne rejoue aucune étape, sauf avec force.
     
-    # Traitement de chaque rapport
-    for file_path in file_paths:
-        company_name = os.path.basename(file_path).split('_')[0].upper()
-        print(f"\n📊 Traitement du rapport de {company_name}...")
-        
-        # Lecture et nettoyage du fichier
-        text = read_file(file_path)
-        cleaned_text = clean_text(text)
+    Returns:
+        Tuple (métriques, ratios, prédictions ou None)
+    """
+    manifest = load_pipeline_manifest(output_dir)
+    
+    def extract():
+        # Repérage des en-têtes et pieds de page, puis lecture et nettoyage du fichier en flux
+        furniture = find_page_furniture(iter_lines(read_file_chunks(file_path)))
         
         # Extraction des métriques clés
-        metrics = extract_key_metrics(cleaned_text)
+        return extract_key_metrics(clean_chunks(read_file_chunks(file_path), furniture))
+    
+    try:
+        metrics, metrics_digest = run_stage(manifest, 'extract', file_digest(file_path), extract, force)
         
         # Calcul des ratios financiers
-        ratios = calculate_financial_ratios(metrics)
+        ratios, ratios_digest = run_stage(manifest, 'ratios', metrics_digest,
+                                          lambda: calculate_financial_ratios(metrics), force)
+        ratios = defaultdict(dict, ratios)
         
-        # Stockage des résultats
+        # Calcul des prédictions
+        predictions = None
+        if with_predictions:
+            predictions, predictions_digest = run_stage(manifest, 'predictions', content_digest(metrics_digest, ratios_digest),
+                                                        lambda: predict_future_performance(metrics, ratios), force)
+        
+        # Création des visualisations et sauvegarde des résultats
+        run_stage(manifest, 'charts', content_digest(metrics_digest, ratios_digest, image_format),
+                  lambda: create_visualizations(metrics, ratios, output_dir, image_format, workers, force),
+                  force, writes_files=True)
+        run_stage(manifest, 'results', content_digest(metrics_digest, ratios_digest),
+                  lambda: save_results(metrics, ratios, output_dir), force, writes_files=True)
+        
+        if with_predictions:
+            # Visualisations et sauvegarde des résultats prédictifs
+            run_stage(manifest, 'prediction_charts',
+                      content_digest(metrics_digest, ratios_digest, predictions_digest, image_format),
+                      lambda: create_prediction_visualizations(metrics, ratios, predictions, output_dir,
+                                                               image_format, workers, force),
+                      force, writes_files=True)
+            run_stage(manifest, 'prediction_results', content_digest(ratios_digest, predictions_digest),
+                      lambda: save_prediction_results(predictions, output_dir, ratios), force, writes_files=True)
+    finally:
+        save_pipeline_manifest(manifest, output_dir)
+    
+    return metrics, ratios, predictions
+
+
+def run_comparative_pipeline(all_metrics, all_ratios, output_dir, image_format='png', workers=1, force=False):
+    """Crée les visualisations et résultats comparatifs, sauf si les données des entreprises n'ont pas changé."""
+    manifest = load_pipeline_manifest(output_dir)
+    input_digest = content_digest(all_metrics, all_ratios)
+    
+    try:
+        run_stage(manifest, 'comparative_charts', content_digest(input_digest, image_format),
+                  lambda: create_comparative_visualizations(all_metrics, all_ratios, output_dir,
+                                                            image_format, workers, force),
+                  force, writes_files=True)
+        run_stage(manifest, 'comparative_results', input_digest,
+                  lambda: save_comparative_results(all_metrics, all_ratios, output_dir), force, writes_files=True)
+    finally:
+        save_pipeline_manifest(manifest, output_dir)
+
+def process_report(file_path, output_dir, image_format='png', force=False):
+    """
+    Traite un rapport financier de manière indépendante : lecture, nettoyage,
+    extraction, ratios, visualisations et sauvegarde des résultats.
+    
+    Les graphiques sont rendus séquentiellement : en mode multi-fichiers,
+    le parallélisme se fait déjà au niveau des rapports. Les étapes dont les
+    entrées n'ont pas changé depuis la dernière exécution sont ignorées.
+    
+    Retourne le tuple (nom de l'entreprise, métriques, ratios).
+    """
+    company_name = os.path.basename(file_path).split('_')[0].upper()
+    print(f"\n📊 Traitement du rapport de {company_name}...")
+    
+    company_output_dir = os.path.join(output_dir, company_name.lower())
+    os.makedirs(company_output_dir, exist_ok=True)
+    
+    metrics, ratios, _ = run_pipeline(file_path, company_output_dir, image_format, force=force)
+    
+    return company_name, metrics, ratios
+
+def process_multiple_reports(file_paths, output_dir, workers=1, image_format='png', force=False):
+    """
+    Traite plusieurs rapports financiers et les compare.
+    
+    Les rapports sont indépendants jusqu'à l'étape comparative : avec
+    workers > 1, ils sont répartis sur un pool de processus, puis les
+    résultats sont rassemblés dans l'ordre des fichiers, de sorte que la
+    sortie est identique à celle d'un traitement séquentiel.
+    """
+    print("🔄 Traitement de plusieurs rapports financiers...")
+    
+    all_metrics = {}
+    all_ratios = {}
+    
+    # Traitement de chaque rapport
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(process_report, file_paths, repeat(output_dir),
+                                        repeat(image_format), repeat(force)))
+    else:
+        results = [process_report(file_path, output_dir, image_format, force) for file_path in file_paths]
+    
+    # Stockage des résultats
+    for company_name, metrics, ratios in results:
         all_metrics[company_name] = metrics
         all_ratios[company_name] = ratios
-        
-        # Création des visualisations individuelles
-        company_output_dir = os.path.join(output_dir, company_name.lower())
-        os.makedirs(company_output_dir, exist_ok=True)
-        
-        create_visualizations(metrics, ratios, company_output_dir)
-        save_results(metrics, ratios, company_output_dir)
     
     # Création de visualisations comparatives
     if len(all_metrics) > 1:
-        create_comparative_visualizations(all_metrics, all_ratios, output_dir)
-        save_comparative_results(all_metrics, all_ratios, output_dir)
+        run_comparative_pipeline(all_metrics, all_ratios, output_dir, image_format, workers, force)
     
     return all_metrics, all_ratios
 
-def create_comparative_visualizations(all_metrics, all_ratios, output_dir):
+def create_comparative_visualizations(all_metrics, all_ratios, output_dir, image_format='png', workers=1, force=False):
     """Crée des visualisations comparatives pour plusieurs entreprises."""
     print("📊 Création des visualisations comparatives...")
     
-    # Création du répertoire de sortie s'il n'existe pas
     comparative_dir = os.path.join(output_dir, "comparative")
-    os.makedirs(comparative_dir, exist_ok=True)
     
     # Années disponibles
     years = ['2022', '2023', '2024']
+    years_for_debt = ['2023', '2024']
     
     # Configuration des graphiques
-    plt.style.use('ggplot')
-    plt.rcParams['figure.figsize'] = (14, 10)
-    plt.rcParams['font.size'] = 12
-    
-    # 1. Comparaison des revenus
-    plt.figure()
+    style = ['ggplot', {'font.size': 12}]
+    figsize = (14, 10)
     
     companies = list(all_metrics.keys())
-    x = range(len(years))
-    width = 0.8 / len(companies)
-    
-    for i, company in enumerate(companies):
-        revenue_values = [clean_value(all_metrics[company]['revenue'].get(year, 0)) for year in years]
-        bars = plt.bar([pos + i * width - (len(companies) - 1) * width / 2 for pos in x], 
-                       revenue_values, width, label=company)
-    
-    plt.title('Comparaison des Revenus (en millions $)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Millions $', fontsize=14)
-    plt.xticks(x, years)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend(fontsize=12)
     
-    plt.tight_layout()
-    plt.savefig(os.path.join(comparative_dir, 'comparative_revenue.png'), dpi=300)
-    plt.close()
-    
-    # 2. Comparaison des marges nettes
-    plt.figure()
-    
-    for company in companies:
-        net_margin_values = [all_ratios[company]['net_margin'].get(year, 0) for year in years]
-        plt.plot(years, net_margin_values, 'o-', linewidth=3, markersize=10, label=f"{company} - Marge Nette")
-    
-    plt.title('Comparaison des Marges Nettes (%)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Pourcentage (%)', fontsize=14)
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.legend(fontsize=12)
-    
-    plt.tight_layout()
-    plt.savefig(os.path.join(comparative_dir, 'comparative_net_margin.png'), dpi=300)
-    plt.close()
-    
-    # 3. Comparaison des ratios d'endettement
-    plt.figure()
-    
-    years_for_debt = ['2023', '2024']
-    x = range(len(years_for_debt))
-    width = 0.8 / len(companies)
-    
-    for i, company in enumerate(companies):
-        debt_ratio_values = [all_ratios[company]['debt_ratio'].get(year, 0) for year in years_for_debt]
-        bars = plt.bar([pos + i * width - (len(companies) - 1) * width / 2 for pos in x], 
-                       debt_ratio_values, width, label=company)
-    
-    plt.title('Comparaison des Ratios d\'Endettement (%)', fontsize=16)
-    plt.xlabel('Année', fontsize=14)
-    plt.ylabel('Pourcentage (%)', fontsize=14)
-    plt.xticks(x, years_for_debt)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend(fontsize=12)
-    
-    plt.tight_layout()
-    plt.savefig(os.path.join(comparative_dir, 'comparative_debt_ratio.png'), dpi=300)
-    plt.close()
+    jobs = [
+        # 1. Comparaison des revenus
+        chart_job('comparative_revenue', _draw_grouped_bars, figsize, style,
+                  years=years,
+                  series={company: [clean_value(all_metrics[company]['revenue'].get(year, 0)) for year in years]
+                          for company in companies},
+                  title='Comparaison des Revenus (en millions $)', ylabel='Millions $'),
+        
+        # 2. Comparaison des marges nettes
+        chart_job('comparative_net_margin', _draw_comparative_lines, figsize, style,
+                  years=years,
+                  series={company: [all_ratios[company]['net_margin'].get(year, 0) for year in years]
+                          for company in companies},
+                  title='Comparaison des Marges Nettes (%)', label_suffix='Marge Nette'),
+        
+        # 3. Comparaison des ratios d'endettement
+        chart_job('comparative_debt_ratio', _draw_grouped_bars, figsize, style,
+                  years=years_for_debt,
+                  series={company: [all_ratios[company]['debt_ratio'].get(year, 0) for year in years_for_debt]
+                          for company in companies},
+                  title='Comparaison des Ratios d\'Endettement (%)', ylabel='Pourcentage (%)'),
+    ]
+    
+    paths = render_charts(jobs, comparative_dir, image_format, workers, force)
     
     print(f"✅ Visualisations comparatives créées et enregistrées dans le répertoire {comparative_dir}")
+    return paths
 
 def save_comparative_results(all_metrics, all_ratios, output_dir):
     """Sauvegarde les résultats comparatifs dans des fichiers CSV et JSON."""
@@ -996,321 +1812,258 @@ def save_comparative_results(all_metrics, all_ratios, output_dir):
     print(f"   - {report_path}")
     if excel_path:
         print(f"   - {excel_path}")
+    
+    return [path for path in [revenue_csv_path, net_margin_csv_path, json_path, report_path, excel_path] if path]
+
+# Styles nommés de l'export Excel, partagés par toutes les cellules concernées
+EXCEL_HEADER_STYLE = 'financial_header'
+EXCEL_LABEL_STYLE = 'financial_label'
+
+# Classements de la feuille « Classement » : (libellé, source, indicateur, année, plus grand d'abord, format)
+EXCEL_RANKINGS = [
+    ('Revenus 2024', 'metrics', 'revenue', '2024', True, '${:,.0f}'),
+    ('Croissance Revenus 2023-2024', 'growth', 'revenue', '2024', True, '{:.2f}%'),
+    ('Marge Nette 2024', 'ratios', 'net_margin', '2024', True, '{:.2f}%'),
+    ('Marge Brute 2024', 'ratios', 'gross_margin', '2024', True, '{:.2f}%'),
+    ('Ratio Endettement 2024 (le plus bas)', 'ratios', 'debt_ratio', '2024', False, '{:.2f}%'),
+    ('ROA 2024', 'ratios', 'roa', '2024', True, '{:.2f}%'),
+    ('ROE 2024', 'ratios', 'roe', '2024', True, '{:.2f}%'),
+]
+
+
+def _growth(previous, current):
+    """Taux de croissance en pourcentage, 0 si la valeur de départ n'est pas positive."""
+    return ((current - previous) / previous) * 100 if previous > 0 else 0
+
+
+def _excel_revenue_rows(all_metrics):
+    """Lignes de la feuille « Revenus »."""
+    for company, metrics in all_metrics.items():
+        revenue_2022, revenue_2023, revenue_2024 = (clean_value(metrics['revenue'].get(year, 0))
+                                                    for year in ['2022', '2023', '2024'])
+        yield [
+            company,
+            f"${revenue_2022:,.0f}",
+            f"${revenue_2023:,.0f}",
+            f"${revenue_2024:,.0f}",
+            f"{_growth(revenue_2022, revenue_2023):.2f}%",
+            f"{_growth(revenue_2023, revenue_2024):.2f}%"
+        ]
+
+
+def _excel_ratio_rows(all_ratios, columns):
+    """Lignes d'une feuille de ratios, columns étant la liste des couples (ratio, année)."""
+    for company, ratios in all_ratios.items():
+        yield [company] + [f"{ratios[name].get(year, 0):.2f}%" for name, year in columns]
+
+
+def _excel_ranking_rows(all_metrics, all_ratios):
+    """Lignes de la feuille « Classement » : les trois premières entreprises pour chaque indicateur."""
+    def score(source, name, year):
+        if source == 'metrics':
+            return lambda company: clean_value(all_metrics[company][name].get(year, 0))
+        if source == 'growth':
+            previous_year = str(int(year) - 1)
+            return lambda company: _growth(clean_value(all_metrics[company][name].get(previous_year, 0)),
+                                           clean_value(all_metrics[company][name].get(year, 0)))
+        return lambda company: all_ratios[company][name].get(year, 0)
+    
+    for label, source, name, year, descending, value_format in EXCEL_RANKINGS:
+        key = score(source, name, year)
+        companies = all_metrics if source != 'ratios' else all_ratios
+        select = heapq.nlargest if descending else heapq.nsmallest
+        podium = [f"{company}: {value_format.format(key(company))}" for company in select(3, companies, key=key)]
+        yield [label] + podium + [None] * (3 - len(podium))
+
+
+def _write_excel_sheet(wb, title, header, rows, label_column=False):
+    """
+    Écrit une feuille d'un classeur en écriture seule.
+    
+    rows est une fonction sans argument qui retourne un itérateur de lignes :
+    elle est parcourue une première fois pour calculer la largeur des
+    colonnes, qui doit être fixée avant l'écriture, puis une seconde fois pour
+    ajouter les lignes. Seules les largeurs sont conservées en mémoire.
+    """
+    widths = [len(str(value)) for value in header]
+    for row in rows():
+        for c_idx, value in enumerate(row):
+            if value is not None:
+                widths[c_idx] = max(widths[c_idx], len(str(value)))
+    
+    sheet = wb.create_sheet(title)
+    for c_idx, width in enumerate(widths, 1):
+        sheet.column_dimensions[get_column_letter(c_idx)].width = width + 2
+    
+    def styled(value, style):
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.style = style
+        return cell
+    
+    sheet.append([styled(value, EXCEL_HEADER_STYLE) for value in header])
+    for row in rows():
+        if label_column:
+            row = [styled(row[0], EXCEL_LABEL_STYLE)] + row[1:]
+        sheet.append(row)
+
 
 def export_to_excel(all_metrics, all_ratios, output_dir):
-    """Exporte les données financières comparatives vers un fichier Excel."""
-    try:
-        import pandas as pd
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill
-        from openpyxl.utils.dataframe import dataframe_to_rows
-    except ImportError:
-        print("❌ Les bibliothèques pandas et openpyxl sont requises pour l'exportation Excel.")
-        print("   Installez-les avec la commande : pip install pandas openpyxl")
-        return None
+    """
+    Exporte les données financières comparatives vers un fichier Excel.
     
+    Le classeur est écrit en mode écriture seule, une feuille après l'autre,
+    avec des styles nommés partagés : la mémoire utilisée ne dépend pas du
+    nombre d'entreprises.
+    """
     excel_path = os.path.join(output_dir, "financial_analysis.xlsx")
     
-    # Création du classeur Excel
-    wb = Workbook()
-    
-    # Suppression de la feuille par défaut
-    default_sheet = wb.active
-    wb.remove(default_sheet)
+    # Création du classeur Excel en écriture seule (sans feuille par défaut)
+    wb = Workbook(write_only=True)
+    wb.add_named_style(NamedStyle(
+        name=EXCEL_HEADER_STYLE,
+        font=Font(bold=True),
+        fill=PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"),
+        alignment=Alignment(horizontal="center")
+    ))
+    wb.add_named_style(NamedStyle(name=EXCEL_LABEL_STYLE, font=Font(bold=True)))
     
     # Feuille 1: Revenus
-    revenue_sheet = wb.create_sheet("Revenus")
-    
-    # Préparation des données pour les revenus
-    revenue_data = {
-        'Entreprise': [],
-        '2022': [],
-        '2023': [],
-        '2024': [],
-        'Croissance 2022-2023 (%)': [],
-        'Croissance 2023-2024 (%)': []
-    }
-    
-    for company in all_metrics.keys():
-        revenue_data['Entreprise'].append(company)
-        
-        revenue_2022 = clean_value(all_metrics[company]['revenue'].get('2022', 0))
-        revenue_2023 = clean_value(all_metrics[company]['revenue'].get('2023', 0))
-        revenue_2024 = clean_value(all_metrics[company]['revenue'].get('2024', 0))
-        
-        revenue_data['2022'].append(f"${revenue_2022:,.0f}")
-        revenue_data['2023'].append(f"${revenue_2023:,.0f}")
-        revenue_data['2024'].append(f"${revenue_2024:,.0f}")
-        
-        growth_2022_2023 = ((revenue_2023 - revenue_2022) / revenue_2022) * 100 if revenue_2022 > 0 else 0
-        growth_2023_2024 = ((revenue_2024 - revenue_2023) / revenue_2023) * 100 if revenue_2023 > 0 else 0
-        
-        revenue_data['Croissance 2022-2023 (%)'].append(f"{growth_2022_2023:.2f}%")
-        revenue_data['Croissance 2023-2024 (%)'].append(f"{growth_2023_2024:.2f}%")
-    
-    # Conversion en DataFrame
-    revenue_df = pd.DataFrame(revenue_data)
-    
-    # Ajout des données à la feuille
-    for r_idx, row in enumerate(dataframe_to_rows(revenue_df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = revenue_sheet.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx == 1:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
+    _write_excel_sheet(
+        wb, "Revenus",
+        ['Entreprise', '2022', '2023', '2024', 'Croissance 2022-2023 (%)', 'Croissance 2023-2024 (%)'],
+        lambda: _excel_revenue_rows(all_metrics)
+    )
     
     # Feuille 2: Marges
-    margins_sheet = wb.create_sheet("Marges")
+    margin_columns = [('net_margin', year) for year in ['2022', '2023', '2024']]
+    margin_columns += [('gross_margin', year) for year in ['2022', '2023', '2024']]
+    _write_excel_sheet(
+        wb, "Marges",
+        ['Entreprise', 'Marge Nette 2022 (%)', 'Marge Nette 2023 (%)', 'Marge Nette 2024 (%)',
+         'Marge Brute 2022 (%)', 'Marge Brute 2023 (%)', 'Marge Brute 2024 (%)'],
+        lambda: _excel_ratio_rows(all_ratios, margin_columns)
+    )
     
-    # Préparation des données pour les marges
-    margins_data = {
-        'Entreprise': [],
-        'Marge Nette 2022 (%)': [],
-        'Marge Nette 2023 (%)': [],
-        'Marge Nette 2024 (%)': [],
-        'Marge Brute 2022 (%)': [],
-        'Marge Brute 2023 (%)': [],
-        'Marge Brute 2024 (%)': []
-    }
-    
-    for company in all_ratios.keys():
-        margins_data['Entreprise'].append(company)
-        
-        net_margin_2022 = all_ratios[company]['net_margin'].get('2022', 0)
-        net_margin_2023 = all_ratios[company]['net_margin'].get('2023', 0)
-        net_margin_2024 = all_ratios[company]['net_margin'].get('2024', 0)
-        
-        gross_margin_2022 = all_ratios[company]['gross_margin'].get('2022', 0)
-        gross_margin_2023 = all_ratios[company]['gross_margin'].get('2023', 0)
-        gross_margin_2024 = all_ratios[company]['gross_margin'].get('2024', 0)
-        
-        margins_data['Marge Nette 2022 (%)'].append(f"{net_margin_2022:.2f}%")
-        margins_data['Marge Nette 2023 (%)'].append(f"{net_margin_2023:.2f}%")
-        margins_data['Marge Nette 2024 (%)'].append(f"{net_margin_2024:.2f}%")
-        
-        margins_data['Marge Brute 2022 (%)'].append(f"{gross_margin_2022:.2f}%")
-        margins_data['Marge Brute 2023 (%)'].append(f"{gross_margin_2023:.2f}%")
-        margins_data['Marge Brute 2024 (%)'].append(f"{gross_margin_2024:.2f}%")
-    
-    # Conversion en DataFrame
-    margins_df = pd.DataFrame(margins_data)
+    # Feuille 3: Ratios Financiers
+    ratio_columns = [(name, year) for name in ['debt_ratio', 'roa', 'roe'] for year in ['2023', '2024']]
+    _write_excel_sheet(
+        wb, "Ratios Financiers",
+        ['Entreprise', 'Ratio Endettement 2023 (%)', 'Ratio Endettement 2024 (%)',
+         'ROA 2023 (%)', 'ROA 2024 (%)', 'ROE 2023 (%)', 'ROE 2024 (%)'],
+        lambda: _excel_ratio_rows(all_ratios, ratio_columns)
+    )
     
-    # Ajout des données à la feuille
-    for r_idx, row in enumerate(dataframe_to_rows(margins_df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = margins_sheet.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx == 1:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
+    # Feuille 4: Classement
+    _write_excel_sheet(
+        wb, "Classement",
+        ['Métrique', '1er', '2ème', '3ème'],
+        lambda: _excel_ranking_rows(all_metrics, all_ratios),
+        label_column=True
+    )
     
-    # Feuille 3: Ratios Financiers
-    ratios_sheet = wb.create_sheet("Ratios Financiers")
+    # Sauvegarde du fichier Excel
+    wb.save(excel_path)
+    print(f"✅ Données exportées vers Excel : {excel_path}")
     
-    # Préparation des données pour les ratios financiers
-    ratios_data = {
-        'Entreprise': [],
-        'Ratio Endettement 2023 (%)': [],
-        'Ratio Endettement 2024 (%)': [],
-        'ROA 2023 (%)': [],
-        'ROA 2024 (%)': [],
-        'ROE 2023 (%)': [],
-        'ROE 2024 (%)': []
+    return excel_path
+
+def fit_linear_trends(years, values, future_years, confidence_level=0.95):
+    """
+    Ajuste par moindres carrés (forme fermée) une tendance linéaire sur le
+    dernier axe de values, pour toutes les séries en un seul appel NumPy.
+    
+    Args:
+        years: Années historiques, de forme (n,)
+        values: Valeurs historiques, de forme (..., n)
+        future_years: Années à prédire, de forme (h,)
+        confidence_level: Niveau de confiance des intervalles de prédiction
+        
+    Returns:
+        Dictionnaire contenant slope, intercept et r_squared de forme (...),
+        ainsi que predictions, lower et upper de forme (..., h)
+    """
+    x = np.asarray(years, dtype=float)
+    y = np.asarray(values, dtype=float)
+    x_future = np.asarray(future_years, dtype=float)
+    n = x.shape[0]
+    
+    # Centrer les années pour la stabilité numérique
+    x_mean = x.mean()
+    dx = x - x_mean
+    sxx = (dx ** 2).sum()
+    y_mean = y.mean(axis=-1)
+    
+    slope = (y * dx).sum(axis=-1) / sxx
+    intercept = y_mean - slope * x_mean
+    
+    # Coefficient de détermination (1 si la série est constante et parfaitement ajustée)
+    fitted = y_mean[..., None] + slope[..., None] * dx
+    ss_res = ((y - fitted) ** 2).sum(axis=-1)
+    ss_tot = ((y - y_mean[..., None]) ** 2).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.where(ss_res == 0, 1.0, 0.0))
+    
+    predictions = y_mean[..., None] + slope[..., None] * (x_future - x_mean)
+    
+    # Intervalles de prédiction basés sur la loi de Student à n - 2 degrés de liberté
+    if n > 2:
+        residual_std = np.sqrt(ss_res / (n - 2))
+        t_value = student_t.ppf((1 + confidence_level) / 2, n - 2)
+        spread = np.sqrt(1 + 1 / n + (x_future - x_mean) ** 2 / sxx)
+        margin = t_value * residual_std[..., None] * spread
+    else:
+        margin = np.full(predictions.shape, np.nan)
+    
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': r_squared,
+        'predictions': predictions,
+        'lower': predictions - margin,
+        'upper': predictions + margin
     }
+
+
+# Niveau de confiance des intervalles de prédiction de predict_future_performance
+PREDICTION_CONFIDENCE_LEVEL = 0.95
+
+
+def forecast_batch(all_metrics, years_ahead=2, metric_names=None, confidence_level=PREDICTION_CONFIDENCE_LEVEL):
+    """
+    Prévoit en un seul appel toutes les métriques de toutes les entreprises.
     
-    for company in all_ratios.keys():
-        ratios_data['Entreprise'].append(company)
-        
-        debt_ratio_2023 = all_ratios[company]['debt_ratio'].get('2023', 0)
-        debt_ratio_2024 = all_ratios[company]['debt_ratio'].get('2024', 0)
-        
-        roa_2023 = all_ratios[company]['roa'].get('2023', 0)
-        roa_2024 = all_ratios[company]['roa'].get('2024', 0)
-        
-        roe_2023 = all_ratios[company]['roe'].get('2023', 0)
-        roe_2024 = all_ratios[company]['roe'].get('2024', 0)
-        
-        ratios_data['Ratio Endettement 2023 (%)'].append(f"{debt_ratio_2023:.2f}%")
-        ratios_data['Ratio Endettement 2024 (%)'].append(f"{debt_ratio_2024:.2f}%")
+    Args:
+        all_metrics: Dictionnaire {entreprise: metrics} au format d'extract_key_metrics
+        years_ahead: Nombre d'années à prédire après la dernière année historique
+        metric_names: Métriques à prévoir (par défaut, celles de GROWTH_METRICS)
+        confidence_level: Niveau de confiance des intervalles de prédiction
         
-        ratios_data['ROA 2023 (%)'].append(f"{roa_2023:.2f}%")
-        ratios_data['ROA 2024 (%)'].append(f"{roa_2024:.2f}%")
+    Returns:
+        Tuple (entreprises, métriques, années historiques, années futures, ajustement)
+        où ajustement est le résultat de fit_linear_trends sur un tableau de
+        forme (entreprises, métriques, années). Les séries incomplètes valent NaN.
         
-        ratios_data['ROE 2023 (%)'].append(f"{roe_2023:.2f}%")
-        ratios_data['ROE 2024 (%)'].append(f"{roe_2024:.2f}%")
+    Raises:
+        ValueError: Si years_ahead est inférieur à 1
+    """
+    if years_ahead < 1:
+        raise ValueError(f"years_ahead doit être au moins égal à 1 (reçu : {years_ahead})")
     
-    # Conversion en DataFrame
-    ratios_df = pd.DataFrame(ratios_data)
+    metric_names = list(metric_names or GROWTH_METRICS)
+    companies, years, metric_names, cube = build_metrics_cube(all_metrics, metric_names=metric_names)
     
-    # Ajout des données à la feuille
-    for r_idx, row in enumerate(dataframe_to_rows(ratios_df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = ratios_sheet.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx == 1:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
+    historical_years = [int(year) for year in years]
+    future_years = [historical_years[-1] + i for i in range(1, years_ahead + 1)]
     
-    # Feuille 4: Classement
-    ranking_sheet = wb.create_sheet("Classement")
-    
-    # Préparation des données pour le classement
-    ranking_data = {
-        'Métrique': [
-            'Revenus 2024',
-            'Croissance Revenus 2023-2024',
-            'Marge Nette 2024',
-            'Marge Brute 2024',
-            'Ratio Endettement 2024 (le plus bas)',
-            'ROA 2024',
-            'ROE 2024'
-        ],
-        '1er': [],
-        '2ème': [],
-        '3ème': []
-    }
-    
-    # Classement par revenus 2024
-    companies_by_revenue = sorted(all_metrics.keys(), 
-                                 key=lambda x: clean_value(all_metrics[x]['revenue'].get('2024', 0)), 
-                                 reverse=True)
-    
-    for i, company in enumerate(companies_by_revenue):
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: ${clean_value(all_metrics[company]['revenue'].get('2024', 0)):,.0f}")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: ${clean_value(all_metrics[company]['revenue'].get('2024', 0)):,.0f}")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: ${clean_value(all_metrics[company]['revenue'].get('2024', 0)):,.0f}")
-    
-    # Classement par croissance des revenus 2023-2024
-    def calculate_growth(company):
-        revenue_2023 = clean_value(all_metrics[company]['revenue'].get('2023', 0))
-        revenue_2024 = clean_value(all_metrics[company]['revenue'].get('2024', 0))
-        return ((revenue_2024 - revenue_2023) / revenue_2023) * 100 if revenue_2023 > 0 else 0
-    
-    companies_by_growth = sorted(all_metrics.keys(), key=calculate_growth, reverse=True)
-    
-    for i, company in enumerate(companies_by_growth):
-        growth = calculate_growth(company)
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: {growth:.2f}%")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: {growth:.2f}%")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: {growth:.2f}%")
-    
-    # Classement par marge nette 2024
-    companies_by_net_margin = sorted(all_ratios.keys(), 
-                                    key=lambda x: all_ratios[x]['net_margin'].get('2024', 0), 
-                                    reverse=True)
-    
-    for i, company in enumerate(companies_by_net_margin):
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: {all_ratios[company]['net_margin'].get('2024', 0):.2f}%")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: {all_ratios[company]['net_margin'].get('2024', 0):.2f}%")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: {all_ratios[company]['net_margin'].get('2024', 0):.2f}%")
-    
-    # Classement par marge brute 2024
-    companies_by_gross_margin = sorted(all_ratios.keys(), 
-                                      key=lambda x: all_ratios[x]['gross_margin'].get('2024', 0), 
-                                      reverse=True)
-    
-    for i, company in enumerate(companies_by_gross_margin):
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: {all_ratios[company]['gross_margin'].get('2024', 0):.2f}%")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: {all_ratios[company]['gross_margin'].get('2024', 0):.2f}%")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: {all_ratios[company]['gross_margin'].get('2024', 0):.2f}%")
-    
-    # Classement par ratio d'endettement 2024 (le plus bas est le meilleur)
-    companies_by_debt_ratio = sorted(all_ratios.keys(), 
-                                    key=lambda x: all_ratios[x]['debt_ratio'].get('2024', 0))
-    
-    for i, company in enumerate(companies_by_debt_ratio):
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: {all_ratios[company]['debt_ratio'].get('2024', 0):.2f}%")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: {all_ratios[company]['debt_ratio'].get('2024', 0):.2f}%")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: {all_ratios[company]['debt_ratio'].get('2024', 0):.2f}%")
-    
-    # Classement par ROA 2024
-    companies_by_roa = sorted(all_ratios.keys(), 
-                             key=lambda x: all_ratios[x]['roa'].get('2024', 0), 
-                             reverse=True)
-    
-    for i, company in enumerate(companies_by_roa):
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: {all_ratios[company]['roa'].get('2024', 0):.2f}%")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: {all_ratios[company]['roa'].get('2024', 0):.2f}%")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: {all_ratios[company]['roa'].get('2024', 0):.2f}%")
-    
-    # Classement par ROE 2024
-    companies_by_roe = sorted(all_ratios.keys(), 
-                             key=lambda x: all_ratios[x]['roe'].get('2024', 0), 
-                             reverse=True)
-    
-    for i, company in enumerate(companies_by_roe):
-        if i == 0:
-            ranking_data['1er'].append(f"{company}: {all_ratios[company]['roe'].get('2024', 0):.2f}%")
-        elif i == 1:
-            ranking_data['2ème'].append(f"{company}: {all_ratios[company]['roe'].get('2024', 0):.2f}%")
-        elif i == 2:
-            ranking_data['3ème'].append(f"{company}: {all_ratios[company]['roe'].get('2024', 0):.2f}%")
-    
-    # Conversion en DataFrame
-    ranking_df = pd.DataFrame(ranking_data)
-    
-    # Ajout des données à la feuille
-    for r_idx, row in enumerate(dataframe_to_rows(ranking_df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = ranking_sheet.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx == 1:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
-            if c_idx == 1:
-                cell.font = Font(bold=True)
-    
-    # Ajustement de la largeur des colonnes
-    for sheet in wb.sheetnames:
-        for column in wb[sheet].columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            wb[sheet].column_dimensions[column_letter].width = adjusted_width
-    
-    # Sauvegarde du fichier Excel
-    wb.save(excel_path)
-    print(f"✅ Données exportées vers Excel : {excel_path}")
+    fit = fit_linear_trends(historical_years, np.moveaxis(cube, 1, 2), future_years, confidence_level)
     
-    return excel_path
+    return companies, metric_names, historical_years, future_years, fit
+
 
 def predict_future_performance(metrics, ratios, years_ahead=2):
     """Prédit les performances financières futures en utilisant une régression linéaire."""
     print("🔮 Calcul des performances prédictives...")
     
-    try:
-        from sklearn.linear_model import LinearRegression
-        import numpy as np
-    except ImportError:
-        print("❌ Les bibliothèques scikit-learn et numpy sont requises pour les prédictions.")
-        print("   Installez-les avec la commande : pip install scikit-learn numpy")
-        return {}
-    
     predictions = {
         'revenue': {},
         'net_income': {},
@@ -1320,488 +2073,154 @@ def predict_future_performance(metrics, ratios, years_ahead=2):
         'confidence': {}
     }
     
-    # Années historiques
-    historical_years = np.array([2022, 2023, 2024]).reshape(-1, 1)
-    future_years = np.array([2025, 2026]).reshape(-1, 1)
+    _, metric_names, historical_years, future_years, fit = forecast_batch({None: metrics}, years_ahead)
+    future_keys = [str(year) for year in future_years]
     
-    # Prédiction des revenus
-    if all(year in metrics['revenue'] for year in ['2022', '2023', '2024']):
-        revenue_values = np.array([clean_value(metrics['revenue']['2022']), 
-                                  clean_value(metrics['revenue']['2023']), 
-                                  clean_value(metrics['revenue']['2024'])])
-        
-        # Créer et entraîner le modèle
-        revenue_model = LinearRegression()
-        revenue_model.fit(historical_years, revenue_values)
-        
-        # Calculer le coefficient de détermination (R²)
-        r_squared_revenue = revenue_model.score(historical_years, revenue_values)
-        predictions['confidence']['revenue'] = r_squared_revenue * 100
-        
-        # Prédire les revenus futurs
-        predicted_revenues = revenue_model.predict(future_years)
-        predictions['revenue']['2025'] = predicted_revenues[0]
-        predictions['revenue']['2026'] = predicted_revenues[1]
-        
-        # Calculer le taux de croissance annuel moyen prédit
-        predicted_growth_rate = ((predicted_revenues[1] / revenue_values[-1]) ** (1/2) - 1) * 100
-        predictions['revenue_growth_rate'] = predicted_growth_rate
-        
-        print(f"✅ Prédiction revenue pour 2025 : ${predicted_revenues[0]:,.0f}")
-        print(f"✅ Prédiction revenue pour 2026 : ${predicted_revenues[1]:,.0f}")
-        print(f"✅ Taux de croissance annuel moyen prédit pour revenue : {predicted_growth_rate:.2f}%")
+    trends = {}
+    intervals = {}
+    growth_rates = {}
     
-    # Prédiction du bénéfice net
-    if all(year in metrics['net_income'] for year in ['2022', '2023', '2024']):
-        net_income_values = np.array([clean_value(metrics['net_income']['2022']), 
-                                     clean_value(metrics['net_income']['2023']), 
-                                     clean_value(metrics['net_income']['2024'])])
+    for m, metric in enumerate(metric_names):
+        # Seules les séries complètes sont prédites
+        if np.isnan(fit['slope'][0, m]):
+            continue
         
-        # Créer et entraîner le modèle
-        net_income_model = LinearRegression()
-        net_income_model.fit(historical_years, net_income_values)
+        predicted_values = fit['predictions'][0, m]
+        for y, year in enumerate(future_keys):
+            predictions[metric][year] = float(predicted_values[y])
+            print(f"✅ Prédiction {metric} pour {year} : ${predicted_values[y]:,.0f}")
         
         # Calculer le coefficient de détermination (R²)
-        r_squared_net_income = net_income_model.score(historical_years, net_income_values)
-        predictions['confidence']['net_income'] = r_squared_net_income * 100
-        
-        # Prédire le bénéfice net futur
-        predicted_net_income = net_income_model.predict(future_years)
-        predictions['net_income']['2025'] = predicted_net_income[0]
-        predictions['net_income']['2026'] = predicted_net_income[1]
+        predictions['confidence'][metric] = float(fit['r_squared'][0, m]) * 100
         
-        # Calculer le taux de croissance annuel moyen prédit
-        predicted_growth_rate = ((predicted_net_income[1] / net_income_values[-1]) ** (1/2) - 1) * 100
-        predictions['net_income_growth_rate'] = predicted_growth_rate
-        
-        print(f"✅ Prédiction net_income pour 2025 : ${predicted_net_income[0]:,.0f}")
-        print(f"✅ Prédiction net_income pour 2026 : ${predicted_net_income[1]:,.0f}")
-        print(f"✅ Taux de croissance annuel moyen prédit pour net_income : {predicted_growth_rate:.2f}%")
-    
-    # Prédiction du bénéfice brut
-    if all(year in metrics['gross_profit'] for year in ['2022', '2023', '2024']):
-        gross_profit_values = np.array([clean_value(metrics['gross_profit']['2022']), 
-                                       clean_value(metrics['gross_profit']['2023']), 
-                                       clean_value(metrics['gross_profit']['2024'])])
-        
-        # Créer et entraîner le modèle
-        gross_profit_model = LinearRegression()
-        gross_profit_model.fit(historical_years, gross_profit_values)
-        
-        # Calculer le coefficient de détermination (R²)
-        r_squared_gross_profit = gross_profit_model.score(historical_years, gross_profit_values)
-        predictions['confidence']['gross_profit'] = r_squared_gross_profit * 100
-        
-        # Prédire le bénéfice brut futur
-        predicted_gross_profit = gross_profit_model.predict(future_years)
-        predictions['gross_profit']['2025'] = predicted_gross_profit[0]
-        predictions['gross_profit']['2026'] = predicted_gross_profit[1]
+        trends[metric] = {
+            'slope': float(fit['slope'][0, m]),
+            'intercept': float(fit['intercept'][0, m]),
+            'r_squared': float(fit['r_squared'][0, m])
+        }
+        intervals[metric] = {
+            year: [float(fit['lower'][0, m, y]), float(fit['upper'][0, m, y])]
+            for y, year in enumerate(future_keys)
+        }
         
         # Calculer le taux de croissance annuel moyen prédit
-        predicted_growth_rate = ((predicted_gross_profit[1] / gross_profit_values[-1]) ** (1/2) - 1) * 100
-        predictions['gross_profit_growth_rate'] = predicted_growth_rate
-        
-        print(f"✅ Prédiction gross_profit pour 2025 : ${predicted_gross_profit[0]:,.0f}")
-        print(f"✅ Prédiction gross_profit pour 2026 : ${predicted_gross_profit[1]:,.0f}")
-        print(f"✅ Taux de croissance annuel moyen prédit pour gross_profit : {predicted_growth_rate:.2f}%")
+        last_value = clean_value(metrics[metric][str(historical_years[-1])])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth_rate = ((np.float64(predicted_values[-1]) / last_value) ** (1 / years_ahead) - 1) * 100
+        growth_rates[f'{metric}_growth_rate'] = float(growth_rate)
+        print(f"✅ Taux de croissance annuel moyen prédit pour {metric} : {growth_rate:.2f}%")
     
     # Prédiction des marges
-    if 'revenue' in predictions and 'net_income' in predictions and 'gross_profit' in predictions:
-        # Marge nette
-        for year in ['2025', '2026']:
-            if year in predictions['revenue'] and year in predictions['net_income']:
-                predictions['net_margin'][year] = (predictions['net_income'][year] / predictions['revenue'][year]) * 100
-                print(f"✅ Prédiction net_margin pour {year} : {predictions['net_margin'][year]:.2f}%")
+    for margin, metric in [('net_margin', 'net_income'), ('gross_margin', 'gross_profit')]:
+        for year in future_keys:
+            if year in predictions['revenue'] and year in predictions[metric]:
+                predictions[margin][year] = (predictions[metric][year] / predictions['revenue'][year]) * 100
+                print(f"✅ Prédiction {margin} pour {year} : {predictions[margin][year]:.2f}%")
         
-        # Marge brute
-        for year in ['2025', '2026']:
-            if year in predictions['revenue'] and year in predictions['gross_profit']:
-                predictions['gross_margin'][year] = (predictions['gross_profit'][year] / predictions['revenue'][year]) * 100
-                print(f"✅ Prédiction gross_margin pour {year} : {predictions['gross_margin'][year]:.2f}%")
-        
-        # Calculer la confiance dans les prédictions de marges
-        if all(year in predictions['net_margin'] for year in ['2025', '2026']):
-            # Utiliser la moyenne des confiances des métriques utilisées pour calculer la marge
-            predictions['confidence']['net_margin'] = (predictions['confidence']['revenue'] + predictions['confidence']['net_income']) / 2
-            print(f"✅ Confiance dans la prédiction pour net_margin : {predictions['confidence']['net_margin']:.2f}%")
-        
-        if all(year in predictions['gross_margin'] for year in ['2025', '2026']):
-            predictions['confidence']['gross_margin'] = (predictions['confidence']['revenue'] + predictions['confidence']['gross_profit']) / 2
-            print(f"✅ Confiance dans la prédiction pour gross_margin : {predictions['confidence']['gross_margin']:.2f}%")
+        # Utiliser la moyenne des confiances des métriques utilisées pour calculer la marge
+        if all(year in predictions[margin] for year in future_keys):
+            predictions['confidence'][margin] = (predictions['confidence']['revenue'] + predictions['confidence'][metric]) / 2
+            print(f"✅ Confiance dans la prédiction pour {margin} : {predictions['confidence'][margin]:.2f}%")
+    
+    predictions.update(growth_rates)
+    predictions['trend'] = trends
+    predictions['intervals'] = intervals
     
     # Afficher la confiance dans les prédictions
-    for metric in ['revenue', 'net_income', 'gross_profit']:
+    for metric in metric_names:
         if metric in predictions['confidence']:
             print(f"✅ Confiance dans la prédiction pour {metric} : {predictions['confidence'][metric]:.2f}%")
     
     return predictions
 
-def create_prediction_visualizations(metrics, ratios, predictions, output_dir):
+def create_prediction_visualizations(metrics, ratios, predictions, output_dir, image_format='png', workers=1, force=False):
     """Crée des visualisations pour les prédictions financières."""
     print("📊 Création des visualisations prédictives...")
     
-    import matplotlib.pyplot as plt
-    import matplotlib.ticker as mtick
-    import numpy as np
-    import os
-    
-    # Créer le répertoire de sortie s'il n'existe pas
-    os.makedirs(output_dir, exist_ok=True)
-    
     # Définir un style professionnel pour les graphiques
-    plt.style.use('seaborn-v0_8-darkgrid')
-    
-    # Couleurs pour les graphiques
-    historical_color = '#1f77b4'  # Bleu
-    prediction_color = '#ff7f0e'  # Orange
-    confidence_color = '#ff7f0e20'  # Orange transparent pour l'intervalle de confiance
+    style = ['seaborn-v0_8-darkgrid', {'font.size': 12}]
+    savefig_options = {'bbox_inches': 'tight'}
     
     # Métriques à visualiser
     metrics_to_visualize = ['revenue', 'net_income', 'gross_profit']
     ratios_to_visualize = ['net_margin', 'gross_margin']
     
+    metric_names = {
+        'revenue': 'Revenus',
+        'net_income': 'Bénéfice Net',
+        'gross_profit': 'Bénéfice Brut'
+    }
+    ratio_names = {
+        'net_margin': 'Marge Nette',
+        'gross_margin': 'Marge Brute',
+        'debt_ratio': 'Ratio d\'Endettement',
+        'roa': 'Rendement des Actifs',
+        'roe': 'Rendement des Capitaux Propres'
+    }
+    
     # Années historiques et futures
     historical_years = [2022, 2023, 2024]
-    future_years = [2025, 2026]
-    all_years = historical_years + future_years
+    future_years = sorted({int(year) for metric in metrics_to_visualize for year in predictions.get(metric, {})}) or [2025, 2026]
+    period = f'{historical_years[0]}-{future_years[-1]}'
+    
+    def prediction_series(name, source, as_number):
+        """Prépare les données d'une série à tracer, ou None si elles sont incomplètes."""
+        if not (all(str(year) in source.get(name, {}) for year in historical_years)
+                and all(str(year) in predictions.get(name, {}) for year in future_years)):
+            return None
+        
+        series = {
+            'historical_years': historical_years,
+            'historical_values': [as_number(source[name][str(year)]) for year in historical_years],
+            'future_years': future_years,
+            'predicted_values': [predictions[name][str(year)] for year in future_years],
+        }
+        
+        # Intervalle de prédiction de Student, lorsqu'il a pu être calculé (au moins trois années)
+        interval = predictions.get('intervals', {}).get(name, {})
+        bounds = [interval.get(str(year)) for year in future_years]
+        if all(bound is not None and np.isfinite(bound).all() for bound in bounds):
+            series['lower'] = [bound[0] for bound in bounds]
+            series['upper'] = [bound[1] for bound in bounds]
+            series['interval_level'] = PREDICTION_CONFIDENCE_LEVEL
+        return series
+    
+    metric_series = {metric: prediction_series(metric, metrics, clean_value) for metric in metrics_to_visualize}
+    ratio_series = {ratio: prediction_series(ratio, ratios, float) for ratio in ratios_to_visualize}
+    
+    jobs = []
     
     # 1. Visualisation des métriques financières
-    for metric in metrics_to_visualize:
-        if all(str(year) in metrics[metric] for year in historical_years) and all(str(year) in predictions[metric] for year in future_years):
-            plt.figure(figsize=(12, 7))
-            
-            # Données historiques
-            historical_values = [clean_value(metrics[metric][str(year)]) for year in historical_years]
-            
-            # Données prédites
-            predicted_values = [predictions[metric][str(year)] for year in future_years]
-            
-            # Toutes les valeurs pour l'axe Y
-            all_values = historical_values + predicted_values
-            
-            # Tracer les données historiques
-            plt.plot(historical_years, historical_values, 'o-', color=historical_color, linewidth=3, markersize=10, label='Données historiques')
-            
-            # Tracer les prédictions
-            plt.plot(future_years, predicted_values, 'o--', color=prediction_color, linewidth=3, markersize=10, label='Prédictions')
-            
-            # Ajouter une zone d'intervalle de confiance si disponible
-            if metric in predictions['confidence']:
-                confidence_level = predictions['confidence'][metric] / 100
-                # Calculer un intervalle de confiance simple basé sur le niveau de confiance
-                confidence_range = [(1 - confidence_level) * value * 0.5 for value in predicted_values]
-                
-                plt.fill_between(
-                    future_years,
-                    [predicted_values[i] - confidence_range[i] for i in range(len(predicted_values))],
-                    [predicted_values[i] + confidence_range[i] for i in range(len(predicted_values))],
-                    color=confidence_color, alpha=0.5,
-                    label=f'Intervalle de confiance ({confidence_level:.2%})'
-                )
-            
-            # Ajouter les valeurs sur les points
-            for i, year in enumerate(all_years):
-                if i < len(historical_years):
-                    value = historical_values[i]
-                    plt.annotate(f'${value:,.0f}', 
-                                xy=(year, value), 
-                                xytext=(0, 10),
-                                textcoords='offset points',
-                                ha='center', va='bottom',
-                                fontsize=9, fontweight='bold')
-                else:
-                    value = predicted_values[i - len(historical_years)]
-                    plt.annotate(f'${value:,.0f}', 
-                                xy=(year, value), 
-                                xytext=(0, 10),
-                                textcoords='offset points',
-                                ha='center', va='bottom',
-                                fontsize=9, fontweight='bold',
-                                color=prediction_color)
-            
-            # Ajouter le taux de croissance prédit
-            if f'{metric}_growth_rate' in predictions:
-                growth_rate = predictions[f'{metric}_growth_rate']
-                growth_text = f'Taux de croissance annuel moyen prédit: {growth_rate:.2f}%'
-                plt.figtext(0.5, 0.01, growth_text, ha='center', fontsize=12, fontweight='bold')
-            
-            # Formater l'axe Y pour afficher les valeurs en millions/milliards
-            def format_y_axis(value, pos):
-                if value >= 1e9:
-                    return f'${value/1e9:.1f}B'
-                elif value >= 1e6:
-                    return f'${value/1e6:.1f}M'
-                else:
-                    return f'${value:.0f}'
-            
-            plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(format_y_axis))
-            
-            # Ajouter des titres et des étiquettes
-            metric_names = {
-                'revenue': 'Revenus',
-                'net_income': 'Bénéfice Net',
-                'gross_profit': 'Bénéfice Brut'
-            }
-            
-            plt.title(f'Prédiction des {metric_names.get(metric, metric)} (2022-2026)', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Année', fontsize=12, labelpad=10)
-            plt.ylabel('Valeur ($)', fontsize=12, labelpad=10)
-            
-            # Personnaliser les ticks de l'axe X
-            plt.xticks(all_years, fontsize=10)
-            plt.yticks(fontsize=10)
-            
-            # Ajouter une grille
-            plt.grid(True, linestyle='--', alpha=0.7)
-            
-            # Ajouter une légende
-            plt.legend(loc='best', fontsize=10)
-            
-            # Ajuster les marges
-            plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-            
-            # Sauvegarder le graphique
-            output_path = os.path.join(output_dir, f'prediction_{metric}.png')
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            print(f"✅ Graphique de prédiction pour {metric} sauvegardé dans {output_path}")
-            plt.close()
+    for metric, series in metric_series.items():
+        if series:
+            jobs.append(chart_job(f'prediction_{metric}', _draw_prediction, (12, 7), style, savefig_options,
+                                  series=series, kind='currency',
+                                  title=f'Prédiction des {metric_names.get(metric, metric)} ({period})',
+                                  growth_rate=predictions.get(f'{metric}_growth_rate')))
     
     # 2. Visualisation des ratios financiers
-    for ratio in ratios_to_visualize:
-        if all(str(year) in ratios[ratio] for year in historical_years) and all(str(year) in predictions[ratio] for year in future_years):
-            plt.figure(figsize=(12, 7))
-            
-            # Données historiques
-            historical_values = [ratios[ratio][str(year)] for year in historical_years]
-            
-            # Données prédites
-            predicted_values = [predictions[ratio][str(year)] for year in future_years]
-            
-            # Toutes les valeurs pour l'axe Y
-            all_values = historical_values + predicted_values
-            
-            # Tracer les données historiques
-            plt.plot(historical_years, historical_values, 'o-', color=historical_color, linewidth=3, markersize=10, label='Données historiques')
-            
-            # Tracer les prédictions
-            plt.plot(future_years, predicted_values, 'o--', color=prediction_color, linewidth=3, markersize=10, label='Prédictions')
-            
-            # Ajouter une zone d'intervalle de confiance si disponible
-            if ratio in predictions['confidence']:
-                confidence_level = predictions['confidence'][ratio] / 100
-                # Calculer un intervalle de confiance simple basé sur le niveau de confiance
-                confidence_range = [(1 - confidence_level) * value * 0.5 for value in predicted_values]
-                
-                plt.fill_between(
-                    future_years,
-                    [predicted_values[i] - confidence_range[i] for i in range(len(predicted_values))],
-                    [predicted_values[i] + confidence_range[i] for i in range(len(predicted_values))],
-                    color=confidence_color, alpha=0.5,
-                    label=f'Intervalle de confiance ({confidence_level:.2%})'
-                )
-            
-            # Ajouter les valeurs sur les points
-            for i, year in enumerate(all_years):
-                if i < len(historical_years):
-                    value = historical_values[i]
-                    plt.annotate(f'{value:.2f}%', 
-                                xy=(year, value), 
-                                xytext=(0, 10),
-                                textcoords='offset points',
-                                ha='center', va='bottom',
-                                fontsize=9, fontweight='bold')
-                else:
-                    value = predicted_values[i - len(historical_years)]
-                    plt.annotate(f'{value:.2f}%', 
-                                xy=(year, value), 
-                                xytext=(0, 10),
-                                textcoords='offset points',
-                                ha='center', va='bottom',
-                                fontsize=9, fontweight='bold',
-                                color=prediction_color)
-            
-            # Formater l'axe Y pour afficher les pourcentages
-            plt.gca().yaxis.set_major_formatter(mtick.PercentFormatter())
-            
-            # Ajouter des titres et des étiquettes
-            ratio_names = {
-                'net_margin': 'Marge Nette',
-                'gross_margin': 'Marge Brute',
-                'debt_ratio': 'Ratio d\'Endettement',
-                'roa': 'Rendement des Actifs',
-                'roe': 'Rendement des Capitaux Propres'
-            }
-            
-            plt.title(f'Prédiction de {ratio_names.get(ratio, ratio)} (2022-2026)', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Année', fontsize=12, labelpad=10)
-            plt.ylabel('Pourcentage (%)', fontsize=12, labelpad=10)
-            
-            # Personnaliser les ticks de l'axe X
-            plt.xticks(all_years, fontsize=10)
-            plt.yticks(fontsize=10)
-            
-            # Ajouter une grille
-            plt.grid(True, linestyle='--', alpha=0.7)
-            
-            # Ajouter une légende
-            plt.legend(loc='best', fontsize=10)
-            
-            # Ajuster les marges
-            plt.tight_layout()
-            
-            # Sauvegarder le graphique
-            output_path = os.path.join(output_dir, f'prediction_{ratio}.png')
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            print(f"✅ Graphique de prédiction pour {ratio} sauvegardé dans {output_path}")
-            plt.close()
+    for ratio, series in ratio_series.items():
+        if series:
+            jobs.append(chart_job(f'prediction_{ratio}', _draw_prediction, (12, 7), style, savefig_options,
+                                  series=series, kind='percent',
+                                  title=f'Prédiction de {ratio_names.get(ratio, ratio)} ({period})'))
     
     # 3. Créer un graphique combiné pour les métriques principales
-    if all(metric in predictions for metric in ['revenue', 'net_income', 'gross_profit']):
-        plt.figure(figsize=(14, 8))
-        
-        # Créer un subplot pour chaque métrique
-        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-        
-        for i, metric in enumerate(['revenue', 'net_income', 'gross_profit']):
-            if all(str(year) in metrics[metric] for year in historical_years) and all(str(year) in predictions[metric] for year in future_years):
-                ax = axes[i]
-                
-                # Données historiques
-                historical_values = [clean_value(metrics[metric][str(year)]) for year in historical_years]
-                
-                # Données prédites
-                predicted_values = [predictions[metric][str(year)] for year in future_years]
-                
-                # Tracer les données historiques
-                ax.plot(historical_years, historical_values, 'o-', color=historical_color, linewidth=2, markersize=8, label='Historique')
-                
-                # Tracer les prédictions
-                ax.plot(future_years, predicted_values, 'o--', color=prediction_color, linewidth=2, markersize=8, label='Prédiction')
-                
-                # Ajouter une zone d'intervalle de confiance si disponible
-                if metric in predictions['confidence']:
-                    confidence_level = predictions['confidence'][metric] / 100
-                    # Calculer un intervalle de confiance simple basé sur le niveau de confiance
-                    confidence_range = [(1 - confidence_level) * value * 0.5 for value in predicted_values]
-                    
-                    ax.fill_between(
-                        future_years,
-                        [predicted_values[i] - confidence_range[i] for i in range(len(predicted_values))],
-                        [predicted_values[i] + confidence_range[i] for i in range(len(predicted_values))],
-                        color=confidence_color, alpha=0.5,
-                        label=f'Confiance ({confidence_level:.2%})'
-                    )
-                
-                # Formater l'axe Y pour afficher les valeurs en millions/milliards
-                def format_y_axis(value, pos):
-                    if value >= 1e9:
-                        return f'${value/1e9:.1f}B'
-                    elif value >= 1e6:
-                        return f'${value/1e6:.1f}M'
-                    else:
-                        return f'${value:.0f}'
-                
-                ax.yaxis.set_major_formatter(plt.FuncFormatter(format_y_axis))
-                
-                # Ajouter des titres et des étiquettes
-                metric_names = {
-                    'revenue': 'Revenus',
-                    'net_income': 'Bénéfice Net',
-                    'gross_profit': 'Bénéfice Brut'
-                }
-                
-                ax.set_title(f'{metric_names.get(metric, metric)}', fontsize=14, fontweight='bold')
-                ax.set_xlabel('Année', fontsize=10)
-                
-                # Personnaliser les ticks de l'axe X
-                ax.set_xticks(all_years)
-                ax.set_xticklabels(all_years, fontsize=9, rotation=45)
-                
-                # Ajouter une grille
-                ax.grid(True, linestyle='--', alpha=0.7)
-                
-                # Ajouter une légende
-                ax.legend(loc='best', fontsize=9)
-        
-        # Ajuster les marges
-        plt.tight_layout()
-        
-        # Sauvegarder le graphique
-        output_path = os.path.join(output_dir, 'prediction_combined_metrics.png')
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Graphique combiné des prédictions sauvegardé dans {output_path}")
-        plt.close()
+    if all(metric in predictions for metric in metrics_to_visualize):
+        jobs.append(chart_job('prediction_combined_metrics', _draw_prediction_panels, (18, 6), style, savefig_options,
+                              panels={metric_names[metric]: series for metric, series in metric_series.items()},
+                              kind='currency'))
     
     # 4. Créer un graphique combiné pour les ratios
-    if all(ratio in predictions for ratio in ['net_margin', 'gross_margin']):
-        plt.figure(figsize=(14, 8))
-        
-        # Créer un subplot pour chaque ratio
-        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-        
-        for i, ratio in enumerate(['net_margin', 'gross_margin']):
-            if all(str(year) in ratios[ratio] for year in historical_years) and all(str(year) in predictions[ratio] for year in future_years):
-                ax = axes[i]
-                
-                # Données historiques
-                historical_values = [ratios[ratio][str(year)] for year in historical_years]
-                
-                # Données prédites
-                predicted_values = [predictions[ratio][str(year)] for year in future_years]
-                
-                # Tracer les données historiques
-                ax.plot(historical_years, historical_values, 'o-', color=historical_color, linewidth=2, markersize=8, label='Historique')
-                
-                # Tracer les prédictions
-                ax.plot(future_years, predicted_values, 'o--', color=prediction_color, linewidth=2, markersize=8, label='Prédiction')
-                
-                # Ajouter une zone d'intervalle de confiance si disponible
-                if ratio in predictions['confidence']:
-                    confidence_level = predictions['confidence'][ratio] / 100
-                    # Calculer un intervalle de confiance simple basé sur le niveau de confiance
-                    confidence_range = [(1 - confidence_level) * value * 0.5 for value in predicted_values]
-                    
-                    ax.fill_between(
-                        future_years,
-                        [predicted_values[i] - confidence_range[i] for i in range(len(predicted_values))],
-                        [predicted_values[i] + confidence_range[i] for i in range(len(predicted_values))],
-                        color=confidence_color, alpha=0.5,
-                        label=f'Confiance ({confidence_level:.2%})'
-                    )
-                
-                # Formater l'axe Y pour afficher les pourcentages
-                ax.yaxis.set_major_formatter(mtick.PercentFormatter())
-                
-                # Ajouter des titres et des étiquettes
-                ratio_names = {
-                    'net_margin': 'Marge Nette',
-                    'gross_margin': 'Marge Brute'
-                }
-                
-                ax.set_title(f'{ratio_names.get(ratio, ratio)}', fontsize=14, fontweight='bold')
-                ax.set_xlabel('Année', fontsize=10)
-                
-                # Personnaliser les ticks de l'axe X
-                ax.set_xticks(all_years)
-                ax.set_xticklabels(all_years, fontsize=9, rotation=45)
-                
-                # Ajouter une grille
-                ax.grid(True, linestyle='--', alpha=0.7)
-                
-                # Ajouter une légende
-                ax.legend(loc='best', fontsize=9)
-        
-        # Ajuster les marges
-        plt.tight_layout()
-        
-        # Sauvegarder le graphique
-        output_path = os.path.join(output_dir, 'prediction_combined_ratios.png')
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Graphique combiné des ratios prédits sauvegardé dans {output_path}")
-        plt.close()
+    if all(ratio in predictions for ratio in ratios_to_visualize):
+        jobs.append(chart_job('prediction_combined_ratios', _draw_prediction_panels, (14, 6), style, savefig_options,
+                              panels={ratio_names[ratio]: series for ratio, series in ratio_series.items()},
+                              kind='percent'))
+    
+    paths = render_charts(jobs, output_dir, image_format, workers, force)
     
     print(f"✅ Visualisations prédictives créées avec succès dans {output_dir}")
-    return True
+    return paths
 
 def save_prediction_results(predictions, output_dir, ratios):
     """Sauvegarde les résultats des prédictions dans différents formats."""
@@ -1826,6 +2245,8 @@ def save_prediction_results(predictions, output_dir, ratios):
     # 2.1 Métriques financières
     print(f"\n✅ Extraction des données financières terminée avec succès!")
     print(f"✅ Les résultats ont été sauvegardés dans le répertoire {output_dir}")
+    
+    return [json_path]
 
 def main():
     """Fonction principale qui exécute l'extraction des données financières."""
@@ -1836,6 +2257,9 @@ def main():
     parser.add_argument('--files', nargs='+', help='Chemins des fichiers à analyser')
     parser.add_argument('--output', default='data/results', help='Répertoire de sortie pour les résultats')
     parser.add_argument('--single', action='store_true', help='Analyser uniquement le fichier Tesla par défaut')
+    parser.add_argument('--workers', type=int, default=1, help='Nombre de processus pour traiter plusieurs fichiers en parallèle')
+    parser.add_argument('--chart-format', choices=CHART_FORMATS, default='png', help='Format des graphiques générés')
+    parser.add_argument('--force', action='store_true', help='Réexécuter toutes les étapes, même si leurs entrées sont inchangées')
     
     args = parser.parse_args()
     
@@ -1849,30 +2273,9 @@ def main():
         # Analyse d'un seul fichier (Tesla par défaut)
         input_file = "data/tsla_10k_extracted.txt"
         
-        # Lecture et nettoyage du fichier
-        text = read_file(input_file)
-        cleaned_text = clean_text(text)
-        
-        # Extraction des métriques clés
-        metrics = extract_key_metrics(cleaned_text)
-        
-        # Calcul des ratios financiers
-        ratios = calculate_financial_ratios(metrics)
-        
-        # Calcul des prédictions
-        predictions = predict_future_performance(metrics, ratios)
-        
-        # Création des visualisations
-        create_visualizations(metrics, ratios, output_dir)
-        
-        # Sauvegarde des résultats
-        save_results(metrics, ratios, output_dir)
-        
-        # Création des visualisations prédictives
-        create_prediction_visualizations(metrics, ratios, predictions, output_dir)
-        
-        # Sauvegarde des résultats prédictifs
-        save_prediction_results(predictions, output_dir, ratios)
+        # Extraction, ratios, prédictions, visualisations et sauvegarde des résultats
+        metrics, ratios, predictions = run_pipeline(input_file, output_dir, args.chart_format, args.workers,
+                                                    args.force, with_predictions=True)
         
         # Affichage des résultats
         print("\n📊 RÉSULTATS DE L'EXTRACTION DES DONNÉES FINANCIÈRES 📊\n")
@@ -1947,13 +2350,12 @@ def main():
         
     else:
         # Analyse de plusieurs fichiers
-        all_metrics, all_ratios = process_multiple_reports(args.files, output_dir)
-        
-        # Création des visualisations comparatives
-        create_comparative_visualizations(all_metrics, all_ratios, os.path.join(output_dir, "comparative"))
+        all_metrics, all_ratios = process_multiple_reports(args.files, output_dir, args.workers,
+                                                           args.chart_format, args.force)
         
-        # Sauvegarde des résultats comparatifs
-        save_comparative_results(all_metrics, all_ratios, os.path.join(output_dir, "comparative"))
+        # Création des visualisations et sauvegarde des résultats comparatifs
+        run_comparative_pipeline(all_metrics, all_ratios, os.path.join(output_dir, "comparative"),
+                                 args.chart_format, args.workers, args.force)
     
     print(f"\n✅ Extraction des données financières terminée avec succès!")
     print(f"✅ Les résultats ont été sauvegardés dans le répertoire {output_dir}")
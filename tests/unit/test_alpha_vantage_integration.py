@@ -0,0 +1,160 @@
+"""
+Tests unitaires pour le module alpha_vantage_integration.py.
+"""
+
+import os
+import sys
+import time
+import unittest
+import tempfile
+import shutil
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.core.alpha_vantage_integration import AlphaVantageIntegration, load_time_series
+
+
+class TestAlphaVantageIntegration(unittest.TestCase):
+    """
+    Tests unitaires pour la classe AlphaVantageIntegration.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.alpha_vantage = AlphaVantageIntegration()
+        self.alpha_vantage.data_dir = self.temp_dir
+        
+        # Réponses simulées, avec une latence réseau de 200 ms par requête
+        self.responses = {
+            'OVERVIEW': {'Symbol': 'AAPL', 'PERatio': '30.5', 'DividendYield': '0.005'},
+            'INCOME_STATEMENT': {'annualReports': [
+                {'totalRevenue': '391035000000', 'grossProfit': '180683000000',
+                 'operatingIncome': '123216000000', 'netIncome': '93736000000'}
+            ]},
+            'BALANCE_SHEET': {'annualReports': [
+                {'totalAssets': '364980000000', 'totalLiabilities': '308030000000',
+                 'totalShareholderEquity': '56950000000'}
+            ]},
+            'CASH_FLOW': {'annualReports': []},
+            'EARNINGS': {'annualEarnings': []},
+            'TIME_SERIES_DAILY': {'Time Series (Daily)': {
+                '2024-11-01': {'1. open': '220.97', '2. high': '225.35', '3. low': '220.27',
+                               '4. close': '222.91', '5. volume': '65276741'},
+                '2024-10-31': {'1. open': '229.34', '2. high': '229.83', '3. low': '225.37',
+                               '4. close': '225.91', '5. volume': '64370086'}
+            }}
+        }
+        self.requested = []
+        self.lock = threading.Lock()
+        
+        def make_request(function, symbol, **kwargs):
+            with self.lock:
+                self.requested.append(function)
+            time.sleep(0.2)
+            if function == 'CASH_FLOW' and self.fail_cash_flow:
+                raise ValueError("Erreur Alpha Vantage: limite atteinte")
+            return self.responses[function]
+        
+        self.fail_cash_flow = False
+        self.alpha_vantage._make_request = make_request
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def test_get_financial_data_concurrent(self):
+        """
+        Teste que les cinq données sont récupérées en parallèle puis combinées.
+        """
+        start = time.monotonic()
+        financial_data = self.alpha_vantage.get_financial_data('AAPL')
+        elapsed = time.monotonic() - start
+        
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(list(financial_data), ['overview', 'income_statement', 'balance_sheet', 'cash_flow', 'earnings'])
+        self.assertEqual(financial_data['overview']['Symbol'], 'AAPL')
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'aapl_financial_data.json')))
+        
+        # Deuxième appel : tout vient du cache, sans requête
+        self.requested.clear()
+        self.alpha_vantage.get_financial_data('AAPL')
+        self.assertEqual(self.requested, [])
+    
+    def test_iter_financial_data_partial_results(self):
+        """
+        Teste que les données arrivent au fur et à mesure, celles en cache en premier.
+        """
+        self.alpha_vantage.get_company_overview('AAPL')
+        self.fail_cash_flow = True
+        
+        results = self.alpha_vantage.iter_financial_data('AAPL')
+        name, data = next(results)
+        self.assertEqual((name, data['Symbol']), ('overview', 'AAPL'))
+        
+        # Une donnée en erreur n'empêche pas de recevoir celles déjà arrivées
+        received = []
+        with self.assertRaises(ValueError):
+            for name, _ in results:
+                received.append(name)
+        self.assertNotIn('cash_flow', received)
+    
+    def test_extract_key_metrics_fetches_only_needed_data(self):
+        """
+        Teste que les métriques clés ne récupèrent que les données utilisées.
+        """
+        metrics = self.alpha_vantage.extract_key_metrics('AAPL')
+        
+        self.assertEqual(sorted(self.requested), ['BALANCE_SHEET', 'INCOME_STATEMENT', 'OVERVIEW'])
+        self.assertAlmostEqual(metrics['gross_margin'][2024], 46.2, places=1)
+        self.assertAlmostEqual(metrics['pe_ratio'][2024], 30.5)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'aapl_financial_data.json')))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'aapl_key_metrics.json')))
+
+    
+    def test_time_series_parsed_cache(self):
+        """
+        Teste que la série analysée est servie sans relire le JSON, et invalidée s'il change.
+        """
+        load_time_series.cache_clear()
+        df = self.alpha_vantage.get_time_series_daily('AAPL', 'full')
+        self.assertEqual(list(df.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(str(df['volume'].dtype), 'int64')
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'aapl_daily_full.npz')))
+        
+        # Appels suivants : ni requête, ni lecture du JSON ; le second vient de la mémoire
+        self.requested.clear()
+        with patch('app.core.alpha_vantage_integration.json.load') as mock_load:
+            cached = self.alpha_vantage.get_time_series_daily('AAPL', 'full')
+            cached['close'] = 0.0
+            cached = self.alpha_vantage.get_time_series_daily('AAPL', 'full')
+            mock_load.assert_not_called()
+        self.assertEqual(self.requested, [])
+        self.assertEqual(load_time_series.cache_info().hits, 1)
+        pd.testing.assert_frame_equal(cached, df)
+        
+        # Réponse brute réécrite : la série est analysée de nouveau
+        json_file = os.path.join(self.temp_dir, 'aapl_daily_full.json')
+        with open(json_file, 'w') as f:
+            f.write('{"Time Series (Daily)": {"2024-11-04": {"1. open": "220.99", "2. high": "222.79", '
+                    '"3. low": "219.71", "4. close": "222.01", "5. volume": "44944468"}}}')
+        npz_mtime = os.stat(os.path.join(self.temp_dir, 'aapl_daily_full.npz')).st_mtime_ns
+        os.utime(json_file, ns=(npz_mtime + 1, npz_mtime + 1))
+        
+        df = self.alpha_vantage.get_time_series_daily('AAPL', 'full')
+        self.assertEqual(len(df), 1)
+        self.assertEqual(df['close'].iloc[0], 222.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests unitaires pour le module cik_index.py.
+"""
+
+import os
+import sys
+import json
+import unittest
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.core.cik_index import CIKIndex
+
+
+class TestCIKIndex(unittest.TestCase):
+    """
+    Tests unitaires pour la classe CIKIndex.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.temp_dir, 'company_tickers.json')
+        self.index_path = os.path.join(self.temp_dir, 'cache', 'company_tickers.idx')
+        
+        # Extrait du fichier company_tickers.json de la SEC (deux tickers pour Alphabet)
+        companies = [
+            (320193, 'AAPL', 'Apple Inc.'),
+            (1652044, 'GOOGL', 'Alphabet Inc.'),
+            (1652044, 'GOOG', 'Alphabet Inc.'),
+            (1067983, 'BRK-B', 'BERKSHIRE HATHAWAY INC'),
+            (6951, 'AMAT', 'APPLIED MATERIALS INC /DE'),
+            (1018724, 'AMZN', 'AMAZON COM INC'),
+            (2488, 'AMD', 'ADVANCED MICRO DEVICES INC')
+        ]
+        with open(self.source_path, 'w') as f:
+            json.dump({
+                str(i): {'cik_str': cik, 'ticker': ticker, 'title': title}
+                for i, (cik, ticker, title) in enumerate(companies)
+            }, f)
+        
+        self.index = CIKIndex(source_path=self.source_path, index_path=self.index_path)
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def test_exact_and_reverse_lookup(self):
+        """
+        Teste la recherche du CIK d'un ticker et du ticker principal d'un CIK.
+        """
+        self.assertEqual(len(self.index), 7)
+        self.assertEqual(self.index.get_cik('aapl'), '0000320193')
+        self.assertEqual(self.index.get_cik('BRK-B'), '0001067983')
+        self.assertIsNone(self.index.get_cik('UNKNOWN'))
+        
+        self.assertEqual(self.index.get_ticker('0001652044'), 'GOOGL')
+        self.assertEqual(self.index.get_ticker(320193), 'AAPL')
+        self.assertIsNone(self.index.get_ticker(1))
+    
+    def test_prefix_search(self):
+        """
+        Teste la recherche par début de ticker, complétée par début de nom.
+        """
+        self.assertEqual([company['ticker'] for company in self.index.search('am')], ['AMAT', 'AMD', 'AMZN'])
+        self.assertEqual([company['ticker'] for company in self.index.search('am', limit=2)], ['AMAT', 'AMD'])
+        
+        results = self.index.search('App')
+        self.assertEqual([company['ticker'] for company in results], ['AAPL', 'AMAT'])
+        self.assertEqual(results[0], {'ticker': 'AAPL', 'cik': '0000320193', 'name': 'Apple Inc.'})
+        
+        self.assertEqual(self.index.search(''), [])
+        self.assertEqual(self.index.search('ZZZ'), [])
+    
+    def test_index_persisted(self):
+        """
+        Teste que l'index est relu depuis le disque sans analyser le JSON, puis reconstruit s'il change.
+        """
+        self.index.get_cik('AAPL')
+        self.assertTrue(os.path.exists(self.index_path))
+        
+        # Nouvelle instance : pas de lecture du JSON
+        with patch('app.core.cik_index.json.load') as mock_load:
+            index = CIKIndex(source_path=self.source_path, index_path=self.index_path)
+            self.assertEqual(index.get_cik('GOOG'), '0001652044')
+            mock_load.assert_not_called()
+        
+        # Fichier source mis à jour : l'index est reconstruit
+        with open(self.source_path, 'w') as f:
+            json.dump({'0': {'cik_str': 1045810, 'ticker': 'NVDA', 'title': 'NVIDIA CORP'}}, f)
+        index = CIKIndex(source_path=self.source_path, index_path=self.index_path)
+        self.assertEqual(index.get_cik('NVDA'), '0001045810')
+        self.assertIsNone(index.get_cik('AAPL'))
+    
+    def test_missing_source(self):
+        """
+        Teste qu'un fichier source absent donne un index vide.
+        """
+        index = CIKIndex(source_path=os.path.join(self.temp_dir, 'absent.json'), index_path=self.index_path)
+        
+        self.assertEqual(len(index), 0)
+        self.assertIsNone(index.get_cik('AAPL'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,400 @@
+"""
+Tests unitaires pour le module edgar_integration.py.
+"""
+
+import os
+import sys
+import json
+import unittest
+import tempfile
+import shutil
+import time
+import threading
+from unittest.mock import patch, MagicMock
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.core.edgar_integration import EdgarIntegration, InlineXBRLFacts, iter_html_lines, select_primary_document
+from app.core.token_bucket import TokenBucket
+from app.core.cik_index import CIKIndex
+
+
+def make_response(status_code=200, json_data=None, content=b''):
+    """
+    Crée une réponse HTTP simulée.
+    """
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = json_data
+    response.content = content
+    if status_code >= 400:
+        response.raise_for_status.side_effect = Exception(f"HTTP {status_code}")
+    return response
+
+
+class TestEdgarIntegration(unittest.TestCase):
+    """
+    Tests unitaires pour la classe EdgarIntegration.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        # Créer un répertoire temporaire pour les documents téléchargés
+        self.temp_dir = tempfile.mkdtemp()
+        
+        self.edgar = EdgarIntegration()
+        self.edgar.filings_dir = os.path.join(self.temp_dir, 'sec-edgar-filings')
+        self.edgar.manifest_path = os.path.join(self.temp_dir, 'manifest.json')
+        self.edgar.cik_index = CIKIndex(
+            source_path=os.path.join(self.temp_dir, 'company_tickers.json'),
+            index_path=os.path.join(self.temp_dir, 'company_tickers.idx')
+        )
+        data_dir_patcher = patch('app.core.edgar_integration.DATA_DIR', self.temp_dir)
+        data_dir_patcher.start()
+        self.addCleanup(data_dir_patcher.stop)
+        self.edgar.rate_limiter = TokenBucket(1000)
+        
+        # Index EDGAR simulé : deux 10-K et un 10-Q par entreprise
+        self.submissions = {
+            'filings': {
+                'recent': {
+                    'accessionNumber': ['0000320193-24-000123', '0000320193-24-000081', '0000320193-23-000106'],
+                    'form': ['10-K', '10-Q', '10-K'],
+                    'primaryDocument': ['aapl-20240928.htm', 'aapl-20240629.htm', 'aapl-20230930.htm'],
+                    'filingDate': ['2024-11-01', '2024-08-02', '2023-11-03']
+                }
+            }
+        }
+        self.requested_urls = []
+        
+        def get(url, timeout=None):
+            self.requested_urls.append(url)
+            if 'CIKXXXX' in url:
+                return make_response(404)
+            if url.endswith('.json'):
+                return make_response(json_data=self.submissions)
+            return make_response(content=f"<html>{url}</html>".encode())
+        
+        self.edgar.session.get = MagicMock(side_effect=get)
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        # Supprimer le répertoire temporaire
+        shutil.rmtree(self.temp_dir)
+    
+    def test_bulk_download_and_resume(self):
+        """
+        Teste le téléchargement de plusieurs entreprises et la reprise sans nouveau téléchargement.
+        """
+        results = self.edgar.bulk_download(['AAPL', 'msft'], ['10-K', '10-Q'], count=2, max_workers=2)
+        
+        # Vérifier les résultats par ticker
+        self.assertEqual(set(results), {'AAPL', 'MSFT'})
+        self.assertTrue(results['AAPL']['success'])
+        self.assertEqual(len(results['AAPL']['filings']['10-K']), 2)
+        self.assertEqual(len(results['AAPL']['filings']['10-Q']), 1)
+        self.assertEqual(results['AAPL']['downloaded'], 3)
+        self.assertTrue(os.path.exists(os.path.join(
+            results['AAPL']['filings']['10-K'][0], 'aapl-20240928.htm'
+        )))
+        
+        # Une requête d'index par entreprise, une requête par document
+        self.assertEqual(len(self.requested_urls), 2 * (1 + 3))
+        
+        # Relancer : seuls les index sont récupérés, les documents existants sont conservés
+        self.requested_urls.clear()
+        results = self.edgar.bulk_download(['AAPL', 'MSFT'], ['10-K', '10-Q'], count=2)
+        self.assertEqual(len(self.requested_urls), 2)
+        self.assertEqual((results['MSFT']['downloaded'], results['MSFT']['skipped']), (0, 3))
+    
+    def test_tickers_resolved_from_index(self):
+        """
+        Teste que les tickers hors des entreprises couvertes sont résolus par l'index des tickers.
+        """
+        with open(self.edgar.cik_index.source_path, 'w') as f:
+            f.write('{"0": {"cik_str": 1045810, "ticker": "NVDA", "title": "NVIDIA CORP"}}')
+        
+        self.edgar.get_recent_filings('nvda')
+        
+        self.assertEqual(self.requested_urls, ['https://data.sec.gov/submissions/CIK0001045810.json'])
+        self.assertRaises(ValueError, self.edgar.get_cik, 'UNKNOWN')
+    
+    def test_bulk_download_partial_failure(self):
+        """
+        Teste qu'une entreprise en erreur n'empêche pas le téléchargement des autres.
+        """
+        results = self.edgar.bulk_download(['AAPL', 'UNKNOWN'])
+        
+        self.assertTrue(results['AAPL']['success'])
+        self.assertFalse(results['UNKNOWN']['success'])
+        self.assertIn('UNKNOWN', results['UNKNOWN']['message'])
+    
+    def test_sync_company_fetches_only_new_filings(self):
+        """
+        Teste que la synchronisation ne télécharge et n'extrait que les nouveaux documents.
+        """
+        # Première synchronisation : le 10-K le plus récent est téléchargé et extrait
+        result = self.edgar.sync_company('AAPL', '10-K')
+        self.assertEqual([os.path.basename(path) for path in result['new_filings']], ['0000320193-24-000123'])
+        self.assertTrue(result['processed'])
+        self.assertTrue(os.path.exists(result['data_file']))
+        self.assertEqual(len(self.requested_urls), 2)
+        
+        # Aucun nouveau dépôt : seule la requête d'index est effectuée
+        self.requested_urls.clear()
+        with patch.object(self.edgar, 'process_filing') as mock_process:
+            result = self.edgar.sync_company('AAPL', '10-K')
+        self.assertEqual(result['new_filings'], [])
+        self.assertFalse(result['processed'])
+        mock_process.assert_not_called()
+        self.assertEqual(len(self.requested_urls), 1)
+        
+        # Nouveau 10-K déposé : lui seul est téléchargé et extrait
+        recent = self.submissions['filings']['recent']
+        recent['accessionNumber'].insert(0, '0000320193-25-000079')
+        recent['form'].insert(0, '10-K')
+        recent['primaryDocument'].insert(0, 'aapl-20250927.htm')
+        recent['filingDate'].insert(0, '2025-10-31')
+        self.requested_urls.clear()
+        result = self.edgar.sync_company('AAPL', '10-K')
+        self.assertEqual([os.path.basename(path) for path in result['new_filings']], ['0000320193-25-000079'])
+        self.assertTrue(result['processed'])
+        self.assertEqual(len(self.requested_urls), 2)
+        
+        # Le manifeste est conservé sur disque
+        edgar = EdgarIntegration()
+        edgar.manifest_path = self.edgar.manifest_path
+        entry = edgar.get_manifest_entry('aapl')
+        self.assertEqual(set(entry['filings']['10-K']), {'0000320193-25-000079', '0000320193-24-000123'})
+        self.assertEqual(entry['processed'], {'10-K': '0000320193-25-000079'})
+    
+    def test_sync_company_tracks_each_form(self):
+        """
+        Teste que des synchronisations alternées 10-K et 10-Q n'extraient chaque document qu'une fois.
+        """
+        text_10k = self.edgar.sync_company('AAPL', '10-K')['text_file']
+        text_10q = self.edgar.sync_company('AAPL', '10-Q')['text_file']
+        self.assertEqual(os.path.basename(text_10k), 'aapl_10k_extracted.txt')
+        self.assertEqual(os.path.basename(text_10q), 'aapl_10q_extracted.txt')
+        
+        with patch.object(self.edgar, 'process_filing') as mock_process:
+            self.assertFalse(self.edgar.sync_company('AAPL', '10-K')['processed'])
+            self.assertFalse(self.edgar.sync_company('AAPL', '10-Q')['processed'])
+        mock_process.assert_not_called()
+        self.assertEqual(self.edgar.get_manifest_entry('AAPL')['processed'], {
+            '10-K': '0000320193-24-000123', '10-Q': '0000320193-24-000081'
+        })
+    
+    def test_legacy_manifest_processed_entry(self):
+        """
+        Teste qu'un manifeste antérieur (un seul numéro d'enregistrement extrait) est relu comme un 10-K.
+        """
+        self.edgar.sync_company('AAPL', '10-K')
+        with open(self.edgar.manifest_path) as f:
+            manifest = json.load(f)
+        manifest['AAPL']['processed'] = '0000320193-24-000123'
+        with open(self.edgar.manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        
+        edgar = EdgarIntegration()
+        edgar.manifest_path = self.edgar.manifest_path
+        self.assertEqual(edgar.get_manifest_entry('AAPL')['processed'], {'10-K': '0000320193-24-000123'})
+        
+        self.edgar.manifest = None
+        with patch.object(self.edgar, 'process_filing', return_value=('text', 'data')) as mock_process:
+            self.assertFalse(self.edgar.sync_company('AAPL', '10-K')['processed'])
+            self.assertTrue(self.edgar.sync_company('AAPL', '10-Q')['processed'])
+        mock_process.assert_called_once()
+    
+    def test_manifest_updates_merged_between_instances(self):
+        """
+        Teste que des instances distinctes (un worker chacune) ne perdent pas leurs mises à jour
+        respectives du manifeste, y compris lorsqu'elles écrivent en même temps.
+        """
+        first = EdgarIntegration()
+        second = EdgarIntegration()
+        first.manifest_path = second.manifest_path = self.edgar.manifest_path
+        
+        def filing(number, form='10-K'):
+            return {'form': form, 'accession_number': f"0000000000-24-{number:06d}", 'filing_date': '2024-11-01'}
+        
+        # La première instance a chargé le manifeste avant l'écriture de la seconde
+        self.assertEqual(first.get_manifest_entry('AAPL')['filings'], {})
+        second._update_manifest('MSFT', [filing(1)], processed=filing(1))
+        first._update_manifest('AAPL', [filing(2)])
+        self.assertEqual(set(first.get_manifest_entry('MSFT')['filings']['10-K']), {'0000000000-24-000001'})
+        
+        # Écritures simultanées de plusieurs instances
+        instances = [first, second] + [EdgarIntegration() for _ in range(2)]
+        for instance in instances:
+            instance.manifest_path = self.edgar.manifest_path
+        
+        def update(instance, ticker):
+            for number in range(20):
+                instance._update_manifest(ticker, [filing(number, '10-Q')])
+        
+        threads = [
+            threading.Thread(target=update, args=(instance, ticker))
+            for instance, ticker in zip(instances, ['AAPL', 'MSFT', 'TSLA', 'NVDA'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        with open(self.edgar.manifest_path) as f:
+            manifest = json.load(f)
+        self.assertEqual(set(manifest), {'AAPL', 'MSFT', 'TSLA', 'NVDA'})
+        for ticker in manifest:
+            self.assertEqual(len(manifest[ticker]['filings']['10-Q']), 20)
+        self.assertEqual(manifest['MSFT']['processed'], {'10-K': '0000000000-24-000001'})
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith('.part')], [])
+    
+    def test_sync_all_costs_one_index_lookup_per_ticker(self):
+        """
+        Teste la synchronisation de la liste couverte, sans nouveau dépôt après la première.
+        """
+        results = self.edgar.sync_all(['AAPL', 'MSFT', 'UNKNOWN'])
+        self.assertTrue(results['AAPL']['success'])
+        self.assertFalse(results['UNKNOWN']['success'])
+        
+        self.requested_urls.clear()
+        results = self.edgar.sync_all(['AAPL', 'MSFT'])
+        self.assertEqual(len(self.requested_urls), 2)
+        self.assertFalse(any(result['processed'] for result in results.values()))
+    
+    def test_extract_text_from_filing(self):
+        """
+        Teste le choix du document principal et l'extraction du texte avec les tableaux.
+        """
+        filing_dir = os.path.join(self.temp_dir, 'filing')
+        os.makedirs(filing_dir)
+        
+        # Document principal, pièce jointe plus volumineuse et page du visualiseur XBRL
+        with open(os.path.join(filing_dir, 'aapl-20240928.htm'), 'w') as f:
+            f.write(
+                '<html><head><style>p {}</style></head><body>'
+                '<div style="display:none"><ix:header>Contexte caché</ix:header></div>'
+                '<p>Apple <b>Inc.</b> annual report</p>Item 7<br>Results'
+                '<table><tr><td><p>Total net sales</p></td><td>$</td><td>391,035</td><td>$</td><td>383,285</td></tr>'
+                '<tr><td>Gross margin percentage</td><td>46.2</td><td>%</td><td>44.1</td><td>%</td></tr></table>'
+                '</body></html>'
+            )
+        with open(os.path.join(filing_dir, 'a10-kexhibit2110.htm'), 'w') as f:
+            f.write('<p>Subsidiaries</p>' * 1000)
+        with open(os.path.join(filing_dir, 'R1.htm'), 'w') as f:
+            f.write('<p>Cover</p>' * 1000)
+        
+        self.assertEqual(os.path.basename(select_primary_document(filing_dir)), 'aapl-20240928.htm')
+        
+        # Vérifier les lignes extraites
+        text = self.edgar.extract_text_from_filing(filing_dir)
+        self.assertEqual(text.split('\n'), [
+            'Apple Inc. annual report',
+            'Item 7',
+            'Results',
+            'Total net sales\t$391,035\t$383,285',
+            'Gross margin percentage\t46.2%\t44.1%'
+        ])
+    
+    def test_extract_financial_data_from_inline_xbrl(self):
+        """
+        Teste l'extraction des métriques à partir des faits XBRL intégrés.
+        """
+        filing_dir = os.path.join(self.temp_dir, 'filing')
+        os.makedirs(filing_dir)
+        
+        # Contextes annuels, trimestriel et ventilé par segment ; unités USD et EUR
+        contexts = ''.join(
+            f'<xbrli:context id="{context_id}"><xbrli:entity>{segment}</xbrli:entity>'
+            f'<xbrli:period><xbrli:startDate>{start}</xbrli:startDate>'
+            f'<xbrli:endDate>{end}</xbrli:endDate></xbrli:period></xbrli:context>'
+            for context_id, start, end, segment in [
+                ('FY2024', '2023-10-01', '2024-09-28', ''),
+                ('FY2023', '2022-09-25', '2023-09-30', ''),
+                ('Q4FY2024', '2024-06-30', '2024-09-28', ''),
+                ('FY2024_iPhone', '2023-10-01', '2024-09-28',
+                 '<xbrli:segment><xbrldi:explicitMember>aapl:IPhoneMember</xbrldi:explicitMember></xbrli:segment>')
+            ]
+        )
+        
+        def fact(name, context, value, unit='usd', **attributes):
+            extra = ''.join(f' {key}="{attribute}"' for key, attribute in attributes.items())
+            return (f'<td><ix:nonFraction name="{name}" contextRef="{context}" unitRef="{unit}" '
+                    f'scale="6" decimals="-6" format="ixt:num-dot-decimal"{extra}>{value}</ix:nonFraction></td>')
+        
+        with open(os.path.join(filing_dir, 'aapl-20240928.htm'), 'w') as f:
+            f.write(
+                '<html><body><div style="display:none"><ix:header><ix:resources>'
+                f'{contexts}'
+                '<xbrli:unit id="usd"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>'
+                '<xbrli:unit id="eur"><xbrli:measure>iso4217:EUR</xbrli:measure></xbrli:unit>'
+                '</ix:resources></ix:header></div>'
+                '<table><tr><td>Total net sales</td>'
+                + fact('us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax', 'FY2024', '391,035')
+                + fact('us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax', 'FY2023', '383,285')
+                + fact('us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax', 'Q4FY2024', '94,930')
+                + fact('us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax', 'FY2024_iPhone', '201,183')
+                + fact('us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax', 'FY2024', '350,000', unit='eur')
+                + '</tr><tr><td>Gross margin</td>'
+                + fact('us-gaap:GrossProfit', 'FY2024', '180,683')
+                + fact('us-gaap:GrossProfit', 'FY2023', '169,148')
+                + '</tr><tr><td>Net income (loss)</td>'
+                + fact('us-gaap:NetIncomeLoss', 'FY2024', '93,736')
+                + fact('us-gaap:NetIncomeLoss', 'FY2023', '1,250', sign='-')
+                + '</tr></table></body></html>'
+            )
+        
+        facts = InlineXBRLFacts()
+        text = self.edgar.extract_text_from_filing(filing_dir, facts)
+        financial_data = self.edgar.extract_financial_data(text, facts)
+        
+        self.assertEqual(financial_data, {
+            'revenue': {2023: 383285.0, 2024: 391035.0},
+            'net_income': {2023: -1250.0, 2024: 93736.0},
+            'gross_margin': {2023: 44.1, 2024: 46.2}
+        })
+    
+    def test_extract_financial_data_falls_back_to_text(self):
+        """
+        Teste l'analyse du texte lorsque le document ne contient pas de faits XBRL.
+        """
+        text = 'Total net sales\t$394,328\t$383,285\t$391,035\nNet income\t$99,803\t$96,995\t$93,736'
+        
+        financial_data = self.edgar.extract_financial_data(text, InlineXBRLFacts())
+        
+        self.assertEqual(financial_data['revenue'], {2022: 394328.0, 2023: 383285.0, 2024: 391035.0})
+        self.assertEqual(financial_data['net_income'][2024], 93736.0)
+    
+    @patch('app.core.edgar_integration.time.sleep')
+    def test_request_retries_temporary_errors(self, mock_sleep):
+        """
+        Teste que les erreurs temporaires sont retentées.
+        """
+        self.edgar.session.get = MagicMock(side_effect=[make_response(503), make_response(json_data={'ok': True})])
+        
+        response = self.edgar._request('https://data.sec.gov/submissions/CIK0000320193.json')
+        
+        self.assertEqual(response.json(), {'ok': True})
+        self.assertEqual(self.edgar.session.get.call_count, 2)
+    
+    def test_token_bucket_rate(self):
+        """
+        Teste que le seau à jetons limite le débit.
+        """
+        bucket = TokenBucket(50)
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        
+        # Le premier jeton est immédiat, les dix suivants espacés de 20 ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+
+if __name__ == '__main__':
+    unittest.main()
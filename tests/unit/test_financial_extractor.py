@@ -0,0 +1,796 @@
+"""
+Tests unitaires pour le module financial_extractor.py.
+"""
+
+import os
+import sys
+import math
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import ExitStack, redirect_stdout
+from io import StringIO
+
+# Ajouter le répertoire src au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from openpyxl import load_workbook
+
+import financial_extractor
+from financial_extractor import (
+    scan_metrics, scan_metrics_stream, extract_key_metrics,
+    find_page_furniture, iter_lines, clean_text, _line_key,
+    build_metrics_cube, calculate_ratios_batch, calculate_financial_ratios,
+    fit_linear_trends, forecast_batch, predict_future_performance, _plot_prediction_series,
+    run_pipeline, file_digest, PIPELINE_MANIFEST, PIPELINE_VERSION,
+    export_to_excel, EXCEL_HEADER_STYLE, EXCEL_LABEL_STYLE, EXCEL_RANKINGS,
+    chart_job, render_charts, _draw_percent_bars, CHART_MANIFEST, process_multiple_reports,
+    read_file, read_file_chunks, clean_chunks
+)
+
+
+def filler(length):
+    """
+    Retourne du texte courant sans libellé ni titre d'état financier, d'environ length caractères.
+    """
+    line = "The Company designs, manufactures and markets products worldwide.\n"
+    return line * (length // len(line) + 1)
+
+
+def word(n):
+    """
+    Retourne un mot unique, sans chiffre, pour l'entier n.
+    """
+    word = ''
+    while True:
+        n, r = divmod(n, 26)
+        word += chr(ord('a') + r)
+        if not n:
+            return word
+
+
+def statements(revenue=('97,690', '96,773', '81,462'), net_income=('7,130', '15,001', '12,587')):
+    """
+    Retourne le texte des états financiers d'un rapport au format Tesla (années 2024, 2023, 2022).
+    """
+    return ("Consolidated Statements of Operations\n"
+            f"Total revenues {' '.join(revenue)}\n"
+            "Gross profit 17,450 17,660 20,853\n"
+            f"Net income {' '.join(net_income)}\n"
+            "Consolidated Balance Sheets\n"
+            "Total assets 122,070 106,618\n"
+            "Total liabilities 48,390 43,009\n")
+
+
+def summarize(matches):
+    """
+    Réduit le résultat de scan_metrics à {métrique: (émetteur, valeurs capturées)}.
+    """
+    return {metric: (issuer, match.groups()) for metric, (issuer, match) in matches.items()}
+
+
+class TestPageFurniture(unittest.TestCase):
+    """
+    Tests unitaires pour le repérage des en-têtes et pieds de page répétés.
+    """
+    
+    def build_pages(self, page_count, lines_per_page=40):
+        """
+        Construit un texte paginé : en-tête numéroté, corps unique et pied de page sur chaque page,
+        avec une ligne de tableau de même forme (chiffres différents) sur quelques pages.
+        """
+        self.header = "Tesla, Inc. | 2024 Form 10-K | {}"
+        self.footer = "See accompanying notes to the financial statements."
+        self.table_rows = {}
+        
+        lines = []
+        for page in range(page_count):
+            lines.append(self.header.format(page + 1))
+            for i in range(lines_per_page):
+                lines.append(f"The Company reviewed topic {word(page * lines_per_page + i)} during the year.")
+            if page % 6 == 1:
+                row = f"Total revenues {97690 - page} {96773 - page} {81462 - page}"
+                self.table_rows[page] = row
+                lines.append(row)
+            lines.append(self.footer)
+        return '\n'.join(lines) + '\n'
+    
+    def test_header_and_footer_stripped(self):
+        """
+        Teste que l'en-tête et le pied de page sont supprimés, et qu'une ligne de tableau
+        de même forme répétée sur quelques pages est conservée.
+        """
+        text = self.build_pages(20)
+        self.assertEqual(len(self.table_rows), 4)
+        
+        with redirect_stdout(StringIO()):
+            furniture = find_page_furniture(iter_lines([text]))
+            cleaned = clean_text(text)
+        
+        self.assertEqual(furniture, {_line_key(self.header.format(1)), _line_key(self.footer)})
+        self.assertNotIn("Form 10-K", cleaned)
+        self.assertNotIn(self.footer, cleaned)
+        for row in self.table_rows.values():
+            self.assertIn(row, cleaned)
+        self.assertIn(f"topic {word(799)} during", cleaned)
+    
+    def test_short_text_unchanged(self):
+        """
+        Teste qu'un texte trop court pour repérer des pages n'est pas modifié.
+        """
+        text = self.build_pages(3)
+        
+        with redirect_stdout(StringIO()):
+            furniture = find_page_furniture(iter_lines([text]))
+            cleaned = clean_text(text)
+        
+        self.assertEqual(furniture, frozenset())
+        self.assertEqual(cleaned, text)
+
+
+class TestChunkedReader(unittest.TestCase):
+    """
+    Tests unitaires pour la lecture par blocs (mmap) et le nettoyage en flux.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        # Rapport paginé : en-tête, numéro de page, caractères multi-octets et fins de ligne \r\n
+        pages = []
+        for page in range(12):
+            lines = ["Tesla, Inc. | 2024 Form 10-K", f"Société — thème {word(page)} présenté au conseil."]
+            lines += [f"The Company reviewed topic {word(page * 10 + i)} during the year." for i in range(10)]
+            if page == 6:
+                lines += statements().splitlines()
+            lines += ["", str(page + 1), ""]
+            pages.append('\r\n'.join(lines))
+        self.text = '\r\n'.join(pages)
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'tesla_10k_extracted.txt')
+        with open(self.path, 'wb') as f:
+            f.write(self.text.encode('utf-8'))
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def test_label_and_value_across_chunk_boundary(self):
+        """
+        Teste qu'avec de petits blocs, dont certains coupent un libellé de sa valeur, la lecture,
+        le nettoyage et l'extraction en flux donnent le même résultat que sur le texte complet.
+        """
+        with redirect_stdout(StringIO()):
+            text = read_file(self.path)
+            furniture = find_page_furniture(iter_lines([text]))
+            expected_text = clean_text(text)
+            expected = extract_key_metrics(expected_text)
+        
+        self.assertEqual(expected['revenue'], {'2024': '97,690', '2023': '96,773', '2022': '81,462'})
+        self.assertEqual(expected['total_liabilities'], {'2024': '48,390', '2023': '43,009'})
+        self.assertNotIn("Form 10-K", expected_text)
+        
+        straddled = 0
+        for chunk_size in range(48, 80):
+            with redirect_stdout(StringIO()):
+                chunks = list(read_file_chunks(self.path, chunk_size))
+                self.assertEqual(''.join(chunks), text)
+                self.assertEqual(''.join(clean_chunks(iter(chunks), furniture)), expected_text)
+                self.assertEqual(extract_key_metrics(clean_chunks(iter(chunks), furniture)), expected)
+            
+            # Bloc qui se termine entre le libellé « Total revenues » et sa première valeur
+            offset = 0
+            for chunk in chunks:
+                offset += len(chunk)
+                label = text.find("Total revenues", offset - len(chunk))
+                if label != -1 and label < offset <= text.index("97,690", label):
+                    straddled += 1
+        
+        self.assertGreater(straddled, 0)
+
+
+class TestScanMetrics(unittest.TestCase):
+    """
+    Tests unitaires pour la recherche des métriques du registre des émetteurs.
+    """
+    
+    def test_first_issuer_pack_wins(self):
+        """
+        Teste que le premier pack (dans l'ordre des émetteurs) l'emporte, même s'il correspond plus loin.
+        """
+        text = ("Total net sales $391,035 $383,285 $394,328\n"
+                + filler(2000)
+                + "Total revenues 97,690 96,773 81,462\n")
+        
+        matches = summarize(scan_metrics(text))
+        self.assertEqual(matches['revenue'], ('Tesla', ('97,690', '96,773', '81,462')))
+        
+        matches = summarize(scan_metrics(text, issuers=['Apple', 'Tesla']))
+        self.assertEqual(matches['revenue'], ('Apple', ('391,035', '383,285', '394,328')))
+        
+        # Seuls les packs sélectionnés sont utilisés
+        matches = summarize(scan_metrics(text, issuers=['Microsoft']))
+        self.assertNotIn('revenue', matches)
+    
+    def test_stream_matches_in_memory_across_chunk_boundary(self):
+        """
+        Teste que la recherche en flux donne le même résultat que sur le texte complet,
+        y compris lorsqu'un libellé est coupé entre deux blocs et que la fenêtre glisse.
+        """
+        text = (filler(250000)
+                + "Consolidated Statements of Operations\n"
+                + "Total revenues 97,690 96,773 81,462\n"
+                + "Gross profit 17,450 17,660 20,853\n"
+                + "Net income 7,130 15,001 12,587\n"
+                + filler(150000)
+                + "Consolidated Balance Sheets\n"
+                + "Total assets 122,070 106,618\n"
+                + "Total liabilities 48,390 43,009\n"
+                + filler(20000))
+        
+        # Couper au milieu du libellé « Total revenues », puis par blocs de 64 Ko
+        boundary = text.index("Total revenues") + 6
+        chunks = [text[:boundary]]
+        chunks += [text[i:i + (1 << 16)] for i in range(boundary, len(text), 1 << 16)]
+        
+        expected = summarize(scan_metrics(text))
+        self.assertEqual(expected['revenue'], ('Tesla', ('97,690', '96,773', '81,462')))
+        self.assertEqual(expected['total_liabilities'], ('Tesla', ('48,390', '43,009')))
+        self.assertEqual(summarize(scan_metrics_stream(iter(chunks))), expected)
+        
+        # Même résultat avec des blocs d'un seul tenant
+        self.assertEqual(summarize(scan_metrics_stream(iter([text]))), expected)
+    
+    def test_fallback_when_section_windows_are_empty(self):
+        """
+        Teste qu'un titre d'état cité dans le texte courant n'empêche pas la recherche dans tout le texte.
+        """
+        text = ("This discussion should be read with our Consolidated Statements of Operations.\n"
+                + filler(60000)
+                + "Total revenues 96,773 81,462 53,823\n"
+                + "Net income 7,130 12,587 14,974\n")
+        
+        with redirect_stdout(StringIO()):
+            metrics = extract_key_metrics(text)
+            streamed = extract_key_metrics(iter([text[:30000], text[30000:]]))
+        
+        self.assertEqual(metrics['revenue'], {'2024': '96,773', '2023': '81,462', '2022': '53,823'})
+        self.assertEqual(metrics['net_income'], {'2024': '7,130', '2023': '12,587', '2022': '14,974'})
+        self.assertEqual(streamed, metrics)
+        
+        # Une fenêtre d'état qui contient la métrique reste prioritaire sur le reste du texte
+        text = ("Total revenues 1 2 3\n"
+                + "Consolidated Statements of Operations\n"
+                + "Total revenues 96,773 81,462 53,823\n")
+        self.assertEqual(summarize(scan_metrics(text))['revenue'], ('Tesla', ('96,773', '81,462', '53,823')))
+        self.assertEqual(summarize(scan_metrics_stream(iter([text]))), summarize(scan_metrics(text)))
+
+
+class TestRatios(unittest.TestCase):
+    """
+    Tests unitaires pour le calcul vectorisé des ratios financiers.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        # Capitaux propres négatifs en 2023, perte (entre parenthèses) en 2024
+        self.complete = {
+            'revenue': {'2022': '100', '2023': '120', '2024': '$144'},
+            'net_income': {'2022': '10', '2023': '12', '2024': '(6)'},
+            'gross_profit': {'2022': '40', '2023': '48', '2024': '72'},
+            'total_assets': {'2023': '100', '2024': '1,000'},
+            'total_liabilities': {'2023': '120', '2024': '750'}
+        }
+        # Chiffre d'affaires 2023 absent, bénéfice brut nul en 2022
+        self.partial = {
+            'revenue': {'2022': '50', '2024': '80'},
+            'net_income': {'2022': '5', '2023': '6', '2024': '8'},
+            'gross_profit': {'2022': '0', '2023': '10', '2024': '20'}
+        }
+    
+    def test_build_metrics_cube(self):
+        """
+        Teste la conversion des valeurs brutes : absentes en NaN, illisibles à 0.
+        """
+        companies, years, metric_names, cube = build_metrics_cube(
+            {'A': self.complete, 'B': {'revenue': {'2024': 'n/a'}}}
+        )
+        
+        self.assertEqual(companies, ['A', 'B'])
+        self.assertEqual(years, ['2022', '2023', '2024'])
+        self.assertEqual(cube.shape, (2, 3, len(metric_names)))
+        np.testing.assert_array_equal(cube[0, :, metric_names.index('revenue')], [100, 120, 144])
+        np.testing.assert_array_equal(cube[0, :, metric_names.index('net_income')], [10, 12, -6])
+        np.testing.assert_array_equal(cube[0, :, metric_names.index('total_assets')], [np.nan, 100, 1000])
+        np.testing.assert_array_equal(cube[1, :, metric_names.index('revenue')], [np.nan, np.nan, 0])
+    
+    def test_yearly_ratios(self):
+        """
+        Teste les marges, le ratio d'endettement, l'autonomie financière, le ROA et le ROE.
+        """
+        companies, years, arrays = calculate_ratios_batch({'A': self.complete})
+        
+        np.testing.assert_allclose(arrays['net_margin'][0], [10, 10, -6 / 144 * 100])
+        np.testing.assert_allclose(arrays['gross_margin'][0], [40, 40, 50])
+        np.testing.assert_allclose(arrays['debt_ratio'][0], [np.nan, 120, 75])
+        np.testing.assert_allclose(arrays['financial_autonomy'][0], [np.nan, -20, 25])
+        np.testing.assert_allclose(arrays['roa'][0], [np.nan, 12, -0.6])
+        
+        # Capitaux propres négatifs en 2023 : pas de ROE
+        np.testing.assert_allclose(arrays['roe'][0], [np.nan, np.nan, -2.4])
+    
+    def test_growth_and_cagr(self):
+        """
+        Teste les taux de croissance et le CAGR, non calculés si une année manque
+        ou si la valeur de départ n'est pas strictement positive.
+        """
+        companies, years, arrays = calculate_ratios_batch({'A': self.complete, 'B': self.partial})
+        
+        np.testing.assert_allclose(arrays['revenue_growth'], [[20, 20], [np.nan, np.nan]])
+        np.testing.assert_allclose(arrays['revenue_cagr'], [20, np.nan])
+        np.testing.assert_allclose(arrays['net_income_growth'], [[20, -150], [20, 100 / 3]])
+        np.testing.assert_allclose(arrays['net_income_cagr'], [np.nan, (8 / 5) ** 0.5 * 100 - 100])
+        np.testing.assert_allclose(arrays['gross_profit_growth'], [[20, 50], [np.nan, 100]])
+        np.testing.assert_allclose(arrays['gross_profit_cagr'], [(72 / 40) ** 0.5 * 100 - 100, np.nan])
+    
+    def test_batch_matches_per_company(self):
+        """
+        Teste que le calcul groupé donne, pour chaque entreprise, les ratios calculés séparément.
+        """
+        all_metrics = {'A': self.complete, 'B': self.partial, 'C': {}}
+        batch = calculate_ratios_batch(all_metrics, as_dict=True)
+        
+        with redirect_stdout(StringIO()):
+            separate = {company: calculate_financial_ratios(metrics) for company, metrics in all_metrics.items()}
+        
+        self.assertEqual(list(batch), ['A', 'B', 'C'])
+        for company in all_metrics:
+            self.assertEqual(dict(batch[company]), dict(separate[company]))
+        
+        self.assertEqual(batch['A']['roe'], {'2024': -2.4})
+        self.assertEqual(list(batch['A']['gross_margin']), ['2024', '2023', '2022'])
+        self.assertAlmostEqual(batch['A']['revenue_cagr']['2022_2024'], 20)
+        self.assertEqual(batch['A']['revenue_growth'], {'2022_2023': 20.0, '2023_2024': 20.0})
+        self.assertNotIn('revenue_growth', batch['B'])
+        self.assertEqual(dict(batch['C']), {})
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    Tests unitaires pour le mode incrémental du pipeline (empreintes des entrées de chaque étape).
+    """
+    
+    # Fonction exécutée par chaque étape du pipeline
+    STAGE_FUNCTIONS = {
+        'extract': 'extract_key_metrics',
+        'ratios': 'calculate_financial_ratios',
+        'charts': 'create_visualizations',
+        'results': 'save_results'
+    }
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, 'tesla')
+        self.file_path = os.path.join(self.temp_dir, 'tesla_10k_extracted.txt')
+        self.write_filing(filler(2000) + statements())
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def write_filing(self, text):
+        """
+        Écrit le texte du rapport traité par le pipeline.
+        """
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    
+    def run_pipeline(self, **kwargs):
+        """
+        Exécute le pipeline et retourne l'ensemble des étapes exécutées (non ignorées).
+        """
+        with ExitStack() as stack, redirect_stdout(StringIO()):
+            mocks = {
+                stage: stack.enter_context(patch.object(
+                    financial_extractor, name, wraps=getattr(financial_extractor, name)
+                ))
+                for stage, name in self.STAGE_FUNCTIONS.items()
+            }
+            run_pipeline(self.file_path, self.output_dir, 'svg', **kwargs)
+        return {stage for stage, mock in mocks.items() if mock.called}
+    
+    def load_manifest(self):
+        """
+        Relit le manifeste des étapes du répertoire de sortie.
+        """
+        with open(os.path.join(self.output_dir, PIPELINE_MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    
+    def test_unchanged_inputs_skip_stages(self):
+        """
+        Teste qu'une nouvelle exécution sur un rapport inchangé n'exécute aucune étape.
+        """
+        self.assertEqual(self.run_pipeline(), set(self.STAGE_FUNCTIONS))
+        
+        manifest = self.load_manifest()
+        self.assertEqual(manifest['version'], PIPELINE_VERSION)
+        self.assertEqual(set(manifest['stages']), set(self.STAGE_FUNCTIONS))
+        self.assertEqual(manifest['stages']['extract']['input'], file_digest(self.file_path))
+        self.assertEqual(manifest['stages']['extract']['result']['revenue'],
+                         {'2024': '97,690', '2023': '96,773', '2022': '81,462'})
+        for path in manifest['stages']['charts']['result'] + manifest['stages']['results']['result']:
+            self.assertTrue(os.path.exists(path))
+        
+        self.assertEqual(self.run_pipeline(), set())
+        self.assertEqual(self.load_manifest(), manifest)
+    
+    def test_force_reruns_every_stage(self):
+        """
+        Teste que force exécute toutes les étapes, même sur un rapport inchangé.
+        """
+        self.run_pipeline()
+        self.assertEqual(self.run_pipeline(force=True), set(self.STAGE_FUNCTIONS))
+    
+    def test_missing_output_replays_stage(self):
+        """
+        Teste qu'une étape dont un fichier de sortie a disparu est rejouée, et elle seule.
+        """
+        self.run_pipeline()
+        chart_path = self.load_manifest()['stages']['charts']['result'][0]
+        os.remove(chart_path)
+        
+        self.assertEqual(self.run_pipeline(), {'charts'})
+        self.assertTrue(os.path.exists(chart_path))
+    
+    def test_changed_input_reruns_dependent_stages(self):
+        """
+        Teste qu'un rapport modifié rejoue l'extraction, puis les seules étapes dont les entrées ont changé.
+        """
+        self.run_pipeline()
+        
+        # Texte modifié sans effet sur les métriques : les étapes suivantes sont ignorées
+        self.write_filing(filler(3000) + statements())
+        self.assertEqual(self.run_pipeline(), {'extract'})
+        
+        # Métriques modifiées : toutes les étapes sont rejouées
+        self.write_filing(filler(3000) + statements(net_income=('8,000', '15,001', '12,587')))
+        self.assertEqual(self.run_pipeline(), set(self.STAGE_FUNCTIONS))
+        self.assertEqual(self.load_manifest()['stages']['ratios']['result']['net_margin']['2024'],
+                         8000 / 97690 * 100)
+
+
+class TestMultipleReports(unittest.TestCase):
+    """
+    Tests unitaires pour le traitement de plusieurs rapports, séquentiel ou dans un pool de processus.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_paths = []
+        for company, revenue in [('tesla', ('97,690', '96,773', '81,462')), ('acme', ('12,500', '11,000', '9,800'))]:
+            path = os.path.join(self.temp_dir, f"{company}_10k_extracted.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(filler(1000) + statements(revenue=revenue))
+            self.file_paths.append(path)
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def process(self, name, workers):
+        """
+        Traite les rapports dans un répertoire de sortie propre à l'exécution.
+        """
+        output_dir = os.path.join(self.temp_dir, name)
+        with redirect_stdout(StringIO()):
+            all_metrics, all_ratios = process_multiple_reports(self.file_paths, output_dir, workers=workers,
+                                                               image_format='svg')
+        return output_dir, all_metrics, {company: dict(ratios) for company, ratios in all_ratios.items()}
+    
+    def test_workers_match_serial(self):
+        """
+        Teste que le traitement dans un pool de deux processus donne les mêmes résultats
+        et les mêmes fichiers que le traitement séquentiel.
+        """
+        serial_dir, serial_metrics, serial_ratios = self.process('serial', workers=1)
+        parallel_dir, parallel_metrics, parallel_ratios = self.process('parallel', workers=2)
+        
+        self.assertEqual(list(serial_metrics), ['TESLA', 'ACME'])
+        self.assertEqual(serial_metrics['ACME']['revenue'], {'2024': '12,500', '2023': '11,000', '2022': '9,800'})
+        self.assertEqual(parallel_metrics, serial_metrics)
+        self.assertEqual(list(parallel_ratios), list(serial_ratios))
+        self.assertEqual(parallel_ratios, serial_ratios)
+        
+        def output_files(output_dir):
+            return sorted(
+                os.path.relpath(os.path.join(root, name), output_dir)
+                for root, _, names in os.walk(output_dir) for name in names
+            )
+        
+        files = output_files(serial_dir)
+        self.assertIn(os.path.join('acme', 'tesla_revenue.svg'), files)
+        self.assertIn(os.path.join('comparative', 'financial_analysis.xlsx'), files)
+        self.assertEqual(output_files(parallel_dir), files)
+        
+        # Résultats texte identiques, à l'exception des chemins des répertoires de sortie
+        # (les manifestes conservent l'empreinte des chemins écrits, propres à chaque exécution)
+        for name in files:
+            if name.endswith(('.json', '.csv', '.txt')) and not os.path.basename(name).startswith('.'):
+                with open(os.path.join(serial_dir, name), encoding='utf-8') as f:
+                    serial = f.read().replace(serial_dir, '')
+                with open(os.path.join(parallel_dir, name), encoding='utf-8') as f:
+                    self.assertEqual(f.read().replace(parallel_dir, ''), serial, name)
+
+
+class TestRenderCharts(unittest.TestCase):
+    """
+    Tests unitaires pour le rendu des graphiques et le manifeste de leurs empreintes.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def jobs(self, debt_ratio=(38.9, 39.6)):
+        """
+        Retourne deux petits graphiques, le second traçant le ratio d'endettement donné.
+        """
+        return [
+            chart_job('margins', _draw_percent_bars, (2, 2), 'default',
+                      years=['2023', '2024'], values=[18.2, 17.9], title='Marges', color='#1f77b4'),
+            chart_job('debt_ratio', _draw_percent_bars, (2, 2), 'default',
+                      years=['2023', '2024'], values=list(debt_ratio), title='Endettement', color='#d62728')
+        ]
+    
+    def render(self, jobs, **kwargs):
+        """
+        Produit les graphiques et retourne leurs chemins et les noms des fichiers dessinés.
+        """
+        with patch.object(financial_extractor, '_render_chart', wraps=financial_extractor._render_chart) as mock_render, \
+                redirect_stdout(StringIO()):
+            paths = render_charts(jobs, self.temp_dir, **kwargs)
+        return paths, [os.path.basename(call.args[1]) for call in mock_render.call_args_list]
+    
+    def test_unchanged_charts_not_rendered(self):
+        """
+        Teste qu'un second rendu des mêmes graphiques n'écrit rien, puis que des données
+        modifiées ou force redessinent les graphiques concernés.
+        """
+        paths, rendered = self.render(self.jobs())
+        self.assertEqual(paths, [os.path.join(self.temp_dir, 'margins.png'), os.path.join(self.temp_dir, 'debt_ratio.png')])
+        self.assertEqual(rendered, ['margins.png', 'debt_ratio.png'])
+        
+        with open(os.path.join(self.temp_dir, CHART_MANIFEST), encoding='utf-8') as f:
+            self.assertEqual(set(json.load(f)), {'margins.png', 'debt_ratio.png'})
+        mtimes = [os.stat(path).st_mtime_ns for path in paths]
+        
+        # Second rendu : aucun graphique dessiné ni réécrit
+        self.assertEqual(self.render(self.jobs()), (paths, []))
+        self.assertEqual([os.stat(path).st_mtime_ns for path in paths], mtimes)
+        
+        # Données modifiées : seul le graphique concerné est redessiné
+        self.assertEqual(self.render(self.jobs(debt_ratio=(38.9, 41.0)))[1], ['debt_ratio.png'])
+        self.assertEqual(self.render(self.jobs(debt_ratio=(38.9, 41.0)))[1], [])
+        
+        # force : tous les graphiques sont redessinés
+        self.assertEqual(self.render(self.jobs(debt_ratio=(38.9, 41.0)), force=True)[1],
+                         ['margins.png', 'debt_ratio.png'])
+    
+    def test_svg_format(self):
+        """
+        Teste le rendu en SVG, distinct du rendu PNG dans le manifeste, et le refus d'un format inconnu.
+        """
+        self.render(self.jobs())
+        paths, rendered = self.render(self.jobs(), image_format='svg')
+        
+        self.assertEqual(rendered, ['margins.svg', 'debt_ratio.svg'])
+        with open(paths[0], encoding='utf-8') as f:
+            self.assertIn('<svg', f.read())
+        with open(os.path.join(self.temp_dir, CHART_MANIFEST), encoding='utf-8') as f:
+            self.assertEqual(set(json.load(f)), {'margins.png', 'debt_ratio.png', 'margins.svg', 'debt_ratio.svg'})
+        self.assertEqual(self.render(self.jobs(), image_format='svg')[1], [])
+        
+        with self.assertRaises(ValueError):
+            render_charts(self.jobs(), self.temp_dir, image_format='gif')
+
+
+class TestExcelExport(unittest.TestCase):
+    """
+    Tests unitaires pour l'export Excel en écriture seule.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.all_metrics = {
+            'TESLA': {
+                'revenue': {'2022': '81,462', '2023': '96,773', '2024': '97,690'},
+                'net_income': {'2022': '12,587', '2023': '15,001', '2024': '7,130'},
+                'gross_profit': {'2022': '20,853', '2023': '17,660', '2024': '17,450'},
+                'total_assets': {'2023': '106,618', '2024': '122,070'},
+                'total_liabilities': {'2023': '43,009', '2024': '48,390'}
+            },
+            'APPLE': {
+                'revenue': {'2022': '$394,328', '2023': '$383,285', '2024': '$391,035'},
+                'net_income': {'2022': '$99,803', '2023': '$96,995', '2024': '$93,736'},
+                'gross_profit': {'2022': '170,782', '2023': '169,148', '2024': '180,683'},
+                'total_assets': {'2023': '$352,583', '2024': '$364,980'},
+                'total_liabilities': {'2023': '$290,437', '2024': '$308,030'}
+            }
+        }
+        self.all_ratios = calculate_ratios_batch(self.all_metrics, as_dict=True)
+        
+        with redirect_stdout(StringIO()):
+            self.path = export_to_excel(self.all_metrics, self.all_ratios, self.temp_dir)
+        self.wb = load_workbook(self.path)
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        self.wb.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_sheets_and_styles(self):
+        """
+        Teste les feuilles, les styles nommés des en-têtes et des libellés, et le format des valeurs.
+        """
+        self.assertEqual(self.path, os.path.join(self.temp_dir, 'financial_analysis.xlsx'))
+        self.assertEqual(self.wb.sheetnames, ['Revenus', 'Marges', 'Ratios Financiers', 'Classement'])
+        self.assertIn(EXCEL_HEADER_STYLE, self.wb.named_styles)
+        self.assertIn(EXCEL_LABEL_STYLE, self.wb.named_styles)
+        
+        for sheet in self.wb.worksheets:
+            for cell in sheet[1]:
+                self.assertEqual(cell.style, EXCEL_HEADER_STYLE)
+                self.assertTrue(cell.font.bold)
+                self.assertEqual(cell.fill.start_color.rgb, '00DDDDDD')
+                self.assertEqual(cell.alignment.horizontal, 'center')
+            self.assertEqual(sheet.max_row, 1 + (len(EXCEL_RANKINGS) if sheet.title == 'Classement' else 2))
+        
+        # Valeurs écrites en texte déjà formaté, sans format de nombre
+        revenue = self.wb['Revenus']
+        self.assertEqual([cell.value for cell in revenue[2]],
+                         ['TESLA', '$81,462', '$96,773', '$97,690', '18.80%', '0.95%'])
+        self.assertEqual({cell.number_format for row in revenue.iter_rows(min_row=2) for cell in row}, {'General'})
+        self.assertEqual(self.wb['Marges']['D3'].value, f"{93736 / 391035 * 100:.2f}%")
+        self.assertEqual(self.wb['Ratios Financiers']['G2'].value, f"{7130 / (122070 - 48390) * 100:.2f}%")
+        
+        # Libellés du classement en style nommé, valeurs sans style
+        ranking = self.wb['Classement']
+        self.assertEqual({ranking.cell(row, 1).style for row in range(2, ranking.max_row + 1)}, {EXCEL_LABEL_STYLE})
+        self.assertEqual(ranking['B2'].style, 'Normal')
+    
+    def test_column_widths(self):
+        """
+        Teste que la largeur de chaque colonne correspond à sa valeur la plus longue, plus une marge.
+        """
+        for sheet in self.wb.worksheets:
+            for column in sheet.iter_cols():
+                longest = max(len(str(cell.value)) for cell in column if cell.value is not None)
+                self.assertEqual(sheet.column_dimensions[column[0].column_letter].width, longest + 2)
+    
+    def test_ranking_with_fewer_than_three_companies(self):
+        """
+        Teste que le classement de deux entreprises laisse la troisième place vide.
+        """
+        ranking = self.wb['Classement']
+        
+        self.assertEqual([cell.value for cell in ranking[1]], ['Métrique', '1er', '2ème', '3ème'])
+        self.assertEqual([row[0] for row in ranking.iter_rows(min_row=2, values_only=True)],
+                         [label for label, *_ in EXCEL_RANKINGS])
+        self.assertEqual([cell.value for cell in ranking[2]], ['Revenus 2024', 'APPLE: $391,035', 'TESLA: $97,690', None])
+        
+        # Ratio d'endettement : le plus bas en premier
+        self.assertEqual(ranking['B6'].value, f"TESLA: {48390 / 122070 * 100:.2f}%")
+        for row in ranking.iter_rows(min_row=2, values_only=True):
+            self.assertEqual(len(row), 4)
+            self.assertIsNotNone(row[2])
+            self.assertIsNone(row[3])
+
+
+class TestForecast(unittest.TestCase):
+    """
+    Tests unitaires pour les prévisions par tendance linéaire.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.metrics = {
+            'revenue': {'2022': '10', '2023': '12', '2024': '17'},
+            'net_income': {'2022': '1', '2023': '2', '2024': '3'},
+            'gross_profit': {'2022': '4', '2023': '5', '2024': '7'}
+        }
+    
+    def test_fit_linear_trends(self):
+        """
+        Teste la pente, le R² et la largeur de l'intervalle de prédiction sur trois années.
+        """
+        fit = fit_linear_trends([2022, 2023, 2024], [[10, 12, 17], [1, 2, 3]], [2025, 2026])
+        
+        np.testing.assert_allclose(fit['slope'], [3.5, 1.0])
+        np.testing.assert_allclose(fit['r_squared'], [1 - 1.5 / 26, 1.0])
+        np.testing.assert_allclose(fit['predictions'][0], [20.0, 23.5])
+        
+        # Loi de Student à 1 degré de liberté : t(0,975) = 12,7062 ; écart-type résiduel sqrt(1,5)
+        width = fit['upper'][0] - fit['lower'][0]
+        expected = [2 * 12.7062047 * math.sqrt(1.5) * math.sqrt(1 + 1 / 3 + dx ** 2 / 2) for dx in (2, 3)]
+        np.testing.assert_allclose(width, expected, rtol=1e-6)
+        
+        # Ajustement parfait : intervalle de largeur nulle
+        np.testing.assert_allclose(fit['upper'][1], fit['lower'][1])
+        
+        # Deux années seulement : pas d'intervalle
+        fit = fit_linear_trends([2023, 2024], [[12, 17]], [2025])
+        self.assertTrue(np.isnan(fit['lower']).all())
+    
+    def test_years_ahead_validated(self):
+        """
+        Teste qu'un horizon inférieur à un an est refusé avec une erreur explicite.
+        """
+        with self.assertRaises(ValueError):
+            forecast_batch({'AAPL': self.metrics}, years_ahead=0)
+        with redirect_stdout(StringIO()), self.assertRaises(ValueError):
+            predict_future_performance(self.metrics, {}, years_ahead=0)
+    
+    def test_chart_plots_prediction_interval(self):
+        """
+        Teste que le graphique trace les bornes de l'intervalle de prédiction calculé.
+        """
+        with redirect_stdout(StringIO()):
+            predictions = predict_future_performance(self.metrics, {}, years_ahead=2)
+        lower, upper = predictions['intervals']['revenue']['2025']
+        self.assertLess(lower, predictions['revenue']['2025'])
+        self.assertGreater(upper, predictions['revenue']['2025'])
+        
+        series = {
+            'historical_years': [2022, 2023, 2024],
+            'historical_values': [10.0, 12.0, 17.0],
+            'future_years': [2025, 2026],
+            'predicted_values': [predictions['revenue']['2025'], predictions['revenue']['2026']],
+            'lower': [predictions['intervals']['revenue'][year][0] for year in ['2025', '2026']],
+            'upper': [predictions['intervals']['revenue'][year][1] for year in ['2025', '2026']],
+            'interval_level': 0.95
+        }
+        ax = MagicMock()
+        _plot_prediction_series(ax, series, 2, 8, ['Historique', 'Prédiction', 'Confiance'])
+        
+        args, kwargs = ax.fill_between.call_args
+        self.assertEqual(args, ([2025, 2026], series['lower'], series['upper']))
+        self.assertEqual(kwargs['label'], 'Confiance (95%)')
+
+
+if __name__ == '__main__':
+    unittest.main()
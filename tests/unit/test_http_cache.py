@@ -0,0 +1,250 @@
+"""
+Tests unitaires pour le module http_cache.py.
+"""
+
+import os
+import sys
+import time
+import unittest
+import tempfile
+import shutil
+import threading
+from unittest.mock import patch
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import requests
+
+from app.core.http_cache import HTTPCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serveur HTTP local : /etag revalidé par ETag, /modified par Last-Modified.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        """
+        Répond à une requête GET en enregistrant ses en-têtes et sa connexion.
+        """
+        server = self.server
+        server.requests.append((self.path, dict(self.headers), self.client_address))
+        
+        if self.path == '/etag':
+            etag = f'"v{server.version}"'
+            if self.headers.get('If-None-Match') == etag:
+                self._reply(304, b'', {'ETag': etag})
+            else:
+                self._reply(200, f"version {server.version}".encode(), {'ETag': etag})
+        elif self.path == '/modified':
+            last_modified = 'Fri, 01 Nov 2024 00:00:00 GMT'
+            if self.headers.get('If-Modified-Since') == last_modified:
+                self._reply(304, b'', {'Last-Modified': last_modified})
+            else:
+                self._reply(200, b'document', {'Last-Modified': last_modified})
+        else:
+            self._reply(404, b'introuvable', {})
+    
+    def _reply(self, status, body, headers):
+        """
+        Envoie une réponse avec Content-Length, pour maintenir la connexion ouverte.
+        """
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """
+        Désactive les journaux du serveur de test.
+        """
+        pass
+
+
+class TestHTTPCache(unittest.TestCase):
+    """
+    Tests unitaires pour la classe HTTPCache.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        """
+        Démarre le serveur HTTP local.
+        """
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Arrête le serveur HTTP local.
+        """
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.server.requests = []
+        self.server.version = 1
+        self.cache = HTTPCache(cache_dir=self.temp_dir, max_age=60)
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        self.cache.session.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_fresh_response_served_from_disk(self):
+        """
+        Teste qu'une réponse fraîche est servie sans requête, y compris par une autre instance.
+        """
+        url = f"{self.base_url}/etag"
+        
+        first = self.cache.get(url)
+        second = HTTPCache(cache_dir=self.temp_dir, max_age=60).get(url)
+        
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.text, 'version 1')
+        self.assertEqual(second.headers['ETag'], '"v1"')
+        self.assertEqual(len(self.server.requests), 1)
+    
+    def test_revalidation_with_etag(self):
+        """
+        Teste la revalidation par If-None-Match, puis la mise à jour lorsque le contenu change.
+        """
+        url = f"{self.base_url}/etag"
+        self.cache.get(url)
+        
+        # Réponse périmée mais inchangée : 304, le contenu en cache est réutilisé
+        response = self.cache.get(url, max_age=0)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.text, 'version 1')
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+        
+        # La revalidation rend la réponse de nouveau fraîche
+        self.cache.get(url)
+        self.assertEqual(len(self.server.requests), 2)
+        
+        # Contenu modifié sur le serveur : nouvelle version mise en cache
+        self.server.version = 2
+        response = self.cache.get(url, max_age=0)
+        self.assertFalse(response.from_cache)
+        self.assertEqual(response.text, 'version 2')
+        self.assertEqual(self.cache.get(url).text, 'version 2')
+    
+    def test_revalidation_with_last_modified(self):
+        """
+        Teste la revalidation par If-Modified-Since.
+        """
+        url = f"{self.base_url}/modified"
+        self.cache.get(url)
+        
+        response = self.cache.get(url, max_age=0)
+        
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.text, 'document')
+        self.assertEqual(self.server.requests[-1][1].get('If-Modified-Since'), 'Fri, 01 Nov 2024 00:00:00 GMT')
+    
+    def test_errors_not_cached_and_connection_reused(self):
+        """
+        Teste que les erreurs ne sont pas mises en cache et que la connexion est réutilisée.
+        """
+        url = f"{self.base_url}/missing"
+        
+        for _ in range(3):
+            self.assertEqual(self.cache.get(url).status_code, 404)
+        
+        self.assertEqual(len(self.server.requests), 3)
+        # Une seule connexion TCP pour les trois requêtes
+        self.assertEqual(len({request[2] for request in self.server.requests}), 1)
+    
+    def test_stale_response_served_when_server_unreachable(self):
+        """
+        Teste que la version en cache est servie si le serveur est injoignable.
+        """
+        url = f"{self.base_url}/etag"
+        self.cache.get(url)
+        
+        with patch.object(self.cache.session, 'get', side_effect=requests.ConnectionError('injoignable')):
+            response = self.cache.get(url, max_age=0)
+        
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.text, 'version 1')
+    
+    def test_eviction(self):
+        """
+        Teste la suppression des réponses les moins récemment utilisées au-delà de la taille maximale.
+        """
+        self.cache.max_bytes = len('version 1') + len('document')
+        self.cache.get(f"{self.base_url}/etag")
+        time.sleep(0.01)
+        self.cache.get(f"{self.base_url}/modified")
+        self.assertIsNotNone(self.cache._load(f"{self.base_url}/etag"))
+        
+        # Taille maximale réduite : la réponse la moins récemment utilisée est supprimée
+        self.cache.max_bytes = len('document')
+        self.cache._evict()
+        self.assertIsNone(self.cache._load(f"{self.base_url}/etag"))
+        self.assertIsNotNone(self.cache._load(f"{self.base_url}/modified"))
+
+    
+    def test_directory_scanned_only_past_max_bytes(self):
+        """
+        Teste que le répertoire du cache n'est pas parcouru à chaque écriture.
+        """
+        self.cache.max_bytes = len('version 1') + len('document')
+        
+        with patch('app.core.http_cache.os.listdir', wraps=os.listdir) as mock_listdir:
+            self.cache.get(f"{self.base_url}/etag")
+            self.server.version = 2
+            self.cache.get(f"{self.base_url}/etag", max_age=0)
+            self.cache.get(f"{self.base_url}/modified")
+            
+            # Un seul parcours, au premier enregistrement : la taille est ensuite tenue à jour
+            self.assertEqual(mock_listdir.call_count, 1)
+            self.assertEqual(self.cache._total_bytes, len('version 2') + len('document'))
+            
+            # Taille maximale dépassée : nouveau parcours et éviction
+            self.cache.max_bytes = len('document')
+            self.server.version = 3
+            self.cache.get(f"{self.base_url}/etag", max_age=0)
+            self.assertEqual(mock_listdir.call_count, 2)
+            self.assertIsNone(self.cache._load(f"{self.base_url}/modified"))
+    
+    def test_stale_fallback_with_missing_content(self):
+        """
+        Teste qu'un contenu supprimé entre-temps (par un autre processus) ne remplace pas
+        l'erreur réseau, et qu'une revalidation 304 est suivie d'une nouvelle requête.
+        """
+        url = f"{self.base_url}/etag"
+        self.cache.get(url)
+        
+        with patch.object(self.cache, '_cached_response', side_effect=FileNotFoundError('évincé')):
+            with patch.object(self.cache.session, 'get', side_effect=requests.ConnectionError('injoignable')):
+                with self.assertRaises(requests.ConnectionError):
+                    self.cache.get(url, max_age=0)
+            
+            response = self.cache.get(url, max_age=0)
+        
+        self.assertFalse(response.from_cache)
+        self.assertEqual(response.text, 'version 1')
+        self.assertIsNone(self.server.requests[-1][1].get('If-None-Match'))
+        self.assertEqual(self.server.requests[-2][1].get('If-None-Match'), '"v1"')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Tests unitaires pour le module pdf_job_manager.py.
+"""
+
+import os
+import sys
+import time
+import unittest
+import json
+import tempfile
+import shutil
+import threading
+from unittest.mock import MagicMock
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.core.pdf_job_manager import PDFJobManager, QueueFullError
+
+
+class TestPDFJobManager(unittest.TestCase):
+    """
+    Tests unitaires pour la classe PDFJobManager.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        # Créer un répertoire temporaire pour les fichiers extraits
+        self.temp_dir = tempfile.mkdtemp()
+        
+        # Créer le fichier de données financières retourné par le processeur
+        self.data_file = os.path.join(self.temp_dir, 'test_financial_data.json')
+        with open(self.data_file, 'w') as f:
+            json.dump({'revenue': 100, 'gross_margin': 40, 'net_income': 20}, f)
+        
+        # Processeur PDF simulé, bloqué jusqu'à ce que le test le libère
+        self.release = threading.Event()
+        self.started = threading.Event()
+        
+        def process_pdf(pdf_path, progress=None):
+            progress('extraction', 1, 2)
+            self.started.set()
+            self.release.wait(5)
+            progress('extraction', 2, 2)
+            return os.path.join(self.temp_dir, 'test_extracted.txt'), self.data_file
+        
+        self.processor = MagicMock()
+        self.processor.process_pdf.side_effect = process_pdf
+        self.db_path = os.path.join(self.temp_dir, 'jobs.db')
+        self.job_manager = PDFJobManager(processor=self.processor, max_workers=1, max_pending=2,
+                                         db_path=self.db_path)
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        # Libérer les tâches et arrêter le pool
+        self.release.set()
+        if self.job_manager._executor:
+            self.job_manager._executor.shutdown(wait=True)
+        
+        # Supprimer le répertoire temporaire
+        shutil.rmtree(self.temp_dir)
+    
+    def test_submit_and_status(self):
+        """
+        Teste la mise en file d'une tâche, le suivi de sa progression et son résultat.
+        """
+        # Ajouter une tâche : l'appel retourne avant la fin du traitement
+        job_id = self.job_manager.submit('/tmp/test.pdf', 'test.pdf')
+        self.assertTrue(self.started.wait(5))
+        
+        # Vérifier la progression pendant le traitement
+        status = self.job_manager.get_status(job_id)
+        self.assertEqual(status['status'], 'running')
+        self.assertEqual((status['pages_done'], status['pages_total']), (1, 2))
+        
+        # Terminer le traitement
+        self.release.set()
+        self.job_manager._executor.shutdown(wait=True)
+        
+        # Vérifier le résultat
+        status = self.job_manager.get_status(job_id)
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['pages_done'], 2)
+        self.assertEqual(status['financial_data']['revenue'], 100)
+        self.processor.process_pdf.assert_called_once()
+    
+    def test_queue_full(self):
+        """
+        Teste le refus des tâches au-delà de la capacité de la file.
+        """
+        self.job_manager.submit('/tmp/a.pdf')
+        self.job_manager.submit('/tmp/b.pdf')
+        
+        with self.assertRaises(QueueFullError):
+            self.job_manager.submit('/tmp/c.pdf')
+    
+    def test_failed_job(self):
+        """
+        Teste l'état d'une tâche dont le traitement échoue.
+        """
+        self.processor.process_pdf.side_effect = Exception("Erreur de traitement")
+        
+        job_id = self.job_manager.submit('/tmp/test.pdf')
+        self.job_manager._executor.shutdown(wait=True)
+        
+        status = self.job_manager.get_status(job_id)
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn("Erreur de traitement", status['message'])
+        self.assertIsNone(self.job_manager.get_status('inconnu'))
+    
+    
+    def test_status_shared_between_processes(self):
+        """
+        Teste que l'état et la capacité de la file sont partagés par les gestionnaires
+        utilisant la même base, comme les différents workers de l'application.
+        """
+        other_worker = PDFJobManager(processor=self.processor, max_workers=1, max_pending=2,
+                                     db_path=self.db_path)
+        
+        job_id = self.job_manager.submit('/tmp/test.pdf', 'test.pdf')
+        self.assertTrue(self.started.wait(5))
+        
+        status = other_worker.get_status(job_id)
+        self.assertEqual((status['status'], status['filename']), ('running', 'test.pdf'))
+        
+        # La tâche en cours compte dans la capacité de l'autre gestionnaire
+        self.job_manager.submit('/tmp/b.pdf')
+        with self.assertRaises(QueueFullError):
+            other_worker.submit('/tmp/c.pdf')
+        
+        self.release.set()
+        self.job_manager._executor.shutdown(wait=True)
+        self.assertEqual(other_worker.get_status(job_id)['financial_data']['net_income'], 20)
+    
+    def test_interrupted_job(self):
+        """
+        Teste qu'une tâche sans progression depuis job_ttl secondes est marquée comme échouée.
+        """
+        self.job_manager.job_ttl = 0.2
+        job_id = self.job_manager.submit('/tmp/test.pdf')
+        self.assertTrue(self.started.wait(5))
+        
+        # Le processus qui exécutait la tâche ne la met plus à jour
+        time.sleep(0.3)
+        self.job_manager.submit('/tmp/b.pdf')
+        
+        status = self.job_manager.get_status(job_id)
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['message'], "Traitement interrompu")
+    
+    def test_queued_job_not_interrupted(self):
+        """
+        Teste qu'une tâche qui attend un thread libre plus longtemps que job_ttl n'est pas
+        marquée comme échouée, puis qu'elle est exécutée.
+        """
+        self.job_manager.max_pending = 3
+        first = self.job_manager.submit('/tmp/a.pdf')
+        self.assertTrue(self.started.wait(5))
+        queued = self.job_manager.submit('/tmp/b.pdf')
+        
+        # La première tâche progresse : seule l'attente de la seconde dépasse job_ttl
+        self.job_manager.job_ttl = 0.2
+        time.sleep(0.3)
+        self.job_manager._update(first, stage='extraction')
+        self.job_manager.submit('/tmp/c.pdf')
+        self.assertEqual(self.job_manager.get_status(queued)['status'], 'queued')
+        
+        self.release.set()
+        self.job_manager._executor.shutdown(wait=True)
+        self.assertEqual(self.job_manager.get_status(queued)['status'], 'done')
+    
+    def test_failed_queued_job_not_run(self):
+        """
+        Teste qu'une tâche déjà marquée comme échouée n'est pas exécutée par le pool.
+        """
+        job_id = self.job_manager.submit('/tmp/a.pdf')
+        self.assertTrue(self.started.wait(5))
+        queued = self.job_manager.submit('/tmp/b.pdf')
+        self.job_manager._update(queued, status='failed', message="Traitement interrompu")
+        
+        self.release.set()
+        self.job_manager._executor.shutdown(wait=True)
+        self.assertEqual(self.processor.process_pdf.call_count, 1)
+        self.assertEqual(self.job_manager.get_status(job_id)['status'], 'done')
+        self.assertEqual(self.job_manager.get_status(queued)['status'], 'failed')
+
+
+if __name__ == '__main__':
+    unittest.main()
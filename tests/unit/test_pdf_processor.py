@@ -8,12 +8,13 @@ import unittest
 import json
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
 # Ajouter le répertoire parent au chemin d'importation
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from app.core.pdf_processor import PDFProcessor
+from app.core.pdf_processor import PDFProcessor, PDFExtractionCache, get_extraction_pool
 
 
 class TestPDFProcessor(unittest.TestCase):
@@ -36,6 +37,12 @@ class TestPDFProcessor(unittest.TestCase):
         self.mock_extracted_dir = patcher.start()
         self.addCleanup(patcher.stop)
         
+        # Utiliser un cache disque propre à chaque test
+        self.cache_path = os.path.join(self.temp_dir, 'cache.db')
+        patcher = patch.object(self.pdf_processor, 'disk_cache', PDFExtractionCache(self.cache_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
         # Créer un fichier PDF de test
         self.test_pdf_path = os.path.join(self.temp_dir, 'test.pdf')
         with open(self.test_pdf_path, 'w') as f:
@@ -48,23 +55,108 @@ class TestPDFProcessor(unittest.TestCase):
         # Supprimer le répertoire temporaire
         shutil.rmtree(self.temp_dir)
     
-    @patch('app.core.pdf_processor.extract_text')
-    def test_extract_text_from_pdf(self, mock_extract_text):
+    @patch('app.core.pdf_processor.extract_page_range')
+    @patch('app.core.pdf_processor.count_pdf_pages')
+    def test_extract_text_from_pdf(self, mock_count_pages, mock_extract_page_range):
         """
         Teste l'extraction de texte à partir d'un PDF.
         """
-        # Configurer le mock pour retourner un texte de test
-        mock_extract_text.return_value = "Test revenue: $100 million\nGross margin: 40%\nNet income: $20 million"
+        # Configurer les mocks pour un PDF d'une page contenant un texte de test
+        mock_count_pages.return_value = 1
+        mock_extract_page_range.return_value = ["Test revenue: $100 million\nGross margin: 40%\nNet income: $20 million"]
+        self.pdf_processor.extraction_workers = 1
         
         # Extraire le texte
         text = self.pdf_processor.extract_text_from_pdf(self.test_pdf_path)
         
-        # Vérifier que la fonction extract_text a été appelée avec le bon argument
-        mock_extract_text.assert_called_once_with(self.test_pdf_path)
+        # Vérifier que la page a été extraite avec les bons arguments
+        mock_extract_page_range.assert_called_once_with(self.test_pdf_path, 0, 1)
         
         # Vérifier que le texte extrait est correct
         self.assertEqual(text, "Test revenue: $100 million\nGross margin: 40%\nNet income: $20 million")
     
+    @patch('app.core.pdf_processor.extract_page_range')
+    @patch('app.core.pdf_processor.count_pdf_pages')
+    def test_extract_text_from_pdf_per_page(self, mock_count_pages, mock_extract_page_range):
+        """
+        Teste l'extraction page par page et la fusion ordonnée des plages.
+        """
+        # Chaque plage retourne le texte de ses pages
+        mock_count_pages.return_value = 10
+        mock_extract_page_range.side_effect = lambda path, first, last: [f"Texte de la page {i}: revenus en hausse\x0c" for i in range(first, last)]
+        self.pdf_processor.extraction_workers = 1
+        
+        # Extraire les pages puis le texte complet
+        pages = self.pdf_processor.extract_text_from_pdf(self.test_pdf_path, per_page=True)
+        text = self.pdf_processor.extract_text_from_pdf(self.test_pdf_path)
+        
+        # Vérifier que les pages sont dans l'ordre et que le texte est leur concaténation
+        self.assertEqual(pages, [f"Texte de la page {i}: revenus en hausse\x0c" for i in range(10)])
+        self.assertEqual(text, "".join(pages))
+    
+    @patch('app.core.pdf_processor.pytesseract', create=True)
+    @patch('app.core.pdf_processor.convert_from_path', create=True)
+    @patch('app.core.pdf_processor.HAS_OCR', True)
+    @patch('app.core.pdf_processor.extract_page_range')
+    @patch('app.core.pdf_processor.count_pdf_pages')
+    def test_extract_text_from_pdf_selective_ocr(self, mock_count_pages, mock_extract_page_range,
+                                                 mock_convert_from_path, mock_pytesseract):
+        """
+        Teste que l'OCR n'est appliqué qu'aux pages sans couche texte.
+        """
+        # Les pages 1, 2 et 4 n'ont pas de couche texte
+        text_layer = ["Texte de la page 0: revenus en hausse\x0c", "\x0c", "\x0c",
+                      "Texte de la page 3: revenus en hausse\x0c", "\x0c"]
+        mock_count_pages.return_value = len(text_layer)
+        mock_extract_page_range.side_effect = lambda path, first, last: text_layer[first:last]
+        mock_convert_from_path.side_effect = lambda path, first_page, last_page: [
+            f"image {n}" for n in range(first_page, last_page + 1)
+        ]
+        mock_pytesseract.image_to_string.side_effect = lambda image, lang: f"OCR de l'{image}"
+        self.pdf_processor.extraction_workers = 1
+        
+        # Extraire les pages
+        pages = self.pdf_processor.extract_text_from_pdf(self.test_pdf_path, per_page=True)
+        
+        # Vérifier que seules les pages sans texte ont été rastérisées, par fenêtres consécutives
+        self.assertEqual(
+            [c.kwargs for c in mock_convert_from_path.call_args_list],
+            [{'first_page': 2, 'last_page': 3}, {'first_page': 5, 'last_page': 5}]
+        )
+        
+        # Vérifier que le texte OCR remplace les pages vides, dans l'ordre
+        self.assertEqual(pages, [text_layer[0], "OCR de l'image 2\x0c", "OCR de l'image 3\x0c",
+                                 text_layer[3], "OCR de l'image 5\x0c"])
+    
+    @patch('app.core.pdf_processor.get_extraction_pool')
+    @patch('app.core.pdf_processor.extract_page_range')
+    @patch('app.core.pdf_processor.count_pdf_pages')
+    def test_extract_pages_shared_pool(self, mock_count_pages, mock_extract_page_range, mock_get_pool):
+        """
+        Teste que les documents successifs utilisent le même pool, sans en créer un par appel.
+        """
+        mock_count_pages.return_value = 10
+        mock_extract_page_range.side_effect = lambda path, first, last: [f"page {i}\x0c" for i in range(first, last)]
+        pool = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(pool.shutdown)
+        mock_get_pool.return_value = pool
+        self.pdf_processor.extraction_workers = 2
+        
+        for _ in range(2):
+            pages = self.pdf_processor._extract_pages(self.test_pdf_path)
+            self.assertEqual(pages, [f"page {i}\x0c" for i in range(10)])
+        
+        self.assertEqual(mock_get_pool.call_count, 2)
+        mock_get_pool.assert_called_with(2)
+    
+    def test_get_extraction_pool(self):
+        """
+        Teste que le pool d'extraction est unique et démarre ses processus par 'spawn'.
+        """
+        pool = get_extraction_pool(2)
+        self.assertIs(get_extraction_pool(4), pool)
+        self.assertEqual(pool._mp_context.get_start_method(), 'spawn')
+    
     def test_extract_financial_data(self):
         """
         Teste l'extraction de données financières à partir du texte.
@@ -80,6 +172,38 @@ class TestPDFProcessor(unittest.TestCase):
         self.assertEqual(financial_data['gross_margin'], 40)
         self.assertEqual(financial_data['net_income'], 20)
     
+    def test_extract_financial_data_units_and_priority(self):
+        """
+        Teste la conversion des unités et la priorité entre modèles d'une même métrique.
+        """
+        # La marge sans pourcentage apparaît avant celle avec pourcentage
+        text = ("Gross margin of 38 basis points\nTotal revenue was $1.5 billion\n"
+                "Revenue: $900 million\nGross margin was 41.5%\nNet income of 250,000 thousand")
+        
+        # Extraire les données financières
+        financial_data = self.pdf_processor.extract_financial_data(text)
+        
+        # Vérifier que les montants sont en millions et que le modèle prioritaire l'emporte
+        self.assertEqual(financial_data['revenue'], 1500)
+        self.assertEqual(financial_data['gross_margin'], 41.5)
+        self.assertEqual(financial_data['net_income'], 250)
+    
+    def test_extract_financial_data_prose_before_statement(self):
+        """
+        Teste qu'une mention en minuscules dans le texte courant ne l'emporte pas sur le libellé d'état.
+        """
+        text = ("In fiscal 2024, sales of 3 new product lines grew quickly.\n"
+                "The gross margin of 2 segments and the net income of 4 regions improved.\n"
+                "Total revenue $383.3 billion\nGross margin 46.2%\nNet income $93,736 million")
+        
+        # Extraire les données financières
+        financial_data = self.pdf_processor.extract_financial_data(text)
+        
+        # Vérifier que les libellés d'état financier sont retenus
+        self.assertEqual(financial_data['revenue'], 383300)
+        self.assertEqual(financial_data['gross_margin'], 46.2)
+        self.assertEqual(financial_data['net_income'], 93736)
+    
     def test_save_extracted_text(self):
         """
         Teste la sauvegarde du texte extrait.
@@ -148,7 +272,7 @@ class TestPDFProcessor(unittest.TestCase):
         text_filepath, json_filepath = self.pdf_processor.process_pdf(self.test_pdf_path)
         
         # Vérifier que les fonctions ont été appelées avec les bons arguments
-        mock_extract_text_from_pdf.assert_called_once_with(self.test_pdf_path)
+        mock_extract_text_from_pdf.assert_called_once_with(self.test_pdf_path, progress=None)
         mock_extract_financial_data.assert_called_once_with(mock_extract_text_from_pdf.return_value)
         mock_save_extracted_text.assert_called_once_with(mock_extract_text_from_pdf.return_value, self.test_pdf_path)
         mock_save_financial_data.assert_called_once_with(mock_extract_financial_data.return_value, self.test_pdf_path)
@@ -157,6 +281,95 @@ class TestPDFProcessor(unittest.TestCase):
         self.assertEqual(text_filepath, mock_save_extracted_text.return_value)
         self.assertEqual(json_filepath, mock_save_financial_data.return_value)
 
+    
+    @patch('app.core.pdf_processor.extract_page_range')
+    @patch('app.core.pdf_processor.count_pdf_pages')
+    def test_process_pdf_reupload_uses_disk_cache(self, mock_count_pages, mock_extract_page_range):
+        """
+        Teste qu'un contenu déjà traité n'est pas extrait à nouveau, même par un
+        autre processeur et sous un autre nom de fichier.
+        """
+        mock_count_pages.return_value = 1
+        mock_extract_page_range.return_value = ["Test revenue: $100 million\nGross margin: 40%\nNet income: $20 million"]
+        self.pdf_processor.extraction_workers = 1
+        
+        # Premier traitement
+        _, first_json_filepath = self.pdf_processor.process_pdf(self.test_pdf_path)
+        self.assertEqual(mock_extract_page_range.call_count, 1)
+        
+        # Même contenu sous un autre nom, traité par une autre instance partageant le cache
+        reupload_path = os.path.join(self.temp_dir, 'reupload.pdf')
+        shutil.copy(self.test_pdf_path, reupload_path)
+        other_processor = PDFProcessor()
+        other_processor.extracted_dir = self.temp_dir
+        other_processor.disk_cache = PDFExtractionCache(self.cache_path)
+        text_filepath, json_filepath = other_processor.process_pdf(reupload_path)
+        
+        # Vérifier que l'extraction n'a pas été relancée et qu'aucun fichier n'a été réécrit
+        self.assertEqual(mock_extract_page_range.call_count, 1)
+        self.assertEqual(json_filepath, first_json_filepath)
+        self.assertEqual(len([name for name in os.listdir(self.temp_dir) if name.endswith('.json')]), 1)
+        with open(text_filepath, 'r') as f:
+            self.assertEqual(f.read(), mock_extract_page_range.return_value[0])
+        with open(json_filepath, 'r') as f, open(first_json_filepath, 'r') as first:
+            self.assertEqual(json.load(f), json.load(first))
+
+
+class TestPDFExtractionCache(unittest.TestCase):
+    """
+    Tests unitaires pour le cache disque des extractions.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = PDFExtractionCache(os.path.join(self.temp_dir, 'cache.db'))
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def test_file_digest_replaced_file(self):
+        """
+        Teste qu'un fichier remplacé sous le même nom est haché à nouveau.
+        """
+        pdf_path = os.path.join(self.temp_dir, 'report.pdf')
+        with open(pdf_path, 'w') as f:
+            f.write('Rapport 2023')
+        first_digest = self.cache.file_digest(pdf_path)
+        
+        # Remplacer le fichier par un contenu de même taille
+        with open(pdf_path, 'w') as f:
+            f.write('Rapport 2024')
+        stat = os.stat(pdf_path)
+        os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        
+        # Vérifier que l'empreinte suit le contenu
+        self.assertNotEqual(self.cache.file_digest(pdf_path), first_digest)
+        self.assertEqual(self.cache.file_digest(pdf_path), PDFExtractionCache(self.cache.db_path).file_digest(pdf_path))
+    
+    def test_lru_eviction(self):
+        """
+        Teste l'éviction des entrées les moins récemment utilisées.
+        """
+        pages = ["x" * 100]
+        self.cache.max_bytes = 250
+        
+        self.cache.put('a', pages=pages)
+        self.cache.put('b', pages=pages)
+        
+        # Utiliser 'a' pour que 'b' devienne la moins récemment utilisée
+        self.assertEqual(self.cache.get('a')['text'], pages[0])
+        self.cache.put('c', pages=pages, financial_data={'revenue': 100})
+        
+        # Vérifier que seule 'b' a été évincée
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a')['pages'], pages)
+        self.assertEqual(self.cache.get('c')['financial_data'], {'revenue': 100})
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
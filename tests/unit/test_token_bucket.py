@@ -0,0 +1,115 @@
+"""
+Tests unitaires pour le module token_bucket.py.
+"""
+
+import os
+import sys
+import time
+import unittest
+import tempfile
+import shutil
+import multiprocessing
+from unittest.mock import patch, MagicMock
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.core.token_bucket import FileTokenBucket
+from app.core.alpha_vantage_integration import AlphaVantageIntegration
+
+
+def acquire_tokens(path, count, timestamps):
+    """
+    Prend des jetons depuis un autre processus et enregistre l'heure de chaque prise.
+    """
+    bucket = FileTokenBucket(path, rate=20)
+    for _ in range(count):
+        bucket.acquire()
+        timestamps.append(time.time())
+
+
+class TestFileTokenBucket(unittest.TestCase):
+    """
+    Tests unitaires pour la classe FileTokenBucket.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'bucket')
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        shutil.rmtree(self.temp_dir)
+    
+    def test_no_wait_when_budget_available(self):
+        """
+        Teste qu'aucune attente n'a lieu tant que le quota n'est pas épuisé.
+        """
+        bucket = FileTokenBucket(self.path, rate=1 / 12, capacity=2)
+        
+        with patch('app.core.token_bucket.time.sleep') as mock_sleep:
+            bucket.acquire()
+            bucket.acquire()
+            mock_sleep.assert_not_called()
+            
+            # Quota épuisé : attente d'environ 12 secondes pour le jeton suivant
+            mock_sleep.side_effect = StopIteration
+            with self.assertRaises(StopIteration):
+                bucket.acquire()
+            self.assertAlmostEqual(mock_sleep.call_args[0][0], 12, delta=0.1)
+    
+    def test_quota_shared_between_processes(self):
+        """
+        Teste que plusieurs processus respectent un quota global.
+        """
+        manager = multiprocessing.Manager()
+        timestamps = manager.list()
+        processes = [
+            multiprocessing.Process(target=acquire_tokens, args=(self.path, 4, timestamps))
+            for _ in range(3)
+        ]
+        
+        start = time.time()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        
+        # Douze jetons à 20 par seconde : le premier immédiat, les onze suivants espacés de 50 ms
+        timestamps = sorted(timestamps)
+        self.assertEqual(len(timestamps), 12)
+        self.assertGreaterEqual(timestamps[-1] - start, 0.5)
+        for first, last in zip(timestamps, timestamps[4:]):
+            self.assertGreaterEqual(last - first, 0.19)
+        manager.shutdown()
+
+
+class TestAlphaVantageRateLimit(unittest.TestCase):
+    """
+    Tests de la limitation du débit des requêtes Alpha Vantage.
+    """
+    
+    @patch('app.core.alpha_vantage_integration.requests.get')
+    def test_make_request_waits_only_when_quota_exhausted(self, mock_get):
+        """
+        Teste qu'une requête n'attend que si le quota est épuisé.
+        """
+        mock_get.return_value = MagicMock(json=MagicMock(return_value={'Symbol': 'AAPL'}))
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        
+        alpha_vantage = AlphaVantageIntegration()
+        alpha_vantage.rate_limiter = FileTokenBucket(os.path.join(temp_dir, 'bucket'), rate=5 / 60)
+        
+        with patch('app.core.token_bucket.time.sleep') as mock_sleep:
+            self.assertEqual(alpha_vantage._make_request('OVERVIEW', 'AAPL'), {'Symbol': 'AAPL'})
+            mock_sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
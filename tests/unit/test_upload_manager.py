@@ -0,0 +1,80 @@
+"""
+Tests unitaires pour le module upload_manager.py.
+"""
+
+import os
+import sys
+import unittest
+import hashlib
+import tempfile
+import shutil
+from io import BytesIO
+
+from werkzeug.datastructures import FileStorage
+
+# Ajouter le répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.core.upload_manager import save_upload
+
+
+class TestUploadManager(unittest.TestCase):
+    """
+    Tests unitaires pour l'enregistrement des fichiers téléchargés.
+    """
+    
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        """
+        # Créer un répertoire temporaire pour les téléchargements
+        self.temp_dir = tempfile.mkdtemp()
+        self.content = b'%PDF-1.4\n' + b'Rapport annuel\n' * 10000
+    
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        """
+        # Supprimer le répertoire temporaire
+        shutil.rmtree(self.temp_dir)
+    
+    def upload(self, filename, content=None):
+        """
+        Simule le téléchargement d'un fichier.
+        """
+        return FileStorage(stream=BytesIO(content or self.content), filename=filename)
+    
+    def test_save_upload(self):
+        """
+        Teste l'enregistrement d'un premier téléchargement.
+        """
+        file_path, digest, duplicate = save_upload(self.upload('rapport 2024.pdf'), self.temp_dir)
+        
+        # Vérifier l'empreinte, le nom nettoyé et le contenu
+        self.assertFalse(duplicate)
+        self.assertEqual(digest, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(file_path, os.path.join(self.temp_dir, digest, 'rapport_2024.pdf'))
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+    
+    def test_save_upload_duplicate(self):
+        """
+        Teste qu'un même contenu téléchargé sous un autre nom réutilise le fichier existant.
+        """
+        first_path, first_digest, _ = save_upload(self.upload('rapport.pdf'), self.temp_dir)
+        file_path, digest, duplicate = save_upload(self.upload('copie.pdf'), self.temp_dir)
+        
+        # Vérifier que le fichier existant est réutilisé sans nouvelle copie
+        self.assertTrue(duplicate)
+        self.assertEqual((file_path, digest), (first_path, first_digest))
+        self.assertEqual(os.listdir(self.temp_dir), [digest])
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir, digest)), ['rapport.pdf'])
+        
+        # Un contenu différent est enregistré séparément
+        _, other_digest, duplicate = save_upload(self.upload('rapport.pdf', b'%PDF-1.4\nAutre'), self.temp_dir)
+        self.assertFalse(duplicate)
+        self.assertNotEqual(other_digest, digest)
+
+
+if __name__ == '__main__':
+    unittest.main()